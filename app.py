@@ -1,147 +1,86 @@
-import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
+import functools
+import csv
+import hmac
 import json
-from typing import Dict, List, Tuple
-from openai import OpenAI
+import tempfile
 import time
+import uuid
+import streamlit as st
+from datetime import datetime, timedelta
+from contextlib import closing
+from typing import TYPE_CHECKING, Optional
+from bulk_jobs import (
+    TERMINAL_STATUSES,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    compile_bulk_job,
+    ingest_results,
+    poll_bulk_job,
+    submit_bulk_job
+)
+from generation_jobs import (
+    CANCELLED,
+    DEFAULT_WORKERS,
+    FAILED,
+    FINISHED_STATUSES,
+    QUEUED,
+    RUNNING,
+    GenerationJobQueue,
+    JobHandle
+)
+from history_io import FORMATS, available_formats, detect_format, export_to_file, import_file
+from history_store import HistoryStore
+from openai_client import build_openai_client
+from resilience import (
+    BATCH,
+    DEFAULT_INTERACTIVE_RESERVED,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_TENANT_CONCURRENCY,
+    INTERACTIVE,
+    APIGuard,
+    CircuitBreaker,
+    FairScheduler,
+    RateLimiter,
+    scheduling
+)
+from sms_cache import SMSCache
+from sms_dispatch import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_IN_FLIGHT,
+    DispatchStore,
+    build_gateway,
+    dispatch_cost,
+    plan_dispatch,
+    read_recipients,
+    run_dispatch
+)
+from sms_engine import (
+    BATCH_MAX_CONCURRENCY,
+    SCHOOL_PLACEHOLDER,
+    classify_sms,
+    correct_sms,
+    fallback_sms,
+    fan_out_schools,
+    generate_ai_sms,
+    generate_batch_sms,
+    generate_multi_target_sms,
+    generation_budget,
+    hedge_delay,
+    latency_histogram,
+    prompt_usage,
+    stream_ai_sms
+)
+from sms_templates import TEMPLATE_FAST_PATH_CATEGORIES, render_template
+from sms_validator import sms_byte_length, validate_history_frame, validate_sms
+from static_data import BATCH_SCENARIOS
+from telemetry import TAG_FIELDS, Telemetry, new_trace, serve_prometheus
 
-# ───────────── 1. OpenAI 문자 생성 함수 ─────────────
-def generate_ai_sms(
-    client: OpenAI,
-    target: str,
-    category: str,
-    content_details: str,
-    date: str,
-    school: str,
-    additional_info: Dict[str, str],
-    tone_guide: str = "",
-    length_option: str = "표준",
-    style_option: str = "기본"
-) -> Tuple[str, bool]:
-    """생성형 AI를 활용한 세계교육 표준"""
-    
-    # 대상별 톤 가이드
-    tone_guides = {
-        "학부모": "정중하고 상세하며 신뢰감을 주는 톤. 존댓말 사용. [학교명]으로 시작",
-        "학생": "친근하고 이해하기 쉬운 톤. 존댓말 사용. 학생들의 눈높이에 맞춘 표현",
-        "교직원": "간결하고 업무적이며 핵심만 전달하는 톤. 존댓말 사용. 담당 업무 명시"
-    }
-    
-    # 카테고리별 포함 요소
-    category_elements = {
-        "안전": "안전 주의사항, 구체적인 행동 지침",
-        "재난": "대응 방법, 비상 연락처, 준비물",
-        "체험학습": "일시, 장소, 준비물, 주의사항",
-        "행사 안내": "일시, 장소, 참여 방법, 준비사항",
-        "상담": "상담 일정, 신청 방법, 준비 서류",
-        "안내": "핵심 정보, 확인 사항, 문의처"
-    }
-    
-    # 길이 옵션별 글자 수
-    length_guides = {
-        "매우 짧게": "40자 이내로 핵심만 간단히",
-        "짧게": "60자 이내로 간결하게",
-        "표준": "80자 내외로 적절하게",
-        "길게": "120자 내외로 상세하게",
-        "매우 길게": "180자 내외로 자세하게"
-    }
-    
-    # 스타일 옵션별 가이드
-    style_guides = {
-        "기본": "표준적이고 격식 있는 문체",
-        "친근함": "따뜻하고 친근한 문체, 이모티콘 포함 가능",
-        "긴급함": "긴급하고 단호한 문체, 중요 내용 강조",
-        "공식적": "매우 격식 있고 공식적인 문체",
-        "안내형": "차분하고 설명적인 문체, 단계별 안내"
-    }
-    
-    # 추가 정보 문자열 생성
-    additional_str = ""
-    for key, value in additional_info.items():
-        if value:
-            additional_str += f"- {key}: {value}\n"
-    
-    prompt = f"""학교에서 발송하는 문자 메시지를 작성해주세요.
-
-대상: {target}
-카테고리: {category}
-학교명: {school}
-날짜/시간: {date}
-주요 내용: {content_details}
-
-추가 정보:
-{additional_str if additional_str else "없음"}
-
-작성 지침:
-1. 톤: {tone_guides.get(target, tone_guide)}
-2. 필수 포함 요소: {category_elements.get(category, "핵심 정보")}
-3. 길이: {length_guides.get(length_option, "80자 내외")}
-4. 스타일: {style_guides.get(style_option, "표준적인 문체")}
-5. 명확하고 구체적인 정보 전달
-6. 불필요한 미사나 수식어 제외
-7. 모든 대상에게 존댓말 사용
-
-문자 메시지만 작성하고, 다른 설명은 포함하지 마세요."""
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 학교 행정 업무를 돕는 전문가입니다. 간결하고 명확한 문자 메시지를 작성합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=300
-        )
-        
-        sms = response.choices[0].message.content.strip()
-        return sms, True
-        
-    except Exception as e:
-        return f"문자 생성 중 오류가 발생했습니다: {str(e)}", False
-
-# ───────────── 2. 예제 템플릿 (참고용) ─────────────
-EXAMPLE_TEMPLATES = {
-    "학부모": {
-        "안전": "[○○학교] 11월 15일 등하교 시 교통안전 지도 부탁드립니다. 횡단보도에서 좌우를 확인하도록 가정에서도 지도 부탁드립니다.",
-        "체험학습": "[○○학교] 3학년 11월 20일 과학관 현장체험학습 안내입니다. 도시락, 물, 우산을 준비해 주세요. 참가 동의서는 11월 18일까지 제출 부탁드립니다."
-    },
-    "학생": {
-        "안전": "[○○학교] 내일 등교할 때 빗길에 미끄러지지 않도록 조심하세요. 우산을 꼭 챙기고, 천천히 걸어오세요.",
-        "행사 안내": "[○○학교] 11월 25일 오후 2시 운동장에서 가을 축제가 열립니다. 친구들과 함께 즐거운 시간 보내세요!"
-    },
-    "교직원": {
-        "안전": "[○○학교] 11월 15일 우천 시 등하교 안전 지도 철저히 부탁드립니다. 담당 구역 확인 후 배치 부탁드립니다.",
-        "행사 안내": "[○○학교] 11월 25일 14:00 가을축제 진행. 담당 부스 운영 교사는 13:30까지 준비 완료 부탁드립니다."
-    }
-}
-
-# ───────────── 3. 일괄 생성을 위한 시나리오 ─────────────
-BATCH_SCENARIOS = {
-    "등하교 안전 안내": {
-        "category": "안전",
-        "targets": ["학부모", "학생", "교직원"],
-        "base_content": "우천 시 등하교 안전 주의"
-    },
-    "현장체험학습 안내": {
-        "category": "체험학습",
-        "targets": ["학부모", "학생"],
-        "base_content": "현장체험학습 실시 및 준비물 안내"
-    },
-    "학교 행사 안내": {
-        "category": "행사 안내",
-        "targets": ["학부모", "학생", "교직원"],
-        "base_content": "학교 행사 개최 안내"
-    },
-    "상담 주간 안내": {
-        "category": "상담",
-        "targets": ["학부모", "교직원"],
-        "base_content": "학부모 상담 주간 운영"
-    }
-}
+# 첫 화면을 빨리 그리도록 openai·numpy·pandas는 처음 필요할 때 불러옴 (아래는 타입 표시용)
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from similar_index import SimilarRequestIndex
 
-# ───────────── 4. Streamlit UI ─────────────
+# ───────────── 2. Streamlit UI ─────────────
 st.set_page_config(page_title="🤖 AI 학교 문자 생성기", layout="wide")
 st.title("🤖 AI 학교 문자 생성기")
 st.markdown("경상북도교육청 맞춤형 학교 문자 자동 생성 시스템")
@@ -152,7 +91,182 @@ if not api_key:
     st.error("⚠️ OpenAI API 키가 설정되지 않았습니다. Streamlit secrets에 OPENAI_API_KEY를 추가해주세요.")
     st.stop()
 
-client = OpenAI(api_key=api_key)
+@st.cache_resource
+def get_openai_client(api_key: str) -> "OpenAI":
+    """서버 프로세스의 모든 세션이 연결 풀을 공유하는 OpenAI 클라이언트 (처음 API를 호출할 때 만듦)"""
+    return build_openai_client(api_key)
+
+batch_max_concurrency = int(st.secrets.get("BATCH_MAX_CONCURRENCY", BATCH_MAX_CONCURRENCY))
+
+@st.cache_resource
+def get_api_guard(
+    requests_per_minute: int,
+    tokens_per_minute: int,
+    max_concurrency: int,
+    school_concurrency: int,
+    school_requests_per_minute: int,
+    interactive_reserved: int
+) -> APIGuard:
+    """모든 세션의 API 호출이 함께 지키는 속도 제한·재시도·회로 차단기와 학교별 공정 스케줄러"""
+    return APIGuard(
+        rate_limiter=RateLimiter(requests_per_minute, tokens_per_minute),
+        circuit_breaker=CircuitBreaker(),
+        scheduler=FairScheduler(
+            max_concurrency=max_concurrency,
+            tenant_concurrency=school_concurrency,
+            tenant_requests_per_minute=school_requests_per_minute or None,
+            interactive_reserved=interactive_reserved
+        )
+    )
+
+api_guard = get_api_guard(
+    int(st.secrets.get("OPENAI_REQUESTS_PER_MINUTE", 500)),
+    int(st.secrets.get("OPENAI_TOKENS_PER_MINUTE", 200000)),
+    int(st.secrets.get("OPENAI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+    int(st.secrets.get("SCHOOL_MAX_CONCURRENCY", DEFAULT_TENANT_CONCURRENCY)),
+    int(st.secrets.get("SCHOOL_REQUESTS_PER_MINUTE", 0)),
+    int(st.secrets.get("INTERACTIVE_RESERVED_SLOTS", DEFAULT_INTERACTIVE_RESERVED))
+)
+
+@st.cache_resource
+def get_batch_backend(name: str):
+    """대량 사전 생성 작업을 제출할 백엔드 (로컬 백엔드는 작업 상태를 메모리에 보관)"""
+    if name == "local":
+        return LocalBatchBackend(get_openai_client(api_key), max_workers=batch_max_concurrency)
+    return OpenAIBatchBackend(get_openai_client(api_key))
+
+@st.cache_resource
+def get_sms_cache(db_path: str, ttl_seconds: int) -> SMSCache:
+    """모든 세션이 함께 쓰는 문자 생성 캐시"""
+    return SMSCache(db_path=db_path, ttl_seconds=ttl_seconds)
+
+sms_cache = get_sms_cache(
+    st.secrets.get("SMS_CACHE_PATH", "sms_cache.db"),
+    int(st.secrets.get("SMS_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+)
+
+@st.cache_resource
+def get_similar_index(db_path: str, min_similarity: Optional[float]) -> "SimilarRequestIndex":
+    """모든 세션이 함께 쓰는 비슷한 요청 색인 (이전 요청과 생성 문자, 처음 제안·추가할 때 불러옴)"""
+    from similar_index import DEFAULT_MIN_SIMILARITY, SimilarRequestIndex
+    
+    return SimilarRequestIndex(
+        db_path=db_path,
+        min_similarity=DEFAULT_MIN_SIMILARITY if min_similarity is None else min_similarity
+    )
+
+def similar_requests() -> "SimilarRequestIndex":
+    """secrets 설정으로 만든 비슷한 요청 색인"""
+    min_similarity = st.secrets.get("SIMILAR_MIN_SIMILARITY")
+    return get_similar_index(
+        st.secrets.get("SIMILAR_INDEX_PATH", "sms_similar.db"),
+        None if min_similarity is None else float(min_similarity)
+    )
+
+@st.cache_resource
+def get_history_store(db_path: str) -> HistoryStore:
+    """세션이 끝나도 유지되는 생성 이력 저장소"""
+    return HistoryStore(db_path)
+
+history_store = get_history_store(st.secrets.get("SMS_HISTORY_PATH", "sms_history.db"))
+
+@st.cache_resource
+def get_dispatch_store(db_path: str) -> DispatchStore:
+    """발송 작업과 수신자별 발송 상태 저장소"""
+    return DispatchStore(db_path)
+
+dispatch_store = get_dispatch_store(st.secrets.get("SMS_DISPATCH_PATH", "sms_dispatch.db"))
+
+# 발송 게이트웨이 (기본은 실제로 보내지 않는 연습 모드). 비동기 연결 풀은 발송 작업마다 새로 엶
+gateway_name = st.secrets.get("SMS_GATEWAY", "dry_run")
+gateway_options = {
+    "base_url": st.secrets.get("SMS_GATEWAY_URL", ""),
+    "api_key": st.secrets.get("SMS_GATEWAY_API_KEY", ""),
+    "max_batch_size": int(st.secrets.get("SMS_GATEWAY_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+    "max_connections": int(st.secrets.get("SMS_GATEWAY_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT))
+}
+unit_costs = {
+    "단문(SMS)": float(st.secrets.get("SMS_UNIT_COST", 20)),
+    "장문(LMS)": float(st.secrets.get("LMS_UNIT_COST", 50))
+}
+
+@st.cache_resource
+def get_telemetry(log_path: str, metrics_port: int, metrics_host: str) -> Telemetry:
+    """모든 세션의 API 호출 계측 기록 (metrics_port를 주면 Prometheus /metrics 서버도 시작)"""
+    telemetry = Telemetry(log_path or None)
+    if metrics_port:
+        serve_prometheus(telemetry, host=metrics_host, port=metrics_port)
+    return telemetry
+
+# /metrics는 기본적으로 이 서버 안에서만 접속됨. 외부 Prometheus가 수집하면 secrets의 METRICS_HOST를 "0.0.0.0" 등으로 설정
+metrics_host = st.secrets.get("METRICS_HOST", "127.0.0.1")
+telemetry = get_telemetry(
+    st.secrets.get("TELEMETRY_LOG_PATH", "sms_telemetry.jsonl"),
+    int(st.secrets.get("METRICS_PORT", 0)),
+    metrics_host
+)
+
+@st.cache_resource
+def get_generation_queue(max_workers: int) -> GenerationJobQueue:
+    """모든 세션이 함께 쓰는 문자 생성 작업 대기열 (화면 재실행과 관계없이 작업이 계속 진행됨)"""
+    return GenerationJobQueue(max_workers=max_workers)
+
+generation_queue = get_generation_queue(int(st.secrets.get("GENERATION_WORKERS", DEFAULT_WORKERS)))
+
+# 생성 이력 탭에서 한 번에 보여줄 건수
+HISTORY_PAGE_SIZE = 20
+# 화면에서 내보낼 수 있는 최대 이력 건수. 내려받기 버튼은 파일 전체를 서버 메모리에 올리므로
+# 그보다 많으면 명령행 도구(history_io.py)로 내보냄
+HISTORY_EXPORT_MAX_ROWS = 20000
+# 진행 중인 생성 작업 상태를 다시 그리는 간격(초)
+JOB_POLL_INTERVAL_S = 0.5
+
+def save_to_history(school: str, target: str, category: str, sms: str, style_option: str, length_option: str) -> None:
+    """생성 이력 저장 (버튼 on_click 콜백으로 사용해 재실행 전에 저장되도록 함)"""
+    history_store.add({
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "school": school,
+        "target": target,
+        "category": category,
+        "content": sms,
+        "length": len(sms),
+        "style": style_option,
+        "length_option": length_option
+    })
+    notify_history_change("이력에 저장되었습니다!")
+
+def queue_for_dispatch(messages: list) -> None:
+    """발송 목록에 문자 추가 ({school, target, category, content}, 같은 문자는 한 번만)"""
+    queued = st.session_state.setdefault("dispatch_messages", [])
+    known = {(item["school"], item["target"], item["content"]) for item in queued}
+    added = [item for item in messages if (item["school"], item["target"], item["content"]) not in known]
+    queued.extend(added)
+    # 발송 탭도 다시 그려지도록 이력 변경과 같은 방식으로 전체 실행
+    notify_history_change(f"📤 발송 목록에 {len(added)}개 문자를 추가했습니다.")
+
+def notify_history_change(message: str) -> None:
+    """이력이 바뀌었음을 표시. 알림은 다음 전체 실행에서 띄움"""
+    st.session_state.history_changed = True
+    st.session_state.history_notice = message
+
+def timed_fragment(name: str):
+    """탭 하나를 독립 fragment로 만들어 그 탭의 입력만으로 다시 그리고, 렌더링 시간을 세션에 기록"""
+    def decorator(render):
+        @st.fragment
+        @functools.wraps(render)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                render(*args, **kwargs)
+            finally:
+                st.session_state.setdefault("render_timings", {})[name] = time.perf_counter() - start
+        return wrapper
+    return decorator
+
+def refresh_after_history_change() -> None:
+    """탭 fragment만 재실행되는 중에 이력이 바뀌었으면 생성 이력 탭도 갱신되도록 앱 전체를 재실행"""
+    if st.session_state.get("history_changed"):
+        st.rerun()
 
 # 사이드바 - 기본 정보
 with st.sidebar:
@@ -182,13 +296,238 @@ with st.sidebar:
         time_minute = st.selectbox("분", [0, 10, 20, 30, 40, 50])
         time_str = f" {time_hour:02d}:{time_minute:02d}"
         date_str += time_str
+    
+    # 고정 지침을 앞에 두어 제공자 프롬프트 캐시가 적용되는지 확인 (서버 프로세스 전체 누적)
+    with st.expander("📊 API 토큰 사용량"):
+        usage = prompt_usage.snapshot()
+        st.metric("API 응답 수", f"{usage['requests']}건")
+        st.metric(
+            "캐시된 입력 토큰",
+            f"{usage['cached_tokens']:,} / {usage['prompt_tokens']:,}",
+            help="제공자 프롬프트 캐시에서 처리되어 지연 시간과 비용이 줄어든 입력 토큰 수"
+        )
+        st.caption(f"캐시 적중률 {usage['cached_ratio']:.0%} | 출력 토큰 {usage['completion_tokens']:,}")
 
-# 메인 영역
-tab1, tab2, tab3, tab4 = st.tabs(["✨ AI 문자 생성", "🚀 시나리오별 일괄 생성", "📊 생성 이력", "❓ 도움말"])
+def is_template_fallback(sms, success: bool, sms_request: dict) -> bool:
+    """API 오류로 AI 문자 대신 요청 값을 채운 템플릿 문자를 받은 경우"""
+    return success and sms == render_template(sms_request)
 
-with tab1:
+def generate_in_background(
+    handle: JobHandle,
+    client: "OpenAI",
+    index: "SimilarRequestIndex",
+    sms_request: dict,
+    candidates: int,
+    stream: bool,
+    use_cache: bool
+) -> dict:
+    """작업자 스레드에서 실행하는 AI 문자 생성 (화면 함수는 쓰지 않고 결과만 반환)"""
+    options = {
+        "cache": sms_cache,
+        "use_cache": use_cache,
+        "guard": api_guard,
+        "telemetry": telemetry,
+        "queued_at": handle.queued_at
+    }
+    if stream and candidates == 1:
+        # 도착하는 대로 진행 상황에 기록. 취소되면 closing()이 응답 스트림을 닫음
+        sms, success = "", True
+        # 스트리밍과 이어지는 수정 요청이 길이 옵션의 마감 시간 하나를 함께 씀
+        deadline = time.monotonic() + generation_budget(sms_request["length_option"])["deadline_s"]
+        try:
+            with closing(stream_ai_sms(client=client, deadline=deadline, **sms_request, **options)) as chunks:
+                for chunk in chunks:
+                    if handle.cancelled:
+                        break
+                    sms += chunk
+                    handle.progress(sms)
+            sms = sms.strip()
+        except Exception as e:
+            sms, success = fallback_sms(
+                e, sms_request["target"], sms_request["category"], sms_request["school"], request=sms_request
+            )
+        # 스트리밍은 이미 표시한 뒤라 검증에 실패한 항목만 이어서 수정
+        if success and not handle.cancelled and not validate_sms(sms, sms_request)["ok"]:
+            # 스트리밍 기록은 이미 마무리되었으므로 수정 요청은 따로 계측
+            trace = new_trace(sms_request, "stream_correction")
+            report = {"ok": False}
+            try:
+                with scheduling(tenant=sms_request["school"]):
+                    sms, report = correct_sms(
+                        client, sms, sms_request, guard=api_guard, cache=sms_cache, trace=trace, deadline=deadline
+                    )
+            finally:
+                # 수정 요청이 실패했거나 수정본도 검증을 통과하지 못하면 오류로 기록
+                telemetry.finish(trace, "ok" if report["ok"] else "error")
+    else:
+        sms, success = generate_ai_sms(client=client, candidates=candidates, **sms_request, **options)
+    
+    # 템플릿 결과(API 오류로 대체한 경우)는 AI 문자로 바꿀 수 있도록 표시
+    from_template = is_template_fallback(sms, success, sms_request)
+    # AI로 새로 만든 단일 문자는 이후 비슷한 요청에 제안할 수 있도록 색인에 추가
+    if success and isinstance(sms, str) and not from_template and not handle.cancelled:
+        index.add(sms_request, sms)
+    return {"sms": sms, "success": success, "source": "template_fallback" if from_template else "ai"}
+
+def set_generation_result(result: dict, sms_request: dict, result_id: str = "") -> None:
+    """생성 결과를 세션에 보관 (진행 중인 작업이 있으면 취소)"""
+    cancel_generation_job()
+    st.session_state.generation_result = {**result, "id": result_id or uuid.uuid4().hex[:12], "request": sms_request}
+
+def cancel_generation_job() -> None:
+    """진행 중인 생성 작업 취소 (버튼 on_click 콜백으로도 사용)"""
+    job = st.session_state.pop("generation_job", None)
+    if job:
+        generation_queue.cancel(job["id"])
+        generation_queue.forget(job["id"])
+
+def collect_generation_job() -> None:
+    """끝난 생성 작업의 결과를 세션으로 옮기고 대기열에서 정리"""
+    job = st.session_state.get("generation_job")
+    if not job:
+        return
+    status = generation_queue.status(job["id"])
+    if status is not None and status["status"] not in FINISHED_STATUSES:
+        return
+    del st.session_state["generation_job"]
+    generation_queue.forget(job["id"])
+    if status is None or status["status"] == CANCELLED:
+        return
+    if status["status"] == FAILED:
+        result = {"sms": f"문자 생성 중 오류가 발생했습니다: {status['error']}", "success": False, "source": "ai"}
+    else:
+        result = status["result"]
+    st.session_state.generation_result = {**result, "id": job["id"], "request": job["request"]}
+
+def render_generation_progress(job_id: str) -> None:
+    """진행 중인 생성 작업 상태 (주기적으로 이 부분만 다시 그리고, 끝나면 결과를 표시하도록 전체 재실행)"""
+    job = generation_queue.status(job_id)
+    if job is None or job["status"] in FINISHED_STATUSES:
+        st.rerun()
+    elapsed = time.time() - job["submitted_at"]
+    if job["status"] == QUEUED:
+        st.info(f"⏳ 생성 대기 중입니다... ({elapsed:.0f}초)")
+    else:
+        st.info(f"✍️ AI가 문자를 생성하고 있습니다... ({elapsed:.0f}초) 다른 입력을 바꿔도 생성은 계속됩니다.")
+        if job["partial"]:
+            st.markdown(job["partial"] + "▌")
+    st.button("⏹️ 생성 취소", key="cancel_generation", on_click=cancel_generation_job)
+
+def render_generation_result(result: dict) -> None:
+    """세션에 보관된 생성 결과와 저장·다시 생성 버튼"""
+    sms, success, sms_request = result["sms"], result["success"], result["request"]
+    school, target, category = sms_request["school"], sms_request["target"], sms_request["category"]
+    style_option, length_option = sms_request["style_option"], sms_request["length_option"]
+    from_template = result["source"] in ("template", "template_fallback")
+    
+    if not success:
+        st.error(sms)
+        return
+    
+    if isinstance(sms, list):
+        st.success(f"✅ {len(sms)}개의 후보 문자가 생성되었습니다! 마음에 드는 문자를 골라 저장하세요.")
+        
+        # 후보를 나란히 표시
+        candidate_cols = st.columns(len(sms))
+        for i, (candidate_col, candidate) in enumerate(zip(candidate_cols, sms), start=1):
+            with candidate_col:
+                st.text_area(
+                    f"후보 {i}",
+                    value=candidate,
+                    height=150,
+                    key=f"ai_candidate_{result['id']}_{i}"
+                )
+                st.caption(
+                    f"글자 수: {len(candidate)}자 ({sms_byte_length(candidate)}바이트) | "
+                    f"문자 유형: {classify_sms(candidate)}"
+                )
+                for issue in validate_sms(candidate, sms_request)["issues"]:
+                    st.caption(f"⚠️ {issue['message']}")
+                st.button(
+                    "💾 이 문자 저장",
+                    key=f"save_candidate_{i}",
+                    on_click=save_to_history,
+                    args=(school, target, category, candidate, style_option, length_option)
+                )
+    
+    else:
+        if result["source"] == "suggestion":
+            st.success("✅ 비슷한 이전 요청의 문자를 사용했습니다! (API 호출 없음)")
+        elif result["source"] == "template":
+            st.success("✅ 템플릿으로 문자를 작성했습니다! (API 호출 없음) AI 문자가 필요하면 아래 'AI 문자로 바꾸기'를 누르세요.")
+        elif from_template:
+            st.warning("⚠️ AI 응답을 받지 못해 템플릿으로 문자를 작성했습니다. 잠시 후 'AI 문자로 바꾸기'를 다시 시도해 보세요.")
+        else:
+            st.success("✅ AI 문자가 생성되었습니다!")
+        
+        # 결과 표시
+        result_col1, result_col2 = st.columns([2, 1])
+        with result_col1:
+            st.text_area(
+                "생성된 문자",
+                value=sms,
+                height=150,
+                key=f"ai_generated_sms_{result['id']}"
+            )
+            # 자동 수정 후에도 남은 문제는 직접 고칠 수 있도록 안내
+            report = validate_sms(sms, sms_request)
+            for issue in report["issues"]:
+                st.warning(f"⚠️ {issue['message']}")
+        
+        with result_col2:
+            st.metric("글자 수", f"{len(sms)}자", help=f"{report['byte_length']}바이트 (한글 2바이트, 영문·숫자 1바이트)")
+            sms_type = report["sms_type"]
+            st.metric("문자 유형", sms_type, help="통신사 기준 90바이트 이하는 단문(SMS), 초과는 장문(LMS)")
+            
+            # 예상 비용 (참고용, 발송 탭과 같은 건당 요금)
+            st.metric("예상 비용", f"약 {dispatch_cost({sms_type: 1}, unit_costs):,.0f}원")
+    
+    # 추가 작업 옵션
+    st.markdown("---")
+    action_col1, action_col2, action_col3 = st.columns(3)
+    
+    with action_col1:
+        if from_template:
+            st.button(
+                "🤖 AI 문자로 바꾸기",
+                on_click=lambda: st.session_state.update(ai_requested=True),
+                help="같은 입력으로 AI 문자를 생성합니다"
+            )
+        else:
+            st.button(
+                "🔄 다시 생성",
+                on_click=lambda: st.session_state.update(regenerate_sms=True),
+                help="캐시된 결과를 사용하지 않고 새로 생성합니다"
+            )
+        st.button("🗑️ 결과 지우기", key="generation_clear", on_click=lambda: st.session_state.pop("generation_result", None))
+    
+    with action_col2:
+        # 생성 이력 저장 (후보가 여러 개면 각 후보의 저장 버튼 사용)
+        if not isinstance(sms, list):
+            st.button(
+                "💾 이력 저장",
+                on_click=save_to_history,
+                args=(school, target, category, sms, style_option, length_option)
+            )
+            st.button(
+                "📤 발송 목록에 추가",
+                on_click=queue_for_dispatch,
+                args=([{"school": school, "target": target, "category": category, "content": sms}],)
+            )
+    
+    with action_col3:
+        # 입력값을 채운 템플릿 문자 보기
+        with st.expander("📋 템플릿 문자 보기"):
+            st.text(render_template(sms_request) or "해당 카테고리의 템플릿이 없습니다.")
+
+# 각 탭은 독립 fragment라 탭 안의 위젯을 바꾸면 그 탭만 다시 그림 (사이드바 변경은 전체 재실행)
+@timed_fragment("generate")
+def render_generate_tab(school_name: str, date_str: str) -> None:
+    """AI 문자 생성 탭"""
+    refresh_after_history_change()
     st.subheader("✨ AI 기반 스마트 문자 생성")
     
+    # 대상·카테고리·커스텀 톤은 아래 입력 칸 구성을 바꾸므로 폼 밖에서 바로 반영
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -205,163 +544,201 @@ with tab1:
             ["안전", "재난", "체험학습", "행사 안내", "상담", "안내"],
             help="문자의 주요 목적을 선택하세요"
         )
-        
-        # 주요 내용
-        content_details = st.text_area(
-            "주요 내용",
-            placeholder="예: 내일 오전 강한 비 예상, 우산 준비 및 등하교 시 안전 주의 필요",
-            height=100,
-            help="전달하고자 하는 핵심 내용을 자유롭게 작성하세요"
-        )
-        
+    
     with col2:
         # 추가 정보
         st.markdown("### 🔧 추가 정보 (선택사항)")
+        custom_tone = st.checkbox("커스텀 톤 사용")
+    
+    # 나머지 입력은 폼으로 묶어 입력하는 동안에는 재실행하지 않고 생성 버튼을 누를 때 한 번에 반영
+    with st.form("generate_form", border=False):
+        form_col1, form_col2 = st.columns([1, 1])
         
-        additional_info = {}
+        with form_col1:
+            # 주요 내용
+            content_details = st.text_area(
+                "주요 내용",
+                placeholder="예: 내일 오전 강한 비 예상, 우산 준비 및 등하교 시 안전 주의 필요",
+                height=100,
+                help="전달하고자 하는 핵심 내용을 자유롭게 작성하세요"
+            )
         
-        if category == "체험학습":
-            additional_info["장소"] = st.text_input("장소", placeholder="예: 국립과학관", key="single_place")
-            additional_info["준비물"] = st.text_input("준비물", placeholder="예: 도시락, 물, 우산", key="single_prep")
-            additional_info["학년"] = st.text_input("대상 학년", placeholder="예: 3학년", key="single_grade")
-            
-        elif category == "행사 안내":
-            additional_info["행사명"] = st.text_input("행사명", placeholder="예: 가을 축제", key="single_event")
-            additional_info["장소"] = st.text_input("장소", placeholder="예: 운동장", key="single_event_place")
-            additional_info["참가 대상"] = st.text_input("참가 대상", placeholder="예: 전교생", key="single_participants")
-            
-        elif category == "상담":
-            additional_info["상담 유형"] = st.selectbox("상담 유형", ["학부모 상담", "진로 상담", "학습 상담"], key="single_consult_type")
-            additional_info["신청 방법"] = st.text_input("신청 방법", placeholder="예: 담임교사에게 신청", key="single_apply")
-            additional_info["기한"] = st.text_input("신청 기한", placeholder="예: 11월 20일까지", key="single_deadline")
-            
-        elif category == "안전":
-            additional_info["위험 요소"] = st.text_input("위험 요소", placeholder="예: 빗길 미끄러움", key="single_danger")
-            additional_info["주의 구역"] = st.text_input("주의 구역", placeholder="예: 정문 앞 횡단보도", key="single_caution")
+        with form_col2:
+            additional_info = {}
             
-        elif category == "재난":
-            additional_info["재난 유형"] = st.selectbox("재난 유형", ["태풍", "폭우", "폭설", "지진", "화재"], key="single_disaster_type")
-            additional_info["대응 방법"] = st.text_input("대응 방법", placeholder="예: 실내 대피", key="single_response")
+            if category == "체험학습":
+                additional_info["장소"] = st.text_input("장소", placeholder="예: 국립과학관", key="single_place")
+                additional_info["준비물"] = st.text_input("준비물", placeholder="예: 도시락, 물, 우산", key="single_prep")
+                additional_info["학년"] = st.text_input("대상 학년", placeholder="예: 3학년", key="single_grade")
+                
+            elif category == "행사 안내":
+                additional_info["행사명"] = st.text_input("행사명", placeholder="예: 가을 축제", key="single_event")
+                additional_info["장소"] = st.text_input("장소", placeholder="예: 운동장", key="single_event_place")
+                additional_info["참가 대상"] = st.text_input("참가 대상", placeholder="예: 전교생", key="single_participants")
+                
+            elif category == "상담":
+                additional_info["상담 유형"] = st.selectbox("상담 유형", ["학부모 상담", "진로 상담", "학습 상담"], key="single_consult_type")
+                additional_info["신청 방법"] = st.text_input("신청 방법", placeholder="예: 담임교사에게 신청", key="single_apply")
+                additional_info["기한"] = st.text_input("신청 기한", placeholder="예: 11월 20일까지", key="single_deadline")
+                
+            elif category == "안전":
+                additional_info["위험 요소"] = st.text_input("위험 요소", placeholder="예: 빗길 미끄러움", key="single_danger")
+                additional_info["주의 구역"] = st.text_input("주의 구역", placeholder="예: 정문 앞 횡단보도", key="single_caution")
+                
+            elif category == "재난":
+                additional_info["재난 유형"] = st.selectbox("재난 유형", ["태풍", "폭우", "폭설", "지진", "화재"], key="single_disaster_type")
+                additional_info["대응 방법"] = st.text_input("대응 방법", placeholder="예: 실내 대피", key="single_response")
+                
+            else:  # 일반 안내
+                additional_info["문의처"] = st.text_input("문의처", placeholder="예: 교무실 02-123-4567", key="single_contact")
+                additional_info["참고 사항"] = st.text_input("참고 사항", placeholder="예: 자세한 내용은 홈페이지 참조", key="single_reference")
             
-        else:  # 일반 안내
-            additional_info["문의처"] = st.text_input("문의처", placeholder="예: 교무실 02-123-4567", key="single_contact")
-            additional_info["참고 사항"] = st.text_input("참고 사항", placeholder="예: 자세한 내용은 홈페이지 참조", key="single_reference")
+            # 커스텀 톤 설정
+            if custom_tone:
+                tone_guide = st.text_input(
+                    "톤 가이드",
+                    placeholder="예: 긴급하고 단호한 톤으로 작성",
+                    key="single_tone"
+                )
+            else:
+                tone_guide = ""
         
-        # 커스텀 톤 설정
-        custom_tone = st.checkbox("커스텀 톤 사용")
-        if custom_tone:
-            tone_guide = st.text_input(
-                "톤 가이드",
-                placeholder="예: 긴급하고 단호한 톤으로 작성",
-                key="single_tone"
+        # 문자 옵션 설정
+        st.markdown("### ⚙️ 문자 옵션")
+        option_col1, option_col2, option_col3 = st.columns(3)
+        
+        with option_col1:
+            length_option = st.selectbox(
+                "문자 길이",
+                ["매우 짧게", "짧게", "표준", "길게", "매우 길게"],
+                index=2,  # 기본값: 표준
+                help="매우 짧게(40자), 짧게(60자), 표준(80자), 길게(120자), 매우 길게(180자)"
             )
-        else:
-            tone_guide = ""
-    
-    # 문자 옵션 설정
-    st.markdown("### ⚙️ 문자 옵션")
-    option_col1, option_col2 = st.columns(2)
-    
-    with option_col1:
-        length_option = st.selectbox(
-            "문자 길이",
-            ["매우 짧게", "짧게", "표준", "길게", "매우 길게"],
-            index=2,  # 기본값: 표준
-            help="매우 짧게(40자), 짧게(60자), 표준(80자), 길게(120자), 매우 길게(180자)"
+        
+        with option_col2:
+            style_option = st.selectbox(
+                "문자 스타일",
+                ["기본", "친근함", "긴급함", "공식적", "안내형"],
+                help="상황에 맞는 문체를 선택하세요"
+            )
+        
+        with option_col3:
+            candidate_count = st.selectbox(
+                "후보 개수",
+                [1, 2, 3],
+                help="여러 후보를 한 번의 요청으로 받아 나란히 비교합니다"
+            )
+        
+        stream_output = st.checkbox(
+            "⚡ 실시간 표시",
+            value=True,
+            help="문자가 생성되는 동안 작성 중인 내용을 바로 보여줍니다 (후보 1개일 때만 적용)"
         )
-    
-    with option_col2:
-        style_option = st.selectbox(
-            "문자 스타일",
-            ["기본", "친근함", "긴급함", "공식적", "안내형"],
-            help="상황에 맞는 문체를 선택하세요"
+        template_first = st.checkbox(
+            "🚨 재난·안전은 템플릿으로 즉시 작성",
+            value=True,
+            help="API를 호출하지 않고 입력한 정보로 템플릿 문자를 바로 만듭니다. 결과 아래 'AI 문자로 바꾸기'로 AI 문자를 받을 수 있습니다"
         )
+        
+        # 생성 버튼
+        col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
+        with col_btn2:
+            generate_btn = st.form_submit_button("🎯 AI 문자 생성", type="primary", use_container_width=True)
+    
+    # "다시 생성" 요청이면 캐시를 건너뛰고 새로 생성
+    regenerate = st.session_state.pop("regenerate_sms", False)
+    # 비슷한 이전 요청의 문자 제안에 대한 선택 ("accept": 제안 문자 사용, "skip": 새로 생성)
+    suggestion_choice = st.session_state.pop("suggestion_choice", None)
+    # 템플릿 결과를 AI 문자로 바꿔 달라는 요청
+    ai_requested = st.session_state.pop("ai_requested", False)
     
-    # 생성 버튼
-    col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
-    with col_btn2:
-        generate_btn = st.button("🎯 AI 문자 생성", type="primary", use_container_width=True)
+    sms_request = {
+        "target": target,
+        "category": category,
+        "content_details": content_details,
+        "date": date_str,
+        "school": school_name,
+        "additional_info": additional_info,
+        "tone_guide": tone_guide,
+        "length_option": length_option,
+        "style_option": style_option
+    }
+    # 재난·안전은 템플릿으로 바로 작성 (다시 생성하거나 AI 문자를 요청하면 AI로 생성)
+    use_template = (
+        template_first and category in TEMPLATE_FAST_PATH_CATEGORIES and candidate_count == 1
+        and not (regenerate or ai_requested or suggestion_choice)
+    )
+    # 새로 생성하기 전에 비슷한 이전 요청의 문자를 먼저 제안 (후보 여러 개를 비교할 때는 제외)
+    suggestion = None
+    if generate_btn and content_details and candidate_count == 1 and not use_template:
+        suggestion = similar_requests().suggest(sms_request)
     
-    if generate_btn:
+    if suggestion:
+        st.session_state.sms_suggestion = suggestion
+        st.info(
+            f"💡 비슷한 이전 요청으로 만든 문자가 있습니다 (유사도 {suggestion['similarity']:.0%}): "
+            f"{suggestion['source_text']}"
+        )
+        st.text_area("제안 문자", value=suggestion["message"], height=150, disabled=True, key="suggested_sms")
+        st.caption(
+            f"글자 수: {len(suggestion['message'])}자 ({sms_byte_length(suggestion['message'])}바이트) | "
+            f"학교명과 날짜는 현재 입력으로 바꿨습니다"
+        )
+        suggestion_col1, suggestion_col2 = st.columns(2)
+        with suggestion_col1:
+            st.button(
+                "✅ 제안 문자 사용",
+                type="primary",
+                on_click=lambda: st.session_state.update(suggestion_choice="accept"),
+                help="API를 호출하지 않고 이 문자를 사용합니다"
+            )
+        with suggestion_col2:
+            st.button("🆕 새로 생성", on_click=lambda: st.session_state.update(suggestion_choice="skip"))
+        return
+    
+    if generate_btn or regenerate or suggestion_choice or ai_requested:
         if content_details:
-            with st.spinner("AI가 문자를 생성하고 있습니다..."):
-                sms, success = generate_ai_sms(
-                    client=client,
-                    target=target,
-                    category=category,
-                    content_details=content_details,
-                    date=date_str,
-                    school=school_name,
-                    additional_info=additional_info,
-                    tone_guide=tone_guide,
-                    length_option=length_option,
-                    style_option=style_option
-                )
-                
-            if success:
-                st.success("✅ AI 문자가 생성되었습니다!")
-                
-                # 결과 표시
-                result_col1, result_col2 = st.columns([2, 1])
-                
-                with result_col1:
-                    st.text_area(
-                        "생성된 문자",
-                        value=sms,
-                        height=150,
-                        key="ai_generated_sms"
-                    )
-                
-                with result_col2:
-                    st.metric("글자 수", f"{len(sms)}자")
-                    sms_type = "단문(SMS)" if len(sms) <= 80 else "장문(LMS)"
-                    st.metric("문자 유형", sms_type)
-                    
-                    # 예상 비용 (참고용)
-                    if sms_type == "단문(SMS)":
-                        cost = "약 20원"
-                    else:
-                        cost = "약 30-50원"
-                    st.metric("예상 비용", cost)
-                
-                # 추가 작업 옵션
-                st.markdown("---")
-                action_col1, action_col2, action_col3 = st.columns(3)
-                
-                with action_col1:
-                    if st.button("🔄 다시 생성"):
-                        st.rerun()
-                
-                with action_col2:
-                    # 생성 이력 저장 (세션 스테이트)
-                    if st.button("💾 이력 저장"):
-                        if "sms_history" not in st.session_state:
-                            st.session_state.sms_history = []
-                        
-                        st.session_state.sms_history.append({
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "target": target,
-                            "category": category,
-                            "content": sms,
-                            "length": len(sms),
-                            "style": style_option,
-                            "length_option": length_option
-                        })
-                        st.success("이력에 저장되었습니다!")
-                
-                with action_col3:
-                    # 예제 보기
-                    with st.expander("📋 예제 템플릿 보기"):
-                        if target in EXAMPLE_TEMPLATES and category in EXAMPLE_TEMPLATES[target]:
-                            st.text(EXAMPLE_TEMPLATES[target][category])
-                        else:
-                            st.text("해당 카테고리의 예제가 없습니다.")
+            accepted = st.session_state.pop("sms_suggestion", None) if suggestion_choice == "accept" else None
+            
+            if accepted:
+                set_generation_result({"sms": accepted["message"], "success": True, "source": "suggestion"}, sms_request)
+            elif use_template:
+                set_generation_result({"sms": render_template(sms_request), "success": True, "source": "template"}, sms_request)
             else:
-                st.error(sms)
+                # API 호출은 백그라운드 작업으로 넘기고 바로 돌아옴 (입력을 바꿔 재실행해도 생성은 계속됨)
+                cancel_generation_job()
+                st.session_state.pop("generation_result", None)
+                job_id = generation_queue.submit(
+                    functools.partial(
+                        generate_in_background,
+                        client=get_openai_client(api_key),
+                        index=similar_requests(),
+                        sms_request=sms_request,
+                        candidates=candidate_count,
+                        stream=stream_output,
+                        use_cache=not regenerate
+                    ),
+                    label=f"{school_name} {target} {category}"
+                )
+                st.session_state.generation_job = {"id": job_id, "request": sms_request}
         else:
             st.warning("⚠️ 주요 내용을 입력해주세요.")
+    
+    # 끝난 작업 결과를 세션으로 옮기고, 진행 중이면 상태를 주기적으로 갱신해 표시
+    collect_generation_job()
+    job = st.session_state.get("generation_job")
+    if job:
+        st.fragment(run_every=JOB_POLL_INTERVAL_S)(render_generation_progress)(job["id"])
+    
+    # 결과는 세션에 남아 있으므로 저장·다른 입력 변경으로 재실행해도 다시 생성하지 않고 표시
+    result = st.session_state.get("generation_result")
+    if result:
+        render_generation_result(result)
 
-with tab2:
+@timed_fragment("scenario")
+def render_scenario_tab(school_name: str, date_str: str) -> None:
+    """시나리오별 일괄 생성 탭"""
+    refresh_after_history_change()
     st.subheader("🚀 시나리오별 일괄 생성")
     st.markdown("자주 사용하는 시나리오를 선택하면 대상별로 적절한 문자를 한 번에 생성합니다.")
     
@@ -383,92 +760,161 @@ with tab2:
     with info_col3:
         st.info(f"📝 기본 내용: {scenario_info['base_content']}")
     
-    # 세부 내용 입력
-    st.markdown("### 📝 세부 내용 입력")
+    # 시나리오 일괄 생성과 대량 작업 제출이 같은 입력을 쓰므로 한 폼으로 묶어 버튼을 누를 때 한 번에 반영
+    with st.form("batch_form", border=False):
+        # 세부 내용 입력
+        st.markdown("### 📝 세부 내용 입력")
     
-    detail_content = st.text_area(
-        "구체적인 내용",
-        placeholder=f"{scenario_info['base_content']}에 대한 구체적인 내용을 입력하세요...",
-        height=100
-    )
+        detail_content = st.text_area(
+            "구체적인 내용",
+            placeholder=f"{scenario_info['base_content']}에 대한 구체적인 내용을 입력하세요...",
+            height=100
+        )
     
-    # 시나리오별 추가 정보
-    batch_additional_info = {}
+        # 시나리오별 추가 정보
+        batch_additional_info = {}
     
-    # 일괄 생성 옵션 설정
-    st.markdown("### ⚙️ 일괄 생성 옵션")
-    batch_col1, batch_col2 = st.columns(2)
+        # 일괄 생성 옵션 설정
+        st.markdown("### ⚙️ 일괄 생성 옵션")
+        batch_col1, batch_col2 = st.columns(2)
     
-    with batch_col1:
-        batch_length = st.selectbox(
-            "문자 길이",
-            ["매우 짧게", "짧게", "표준", "길게", "매우 길게"],
-            index=2,
-            key="batch_length"
-        )
+        with batch_col1:
+            batch_length = st.selectbox(
+                "문자 길이",
+                ["매우 짧게", "짧게", "표준", "길게", "매우 길게"],
+                index=2,
+                key="batch_length"
+            )
     
-    with batch_col2:
-        batch_style = st.selectbox(
-            "문자 스타일",
-            ["기본", "친근함", "긴급함", "공식적", "안내형"],
-            key="batch_style"
+        with batch_col2:
+            batch_style = st.selectbox(
+                "문자 스타일",
+                ["기본", "친근함", "긴급함", "공식적", "안내형"],
+                key="batch_style"
+            )
+    
+        batch_structured = st.checkbox(
+            "🧩 모든 대상을 한 번의 요청으로 생성",
+            value=True,
+            key="batch_structured",
+            help="대상별 문자를 JSON 응답 한 번으로 받아 요청 수와 토큰을 줄입니다. 빠지거나 형식이 틀린 대상만 따로 다시 생성합니다."
         )
     
-    if scenario == "등하교 안전 안내":
-        batch_additional_info["날씨 상황"] = st.text_input("날씨 상황", placeholder="예: 강한 비, 눈", key="batch_weather")
-        batch_additional_info["주의 사항"] = st.text_input("특별 주의 사항", placeholder="예: 우산 지참, 미끄러운 길 주의", key="batch_caution")
+        if scenario == "등하교 안전 안내":
+            batch_additional_info["날씨 상황"] = st.text_input("날씨 상황", placeholder="예: 강한 비, 눈", key="batch_weather")
+            batch_additional_info["주의 사항"] = st.text_input("특별 주의 사항", placeholder="예: 우산 지참, 미끄러운 길 주의", key="batch_caution")
         
-    elif scenario == "현장체험학습 안내":
-        col1, col2 = st.columns(2)
-        with col1:
-            batch_additional_info["장소"] = st.text_input("체험학습 장소", placeholder="예: 국립과학관", key="batch_field_place")
-            batch_additional_info["학년"] = st.text_input("대상 학년", placeholder="예: 3학년", key="batch_field_grade")
-        with col2:
-            batch_additional_info["준비물"] = st.text_input("준비물", placeholder="예: 도시락, 물", key="batch_field_prep")
-            batch_additional_info["집합 시간"] = st.text_input("집합 시간", placeholder="예: 오전 8시 30분", key="batch_field_time")
+        elif scenario == "현장체험학습 안내":
+            col1, col2 = st.columns(2)
+            with col1:
+                batch_additional_info["장소"] = st.text_input("체험학습 장소", placeholder="예: 국립과학관", key="batch_field_place")
+                batch_additional_info["학년"] = st.text_input("대상 학년", placeholder="예: 3학년", key="batch_field_grade")
+            with col2:
+                batch_additional_info["준비물"] = st.text_input("준비물", placeholder="예: 도시락, 물", key="batch_field_prep")
+                batch_additional_info["집합 시간"] = st.text_input("집합 시간", placeholder="예: 오전 8시 30분", key="batch_field_time")
     
-    elif scenario == "학교 행사 안내":
-        batch_additional_info["행사명"] = st.text_input("행사명", placeholder="예: 가을 축제", key="batch_event_name")
-        batch_additional_info["장소"] = st.text_input("행사 장소", placeholder="예: 운동장", key="batch_event_place")
+        elif scenario == "학교 행사 안내":
+            batch_additional_info["행사명"] = st.text_input("행사명", placeholder="예: 가을 축제", key="batch_event_name")
+            batch_additional_info["장소"] = st.text_input("행사 장소", placeholder="예: 운동장", key="batch_event_place")
+        
+        elif scenario == "상담 주간 안내":
+            batch_additional_info["상담 기간"] = st.text_input("상담 기간", placeholder="예: 11월 20일 ~ 24일", key="batch_consult_period")
+            batch_additional_info["신청 방법"] = st.text_input("신청 방법", placeholder="예: 담임교사에게 신청", key="batch_consult_apply")
+    
+        
+        # 교육청 단위 대량 사전 생성
+        with st.expander("🏫 교육청 단위 여러 학교 생성"):
+            st.caption(
+                "여러 학교의 시나리오 문자를 한 번에 만듭니다. 위에서 선택한 시나리오, 세부 내용, 옵션이 그대로 사용됩니다."
+            )
+            st.caption(
+                "• 학교명만 바꿔 즉시 생성: 학교 수와 관계없이 대상별 문자를 한 번만 생성한 뒤 학교명을 바꿔 넣어 "
+                "학교별 문자표를 만듭니다. 학교마다 글자·바이트 수를 다시 확인합니다.\n"
+                f"• 배치 작업 제출: 학교마다 {len(scenario_info['targets'])}개 대상의 문자를 따로 생성하고, 결과는 완료 후 "
+                "생성 이력에 저장됩니다."
+            )
+            
+            bulk_school_text = st.text_area(
+                "학교 목록 (한 줄에 한 학교)",
+                placeholder="○○초등학교\n△△중학교",
+                height=120,
+                key="bulk_schools"
+            )
+            
+            bulk_backend_name = st.radio(
+                "실행 방식",
+                ["openai", "local"],
+                format_func=lambda name: {
+                    "openai": "OpenAI Batch (배치 요금, 최대 24시간)",
+                    "local": "로컬 실행 (일반 API, 테스트·소규모용)"
+                }[name],
+                horizontal=True,
+                key="bulk_backend"
+            )
         
-    elif scenario == "상담 주간 안내":
-        batch_additional_info["상담 기간"] = st.text_input("상담 기간", placeholder="예: 11월 20일 ~ 24일", key="batch_consult_period")
-        batch_additional_info["신청 방법"] = st.text_input("신청 방법", placeholder="예: 담임교사에게 신청", key="batch_consult_apply")
+        # 일괄 생성 버튼
+        submit_col1, submit_col2, submit_col3 = st.columns(3)
+        with submit_col1:
+            batch_btn = st.form_submit_button("🚀 시나리오 일괄 생성", type="primary")
+        with submit_col2:
+            fanout_btn = st.form_submit_button("🏫 학교명만 바꿔 즉시 생성")
+        with submit_col3:
+            bulk_btn = st.form_submit_button("📦 배치 작업 제출")
+    
+    generate_scenario_sms = generate_multi_target_sms if batch_structured else generate_batch_sms
     
-    # 일괄 생성 버튼
-    if st.button("🚀 시나리오 일괄 생성", type="primary"):
+    if batch_btn:
         if detail_content:
             generated_messages = []
             progress_bar = st.progress(0)
             status_text = st.empty()
             
             targets = scenario_info['targets']
+            batch_requests = [
+                {
+                    "target": target,
+                    "category": scenario_info['category'],
+                    "content_details": detail_content,
+                    "date": date_str,
+                    "school": school_name,
+                    "additional_info": batch_additional_info,
+                    "tone_guide": "",
+                    "length_option": batch_length,
+                    "style_option": batch_style,
+                    "cache": sms_cache,
+                    "guard": api_guard,
+                    "telemetry": telemetry
+                }
+                for target in targets
+            ]
             
-            for i, target in enumerate(targets):
-                status_text.text(f"{target}용 문자 생성 중...")
-                
-                sms, success = generate_ai_sms(
-                    client=client,
-                    target=target,
-                    category=scenario_info['category'],
-                    content_details=detail_content,
-                    date=date_str,
-                    school=school_name,
-                    additional_info=batch_additional_info,
-                    tone_guide="",
-                    length_option=batch_length,
-                    style_option=batch_style
-                )
-                
+            status_text.text(f"{', '.join(targets)}용 문자 {'한 번에' if batch_structured else '동시'} 생성 중...")
+            results = {}
+            
+            # 시나리오 일괄 생성은 같은 학교의 일괄 작업으로 스케줄링 (다른 세션의 단일 생성이 먼저)
+            with scheduling(tenant=school_name, priority=BATCH):
+                for completed, (idx, sms, success) in enumerate(
+                    generate_scenario_sms(get_openai_client(api_key), batch_requests, max_concurrency=batch_max_concurrency), start=1
+                ):
+                    results[idx] = (sms, success, is_template_fallback(sms, success, batch_requests[idx]))
+                    status_text.text(f"{targets[idx]}용 문자 생성 완료 ({completed}/{len(targets)})")
+                    progress_bar.progress(completed / len(targets))
+            
+            # 템플릿으로 대체한 문자는 이전 AI 문자로 제안하지 않음
+            similar_requests().add_many(
+                (batch_requests[idx], sms) for idx, (sms, success, from_template) in results.items() if success and not from_template
+            )
+            
+            # 완료 순서와 관계없이 시나리오의 대상 순서대로 정리
+            for idx, target in enumerate(targets):
+                sms, success, from_template = results[idx]
                 if success:
                     generated_messages.append({
                         "target": target,
                         "content": sms,
-                        "length": len(sms)
+                        "length": len(sms),
+                        "source": "template_fallback" if from_template else "ai"
                     })
-                
-                progress_bar.progress((i + 1) / len(targets))
-                time.sleep(0.5)  # API 호출 간격
             
             status_text.empty()
             progress_bar.empty()
@@ -476,10 +922,17 @@ with tab2:
             # 결과 표시
             if generated_messages:
                 st.success(f"✅ {len(generated_messages)}개의 문자가 생성되었습니다!")
+                template_targets = [msg["target"] for msg in generated_messages if msg["source"] == "template_fallback"]
+                if template_targets:
+                    st.warning(
+                        f"⚠️ AI 응답을 받지 못해 {', '.join(template_targets)}용 문자는 템플릿으로 작성했습니다. "
+                        "잠시 후 다시 생성해 보세요."
+                    )
                 
                 # 각 대상별 문자 표시
                 for msg in generated_messages:
-                    with st.expander(f"📱 {msg['target']}용 문자 ({msg['length']}자)"):
+                    source_label = " · 템플릿" if msg["source"] == "template_fallback" else ""
+                    with st.expander(f"📱 {msg['target']}용 문자 ({msg['length']}자{source_label})"):
                         st.text_area(
                             "",
                             value=msg['content'],
@@ -489,7 +942,7 @@ with tab2:
                         
                         col1, col2 = st.columns([3, 1])
                         with col1:
-                            st.caption(f"문자 유형: {'단문(SMS)' if msg['length'] <= 80 else '장문(LMS)'}")
+                            st.caption(f"문자 유형: {classify_sms(msg['content'])} ({sms_byte_length(msg['content'])}바이트)")
                         with col2:
                             if st.button("📋 복사", key=f"copy_{msg['target']}"):
                                 st.info("텍스트를 선택 후 Ctrl+C로 복사하세요")
@@ -500,69 +953,742 @@ with tab2:
                     for msg in generated_messages
                 ])
                 
+                download_col, dispatch_col = st.columns(2)
+                with download_col:
+                    st.download_button(
+                        label="📥 전체 문자 다운로드",
+                        data=all_messages,
+                        file_name=f"{scenario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                        mime="text/plain"
+                    )
+                with dispatch_col:
+                    st.button(
+                        "📤 전체를 발송 목록에 추가",
+                        key="batch_dispatch",
+                        on_click=queue_for_dispatch,
+                        args=([
+                            {"school": school_name, "target": msg["target"], "category": scenario_info["category"], "content": msg["content"]}
+                            for msg in generated_messages
+                        ],)
+                    )
+        else:
+            st.warning("⚠️ 구체적인 내용을 입력해주세요.")
+
+    bulk_schools = list(dict.fromkeys(line.strip() for line in bulk_school_text.splitlines() if line.strip()))
+    
+    # 여러 학교: 대상별로 한 번만 생성하고 학교명은 로컬에서 치환
+    if fanout_btn:
+        if not detail_content:
+            st.warning("⚠️ 위에서 구체적인 내용을 입력해주세요.")
+        elif not bulk_schools:
+            st.warning("⚠️ 학교 목록을 입력해주세요.")
+        else:
+            targets = scenario_info['targets']
+            fanout_requests = [
+                {
+                    "target": target,
+                    "category": scenario_info['category'],
+                    "content_details": detail_content,
+                    "date": date_str,
+                    "school": SCHOOL_PLACEHOLDER,
+                    "additional_info": batch_additional_info,
+                    "tone_guide": "",
+                    "length_option": batch_length,
+                    "style_option": batch_style,
+                    "cache": sms_cache,
+                    "guard": api_guard,
+                    "telemetry": telemetry
+                }
+                for target in targets
+            ]
+            
+            # 요청의 학교명은 자리 표시자이므로 입력한 학교로 스케줄링
+            with st.spinner(f"{', '.join(targets)}용 문자 생성 중..."), scheduling(tenant=school_name, priority=BATCH):
+                results = {
+                    idx: (sms, success)
+                    for idx, sms, success in generate_scenario_sms(get_openai_client(api_key), fanout_requests, max_concurrency=batch_max_concurrency)
+                }
+            generated = [(fanout_requests[idx], results[idx][0]) for idx in range(len(targets)) if results[idx][1]]
+            template_targets = {
+                request["target"] for request, sms in generated if is_template_fallback(sms, True, request)
+            }
+            # 템플릿으로 대체한 문자는 이전 AI 문자로 제안하지 않고, 표에 출처를 표시
+            similar_requests().add_many((request, sms) for request, sms in generated if request["target"] not in template_targets)
+            rows = fan_out_schools(generated, bulk_schools)
+            for row in rows:
+                row["source"] = "template_fallback" if row["target"] in template_targets else "ai"
+            st.session_state.fanout_result = {
+                "scenario": scenario,
+                "rows": rows,
+                "failed_targets": [target for idx, target in enumerate(targets) if not results[idx][1]],
+                "template_targets": [target for target in targets if target in template_targets]
+            }
+    
+    fanout_result = st.session_state.get("fanout_result")
+    if fanout_result:
+        import pandas as pd
+        
+        fanout_df = pd.DataFrame(fanout_result["rows"])
+        if fanout_result["failed_targets"]:
+            st.warning(f"⚠️ {', '.join(fanout_result['failed_targets'])}용 문자는 생성하지 못했습니다.")
+        if fanout_result["template_targets"]:
+            st.warning(
+                f"⚠️ AI 응답을 받지 못해 {', '.join(fanout_result['template_targets'])}용 문자는 템플릿으로 작성했습니다 "
+                "('출처' 열). 템플릿 문자는 생성 이력에 저장하지 않습니다."
+            )
+        if not fanout_df.empty:
+            flagged = int((fanout_df["issues"] != "").sum())
+            st.success(
+                f"✅ {fanout_df['school'].nunique()}개 학교 × {fanout_df['target'].nunique()}개 대상, "
+                f"{len(fanout_df)}개의 문자를 만들었습니다."
+            )
+            if flagged:
+                st.warning(f"⚠️ {flagged}개 문자가 길이 기준 등을 벗어났습니다 (학교명 길이에 따라 달라짐). '확인 필요' 열을 확인하세요.")
+            
+            export_df = fanout_df.assign(
+                source=fanout_df["source"].map({"ai": "AI", "template_fallback": "템플릿"})
+            )[["school", "target", "source", "content", "length", "byte_length", "sms_type", "issues"]].rename(columns={
+                "school": "학교",
+                "target": "대상",
+                "source": "출처",
+                "content": "문자",
+                "length": "글자 수",
+                "byte_length": "바이트",
+                "sms_type": "문자 유형",
+                "issues": "확인 필요"
+            })
+            st.dataframe(export_df, use_container_width=True, hide_index=True)
+            
+            fanout_col1, fanout_col2, fanout_col3, fanout_col4 = st.columns(4)
+            with fanout_col1:
                 st.download_button(
-                    label="📥 전체 문자 다운로드",
-                    data=all_messages,
-                    file_name=f"{scenario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                    mime="text/plain"
+                    "📥 학교별 문자표 (CSV)",
+                    data=export_df.to_csv(index=False).encode("utf-8-sig"),
+                    file_name=f"{fanout_result['scenario']}_학교별_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv"
                 )
+            with fanout_col2:
+                if st.button("💾 생성 이력에 저장", key="fanout_save"):
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    saved = history_store.add_many(
+                        dict(row, timestamp=timestamp) for row in fanout_result["rows"] if row["source"] == "ai"
+                    )
+                    del st.session_state["fanout_result"]
+                    notify_history_change(f"✅ {saved}개의 문자가 생성 이력에 저장되었습니다!")
+                    st.rerun()
+            with fanout_col3:
+                st.button(
+                    "📤 발송 목록에 추가",
+                    key="fanout_dispatch",
+                    on_click=queue_for_dispatch,
+                    args=([
+                        {"school": row["school"], "target": row["target"], "category": row["category"], "content": row["content"]}
+                        for row in fanout_result["rows"]
+                    ],)
+                )
+            with fanout_col4:
+                if st.button("🗑️ 결과 지우기", key="fanout_clear"):
+                    del st.session_state["fanout_result"]
+                    st.rerun()
+    
+    # 교육청 단위 대량 사전 생성
+    if bulk_btn:
+        if not detail_content:
+            st.warning("⚠️ 위에서 구체적인 내용을 입력해주세요.")
+        elif not bulk_schools:
+            st.warning("⚠️ 학교 목록을 입력해주세요.")
         else:
-            st.warning("⚠️ 구체적인 내용을 입력해주세요.")
+            bulk_requests = [
+                {
+                    "target": target,
+                    "category": scenario_info['category'],
+                    "content_details": detail_content,
+                    "date": date_str,
+                    "school": school,
+                    "additional_info": batch_additional_info,
+                    "tone_guide": "",
+                    "length_option": batch_length,
+                    "style_option": batch_style
+                }
+                for school in bulk_schools
+                for target in scenario_info['targets']
+            ]
+            try:
+                manifest = compile_bulk_job(bulk_requests)
+                st.session_state.bulk_job = submit_bulk_job(get_batch_backend(bulk_backend_name), manifest)
+            except Exception as e:
+                st.error(f"배치 작업 제출 중 오류가 발생했습니다: {str(e)}")
+    
+    bulk_job = st.session_state.get("bulk_job")
+    if bulk_job:
+        bulk_backend = get_batch_backend(bulk_job["backend"])
+        # 상태 조회는 버튼을 누를 때만 (재실행마다 API를 호출하지 않도록)
+        if st.button("🔄 상태 확인", key="bulk_refresh"):
+            poll_bulk_job(bulk_backend, bulk_job)
+        st.info(f"📦 작업 {bulk_job['job_name']} ({len(bulk_job['requests'])}건) 상태: {bulk_job['status']}")
+        if bulk_job.get("error"):
+            st.error(f"⚠️ 작업이 실패했습니다: {bulk_job['error']}")
+        
+        if bulk_job["status"] in TERMINAL_STATUSES:
+            if st.button("📥 결과를 생성 이력에 저장", key="bulk_ingest"):
+                records, failures = ingest_results(bulk_backend, bulk_job)
+                history_store.add_many(records)
+                del st.session_state["bulk_job"]
+                st.session_state.bulk_failures = failures
+                notify_history_change(f"✅ {len(records)}개의 문자가 생성 이력에 저장되었습니다!")
+                st.rerun()
+    
+    # 생성 이력 탭까지 갱신한 뒤 실패 건 표시
+    bulk_failures = st.session_state.pop("bulk_failures", None)
+    if bulk_failures:
+        st.warning(f"⚠️ {len(bulk_failures)}건은 생성에 실패했거나 검증을 통과하지 못해 저장하지 않았습니다 (검증 실패 문자는 content 열).")
+        st.dataframe(bulk_failures)
 
-with tab3:
+def _delete_history(target: Optional[str], category: Optional[str], school: str) -> None:
+    # 확인란은 위젯을 그리기 전(콜백)에만 되돌릴 수 있음
+    deleted = history_store.delete(target, category, school=school)
+    st.session_state.history_delete_confirm = False
+    notify_history_change(f"🗑️ {school}의 이력 {deleted:,}건을 삭제했습니다.")
+
+@timed_fragment("history")
+def render_history_tab(school_name: str) -> None:
+    """생성 이력 탭"""
     st.subheader("📊 생성 이력")
     
-    if "sms_history" in st.session_state and st.session_state.sms_history:
-        # 이력을 DataFrame으로 변환
-        history_df = pd.DataFrame(st.session_state.sms_history)
-        
+    if history_store.count() > 0:
         # 필터링 옵션
         col1, col2, col3 = st.columns(3)
         with col1:
             filter_target = st.selectbox("대상 필터", ["전체"] + ["학부모", "학생", "교직원"])
         with col2:
             filter_category = st.selectbox("카테고리 필터", ["전체"] + ["안전", "재난", "체험학습", "행사 안내", "상담", "안내"])
+        
+        # 필터링은 저장소 쿼리로 처리하고 현재 페이지만 불러옴
+        target_filter = None if filter_target == "전체" else filter_target
+        category_filter = None if filter_category == "전체" else filter_category
         with col3:
-            if st.button("🗑️ 이력 초기화"):
-                st.session_state.sms_history = []
-                st.rerun()
+            # 여러 학교가 함께 쓰는 저장소이므로 지금 학교의 현재 필터 이력만, 확인 후 삭제
+            with st.popover("🗑️ 이력 삭제"):
+                st.caption(
+                    f"{school_name}의 이력 중 대상 '{filter_target}', 카테고리 '{filter_category}'에 해당하는 이력을 삭제합니다. "
+                    "다른 학교의 이력은 삭제되지 않으며, 삭제한 이력은 되돌릴 수 없습니다."
+                )
+                confirmed = st.checkbox("삭제할 이력을 확인했습니다", key="history_delete_confirm")
+                if confirmed:
+                    st.caption(f"삭제 대상: {history_store.count(target_filter, category_filter, school=school_name):,}건")
+                if st.button(
+                    "삭제",
+                    type="primary",
+                    disabled=not confirmed,
+                    key="history_delete",
+                    on_click=_delete_history,
+                    args=(target_filter, category_filter, school_name)
+                ):
+                    st.rerun()
+        filtered_count = history_store.count(target_filter, category_filter)
+        total_pages = max(1, -(-filtered_count // HISTORY_PAGE_SIZE))
         
-        # 필터링 적용
-        filtered_df = history_df.copy()
-        if filter_target != "전체":
-            filtered_df = filtered_df[filtered_df['target'] == filter_target]
-        if filter_category != "전체":
-            filtered_df = filtered_df[filtered_df['category'] == filter_category]
+        page_col1, page_col2 = st.columns([1, 3])
+        with page_col1:
+            page = st.number_input("페이지", min_value=1, max_value=total_pages, value=1, step=1)
+        with page_col2:
+            first = (page - 1) * HISTORY_PAGE_SIZE
+            st.caption(f"총 {filtered_count}건 중 {min(first + 1, filtered_count)}-{min(first + HISTORY_PAGE_SIZE, filtered_count)}번째 ({page}/{total_pages} 페이지)")
         
         # 이력 표시
-        for idx, row in filtered_df.iterrows():
+        for row in history_store.query(target_filter, category_filter, limit=HISTORY_PAGE_SIZE, offset=first):
             with st.expander(f"📅 {row['timestamp']} - {row['target']} ({row['category']})"):
                 st.text_area(
                     "",
                     value=row['content'],
                     height=80,
-                    key=f"history_{idx}"
+                    key=f"history_{row['id']}"
                 )
-                st.caption(f"글자 수: {row['length']}자 | 스타일: {row.get('style', '기본')} | 길이: {row.get('length_option', '표준')}")
+                school_caption = f"학교: {row['school']} | " if row['school'] else ""
+                st.caption(f"{school_caption}글자 수: {row['length']}자 | 스타일: {row['style']} | 길이: {row['length_option']}")
         
         # 통계 표시
+        history_stats = history_store.stats(target_filter, category_filter)
         st.markdown("### 📈 통계")
         stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
         with stat_col1:
-            st.metric("총 생성 수", f"{len(filtered_df)}개")
+            st.metric("총 생성 수", f"{history_stats['count']}개")
         with stat_col2:
-            avg_length = filtered_df['length'].mean() if not filtered_df.empty else 0
-            st.metric("평균 글자 수", f"{avg_length:.1f}자")
+            st.metric("평균 글자 수", f"{history_stats['avg_length']:.1f}자")
         with stat_col3:
-            most_target = filtered_df['target'].mode()[0] if not filtered_df.empty else "없음"
-            st.metric("가장 많은 대상", most_target)
+            st.metric("가장 많은 대상", history_stats['top_target'] or "없음")
         with stat_col4:
-            most_category = filtered_df['category'].mode()[0] if not filtered_df.empty else "없음"
-            st.metric("가장 많은 카테고리", most_category)
+            st.metric("가장 많은 카테고리", history_stats['top_category'] or "없음")
+        
+        # 통계는 이력 저장 시 누적 갱신됨. 어긋난 경우 저장된 이력으로 재계산
+        with st.expander("🔧 통계 점검"):
+            check_col1, check_col2 = st.columns(2)
+            with check_col1:
+                if st.button("🔍 정합성 확인"):
+                    mismatches = history_store.check_stats()
+                    if mismatches:
+                        st.warning(f"⚠️ {len(mismatches)}개 필터 조합의 통계가 이력과 다릅니다. 재계산해주세요.")
+                        st.text("\n".join(mismatches))
+                    else:
+                        st.success("✅ 통계가 저장된 이력과 일치합니다.")
+            with check_col2:
+                if st.button("♻️ 통계 재계산"):
+                    history_store.rebuild_stats()
+                    st.rerun()
+        
+        # 저장된 이력 전체를 바이트 수·길이 기준·존댓말 기준으로 한 번에 점검
+        with st.expander("🧪 이력 문자 검증"):
+            if st.button("🔍 필터된 이력 검증"):
+                import pandas as pd
+                
+                checked = validate_history_frame(
+                    pd.DataFrame(history_store.query(target_filter, category_filter, limit=None))
+                )
+                # 예전 글자 수 기준(80자)으로는 단문이었지만 실제로는 장문으로 발송되는 문자
+                misclassified = (checked["length"] <= 80) & (checked["sms_type"] == "장문(LMS)")
+                check_col1, check_col2, check_col3, check_col4 = st.columns(4)
+                with check_col1:
+                    st.metric("단문(SMS)", f"{(checked['sms_type'] == '단문(SMS)').sum()}개")
+                with check_col2:
+                    st.metric("글자 수로는 단문인 장문", f"{misclassified.sum()}개")
+                with check_col3:
+                    st.metric("길이 기준 벗어남", f"{checked['over_budget'].sum()}개")
+                with check_col4:
+                    st.metric("반말 의심", f"{checked['informal'].sum()}개")
+                
+                flagged = checked[misclassified | checked["over_budget"] | checked["informal"]]
+                if len(flagged):
+                    st.dataframe(
+                        flagged[["timestamp", "target", "category", "length", "byte_length", "sms_type", "length_option", "over_budget", "informal", "content"]],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    st.success("✅ 검증 기준을 벗어난 문자가 없습니다.")
+        
+        # 필터된 이력 전체를 파일로 (저장소에서 묶음별로 읽어 임시 파일에 바로 기록)
+        with st.expander("💾 이력 내보내기"):
+            export_col1, export_col2 = st.columns([1, 2])
+            with export_col1:
+                export_format = st.selectbox("파일 형식", available_formats(), format_func=str.upper, key="history_export_format")
+            with export_col2:
+                st.caption(f"현재 필터에 맞는 {filtered_count:,}건을 오래된 순으로 내보냅니다. 내보낸 파일은 아래 '이력 가져오기'로 다시 불러올 수 있습니다.")
+            too_many = filtered_count > HISTORY_EXPORT_MAX_ROWS
+            if too_many:
+                extension = FORMATS[export_format][0]
+                st.warning(
+                    f"⚠️ 화면에서는 {HISTORY_EXPORT_MAX_ROWS:,}건까지 내보낼 수 있습니다. 필터를 좁히거나, "
+                    "서버에서 명령행 도구로 내보내세요 (묶음 단위로 기록해 건수와 관계없이 메모리를 적게 씀):\n\n"
+                    f"`python history_io.py export {st.secrets.get('SMS_HISTORY_PATH', 'sms_history.db')} history{extension}"
+                    + (f" --target {target_filter}" if target_filter else "")
+                    + (f" --category {category_filter}" if category_filter else "")
+                    + "`"
+                )
+            if st.button("📦 내보내기 파일 만들기", key="history_export", disabled=too_many):
+                extension, mime = FORMATS[export_format]
+                # 만드는 동안에는 한 묶음만 메모리에 두고, 완성된 파일(HISTORY_EXPORT_MAX_ROWS건 이하)만 내려받기 버튼에 넘김
+                with tempfile.TemporaryFile() as export_file:
+                    export_to_file(history_store, export_file, export_format, target_filter, category_filter)
+                    export_file.seek(0)
+                    st.download_button(
+                        "📥 내려받기",
+                        data=export_file.read(),
+                        file_name=f"sms_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}",
+                        mime=mime,
+                        on_click="ignore",
+                        key="history_export_download"
+                    )
     else:
         st.info("아직 생성된 문자가 없습니다. AI 문자 생성 탭에서 문자를 생성해보세요!")
+    
+    # 이전에 내보낸 이력 파일 불러오기 (같은 이력은 건너뜀)
+    with st.expander("📂 이력 가져오기"):
+        uploaded = st.file_uploader(
+            "내보낸 이력 파일",
+            type=[FORMATS[fmt][0].lstrip(".") for fmt in available_formats()] + ["ndjson"],
+            key="history_import_file",
+            help="열: timestamp, school, target(필수), category(필수), content(필수), length, style, length_option"
+        )
+        if uploaded is not None and st.button("📥 가져오기", key="history_import"):
+            try:
+                counts = import_file(history_store, uploaded, detect_format(uploaded.name))
+            except (ValueError, csv.Error) as e:
+                # 오류 전까지 읽은 묶음은 저장됨. 다시 가져오면 이미 저장된 이력은 건너뜀
+                st.error(f"⚠️ 파일을 읽는 중 오류가 발생했습니다: {e}")
+            else:
+                notify_history_change(
+                    f"✅ 이력 {counts['imported']:,}건을 가져왔습니다 "
+                    f"(중복 {counts['duplicates']:,}건, 형식 오류 {counts['invalid']:,}건은 건너뜀)"
+                )
+                st.rerun()
+
+def _run_dispatch_job(job_id: int) -> None:
+    """발송 작업 실행 (진행률 표시). 화면이 다시 실행되어 중단되면 남은 수신자는 대기 상태로 남음"""
+    progress_bar = st.progress(0.0)
+    
+    def on_progress(attempt: int, done: int, total: int) -> None:
+        progress_bar.progress(done / total, text=f"{attempt}회차 전송 중... ({done:,}/{total:,}명)")
+    
+    try:
+        summary = run_dispatch(
+            build_gateway(gateway_name, **gateway_options),
+            dispatch_store,
+            job_id,
+            batch_size=gateway_options["max_batch_size"],
+            max_in_flight=gateway_options["max_connections"],
+            on_progress=on_progress
+        )
+    except Exception as e:
+        st.error(f"발송 중 오류가 발생했습니다: {str(e)}")
+        return
+    finally:
+        progress_bar.empty()
+    st.session_state.dispatch_selected_job = job_id
+    st.success(
+        f"✅ 발송 완료: 성공 {summary['sent']:,}명, 실패 {summary['failed']:,}명 "
+        f"({summary['elapsed_s']:.1f}초, 요금 약 {dispatch_cost(summary['sent_by_type'], unit_costs):,.0f}원)"
+    )
+
+@timed_fragment("dispatch")
+def render_dispatch_tab() -> None:
+    """문자 발송 탭"""
+    refresh_after_history_change()
+    st.subheader("📤 문자 발송")
+    if gateway_name == "http":
+        st.caption(f"게이트웨이: {gateway_options['base_url']} (배치 {gateway_options['max_batch_size']:,}건, 동시 {gateway_options['max_connections']}개)")
+    else:
+        st.info("🧪 연습 모드입니다. 실제 문자는 보내지 않고 모두 접수된 것으로 기록합니다. (secrets의 SMS_GATEWAY로 변경)")
+    
+    dispatch_messages = st.session_state.get("dispatch_messages", [])
+    if not dispatch_messages:
+        st.info("발송할 문자가 없습니다. 문자 생성·시나리오 탭에서 '📤 발송 목록에 추가'를 눌러주세요.")
+    else:
+        import pandas as pd
+        
+        st.markdown("### 📝 발송할 문자")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "학교": item["school"],
+                    "대상": item["target"],
+                    "문자": item["content"],
+                    "바이트": sms_byte_length(item["content"]),
+                    "문자 유형": classify_sms(item["content"])
+                }
+                for item in dispatch_messages
+            ]),
+            use_container_width=True
+        )
+        if st.button("🗑️ 발송 목록 비우기", key="dispatch_clear"):
+            del st.session_state["dispatch_messages"]
+            st.rerun()
+        
+        st.markdown("### 👥 수신자")
+        uploaded = st.file_uploader(
+            "수신자 목록 (CSV)",
+            type=["csv"],
+            key="dispatch_recipients",
+            help="열: 전화번호(필수), 이름, 대상, 학교. 문자가 여러 개면 대상·학교 열로 받을 문자를 정합니다."
+        )
+        if uploaded is not None:
+            try:
+                recipients = read_recipients(uploaded.getvalue())
+            except ValueError as e:
+                st.error(f"⚠️ {str(e)}")
+                recipients = None
+            
+            if recipients is not None:
+                assignments, rejected = plan_dispatch(dispatch_messages, recipients)
+                type_counts = {}
+                for _, _, idx in assignments:
+                    sms_type = classify_sms(dispatch_messages[idx]["content"])
+                    type_counts[sms_type] = type_counts.get(sms_type, 0) + 1
+                
+                plan_col1, plan_col2, plan_col3 = st.columns(3)
+                with plan_col1:
+                    st.metric("발송 대상", f"{len(assignments):,}명")
+                with plan_col2:
+                    st.metric("제외", f"{len(rejected):,}명")
+                with plan_col3:
+                    st.metric(
+                        "예상 요금",
+                        f"약 {dispatch_cost(type_counts, unit_costs):,.0f}원",
+                        help=" / ".join(f"{sms_type} {count:,}건" for sms_type, count in type_counts.items())
+                    )
+                if rejected:
+                    with st.expander(f"⚠️ 제외된 수신자 {len(rejected):,}명"):
+                        st.dataframe(pd.DataFrame(rejected).rename(columns={"row": "행", "phone": "전화번호", "reason": "사유"}), hide_index=True)
+                
+                # 실제 게이트웨이는 한 번 더 확인
+                confirmed = gateway_name != "http" or st.checkbox("발송할 문자와 수신자를 확인했습니다", key="dispatch_confirm")
+                if st.button("🚀 발송 시작", type="primary", disabled=not assignments or not confirmed, key="dispatch_start"):
+                    try:
+                        job_id = dispatch_store.create_job(uploaded.name, gateway_name, dispatch_messages, assignments)
+                    except ValueError as e:
+                        st.error(f"⚠️ {str(e)}")
+                    else:
+                        _run_dispatch_job(job_id)
+    
+    # 발송 기록
+    jobs = dispatch_store.jobs()
+    if jobs:
+        import pandas as pd
+        
+        st.markdown("### 📋 발송 기록")
+        st.dataframe(
+            pd.DataFrame(jobs).rename(columns={
+                "id": "작업", "created_at": "시각", "name": "수신자 파일", "gateway": "게이트웨이", "status": "상태",
+                "total": "수신자", "sent": "성공", "failed": "실패", "pending": "대기"
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        job_ids = [job["id"] for job in jobs]
+        selected = st.session_state.get("dispatch_selected_job")
+        job_id = st.selectbox(
+            "작업 선택",
+            job_ids,
+            index=job_ids.index(selected) if selected in job_ids else 0,
+            format_func=lambda job: f"#{job}",
+            key="dispatch_job"
+        )
+        summary = dispatch_store.summary(job_id, unit_costs)
+        st.caption(
+            f"성공 {summary['sent']:,} | 실패 {summary['failed']:,} | 대기 {summary['pending']:,} | "
+            f"요금 약 {summary['cost']:,.0f}원 ({' / '.join(f'{sms_type} {count:,}건' for sms_type, count in summary['sent_by_type'].items()) or '발송 없음'})"
+        )
+        if summary["pending"] and st.button("▶️ 남은 수신자 이어서 발송", key="dispatch_resume"):
+            _run_dispatch_job(job_id)
+        failures = dispatch_store.failures(job_id)
+        if failures:
+            with st.expander(f"❌ 실패한 수신자 ({summary['failed']:,}명)"):
+                failures_df = pd.DataFrame(failures).rename(columns={
+                    "seq": "순번", "phone": "전화번호", "name": "이름", "message_idx": "문자 번호", "attempts": "시도", "error": "오류"
+                })
+                st.dataframe(failures_df, hide_index=True)
+                st.download_button(
+                    "📥 실패 목록 (CSV)",
+                    data=failures_df.to_csv(index=False).encode("utf-8-sig"),
+                    file_name=f"dispatch_{job_id}_failures.csv",
+                    mime="text/csv"
+                )
+
+def admin_unlocked() -> bool:
+    """관리 탭 접근 확인 (secrets의 ADMIN_PASSWORD가 없으면 항상 잠김, 맞게 입력하면 세션 동안 열림)"""
+    password = str(st.secrets.get("ADMIN_PASSWORD", ""))
+    if not password:
+        st.info("🔒 관리 탭을 보려면 secrets에 ADMIN_PASSWORD를 설정하세요.")
+        return False
+    if st.session_state.get("admin_unlocked"):
+        return True
+    entered = st.text_input("관리자 비밀번호", type="password", key="admin_password")
+    if not entered:
+        return False
+    if not hmac.compare_digest(entered.encode("utf-8"), password.encode("utf-8")):
+        st.error("비밀번호가 맞지 않습니다.")
+        return False
+    st.session_state.admin_unlocked = True
+    return True
+
+@timed_fragment("admin")
+def render_admin_tab() -> None:
+    """관리 탭 (학교별 호출 기록이 있어 관리자 비밀번호로 잠금)"""
+    if not admin_unlocked():
+        return
+    st.subheader("🛠️ API 호출 계측")
+    st.markdown("문자 생성 API 호출의 지연 시간, 토큰, 비용을 확인합니다. 할당량 산정과 느린 경로 확인에 사용하세요.")
+    
+    totals = telemetry.totals()
+    by_outcome = totals["by_outcome"]
+    total_calls = totals["calls"]
+    metric_col1, metric_col2, metric_col3, metric_col4, metric_col5 = st.columns(5)
+    with metric_col1:
+        st.metric(
+            "생성 호출 수",
+            f"{total_calls:,}건",
+            help=f"API 요청 {totals.get('api_calls', 0):,}건, 재시도 {totals.get('retries', 0):,}회, 헤지 요청 {totals.get('hedges', 0):,}회"
+        )
+    with metric_col2:
+        st.metric("캐시 적중률", f"{by_outcome.get('cache_hit', 0) / total_calls:.0%}" if total_calls else "-")
+    with metric_col3:
+        failed_calls = by_outcome.get("error", 0) + by_outcome.get("fallback", 0)
+        st.metric("실패율", f"{failed_calls / total_calls:.1%}" if total_calls else "-", help="오류 또는 캐시 대체 결과")
+    with metric_col4:
+        st.metric(
+            "입력 토큰 (캐시)",
+            f"{totals.get('prompt_tokens', 0):,}",
+            help=f"이 중 프롬프트 캐시에서 처리된 토큰 {totals.get('cached_tokens', 0):,}개, 출력 토큰 {totals.get('completion_tokens', 0):,}개"
+        )
+    with metric_col5:
+        st.metric("예상 비용", f"${totals.get('cost_usd', 0):.4f}")
+    job_counts = generation_queue.counts()
+    st.caption(
+        f"생성 작업 대기열: 대기 {job_counts[QUEUED]}건, 실행 중 {job_counts[RUNNING]}건 "
+        f"(작업자 {generation_queue.max_workers}개, secrets의 GENERATION_WORKERS로 변경)"
+    )
+    
+    # 공유 API 키의 동시 호출 자리를 학교·우선순위별로 나누는 스케줄러 현황 (프로세스 전체)
+    scheduler = api_guard.scheduler.snapshot()
+    with st.expander(f"⚖️ API 호출 스케줄러: 실행 {scheduler['running']}/{scheduler['max_concurrency']}, 대기 {scheduler['queued']}건"):
+        st.caption(
+            "단일 생성이 일괄 생성보다 먼저 차례를 받고, 학교별 동시 호출 수를 넘는 요청은 기다립니다. "
+            "secrets의 OPENAI_MAX_CONCURRENCY, SCHOOL_MAX_CONCURRENCY, SCHOOL_REQUESTS_PER_MINUTE로 변경"
+        )
+        # 표는 호출 기록이 생긴 뒤에만 (첫 화면에서 pandas를 불러오지 않도록)
+        if scheduler["tenants"]:
+            import pandas as pd
+            
+            priority_labels = {INTERACTIVE: "단일 생성", BATCH: "일괄 생성"}
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "우선순위": priority_labels.get(priority, priority),
+                        "실행 중": stats["running"],
+                        "대기": stats["queued"],
+                        "처리": stats["served"],
+                        "대기 p50 (ms)": stats["wait_p50_ms"],
+                        "대기 p95 (ms)": stats["wait_p95_ms"],
+                        "대기 최대 (ms)": stats["wait_max_ms"]
+                    }
+                    for priority, stats in scheduler["priorities"].items()
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.dataframe(
+                pd.DataFrame(scheduler["tenants"]).rename(
+                    columns={"tenant": "학교", "running": "실행 중", "queued": "대기", "served": "처리"}
+                ),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("아직 스케줄러를 거친 API 호출이 없습니다.")
+    
+    records = telemetry.records()
+    if records:
+        import pandas as pd
+        
+        # 백분위수는 메모리에 남아 있는 최근 기록 기준
+        timing_labels = {
+            "latency_s": "전체 지연 시간",
+            "ttft_s": "첫 토큰까지 (스트리밍)",
+            "queue_wait_s": "작업 대기열 대기",
+            "schedule_wait_s": "스케줄러 대기",
+            "rate_limit_wait_s": "속도 제한 대기"
+        }
+        group_labels = {None: "전체", "mode": "생성 방식", "outcome": "결과", **{tag: tag for tag in TAG_FIELDS}}
+        chart_col1, chart_col2 = st.columns(2)
+        with chart_col1:
+            timing_field = st.selectbox("지표", list(timing_labels), format_func=timing_labels.get)
+        with chart_col2:
+            group_by = st.selectbox("그룹", list(group_labels), format_func=group_labels.get)
+        
+        quantiles = telemetry.quantiles(timing_field, group_by)
+        if quantiles:
+            quantile_df = pd.DataFrame(quantiles).T
+            quantile_ms = quantile_df[["p50", "p95", "p99"]] * 1000
+            st.bar_chart(quantile_ms, stack=False, y_label="ms")
+            st.dataframe(
+                quantile_ms.round(1).assign(건수=quantile_df["count"].astype(int)),
+                use_container_width=True
+            )
+        else:
+            st.info("선택한 지표의 기록이 없습니다.")
+        
+        records_df = pd.DataFrame(records)
+        st.markdown("### ⏱️ 최근 호출")
+        st.line_chart(records_df.set_index("timestamp")[["latency_s"]] * 1000, y_label="ms")
+        st.dataframe(records_df.tail(200).iloc[::-1], use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 계측된 API 호출이 없습니다.")
+    
+    # 길이 옵션별 응답 시간 분포와 헤지 요청 기준 (프로세스 전체, 최근 측정값 기준)
+    latency_snapshot = latency_histogram.snapshot()
+    if latency_snapshot:
+        import pandas as pd
+        
+        with st.expander("🎯 길이 옵션별 응답 시간과 헤지 기준"):
+            st.caption("단일 문자 요청이 헤지 기준 시간을 넘기면 같은 요청을 한 번 더 보내 먼저 끝난 응답을 씁니다.")
+            rows = []
+            for length_option, stats in latency_snapshot.items():
+                budget = generation_budget(length_option)
+                threshold = hedge_delay(length_option)
+                rows.append({
+                    "길이": length_option,
+                    "측정 수": stats["count"],
+                    "p50 (ms)": round(stats["p50"] * 1000, 1),
+                    "p95 (ms)": round(stats["p95"] * 1000, 1),
+                    "p99 (ms)": round(stats["p99"] * 1000, 1),
+                    "헤지 기준 (ms)": round(threshold * 1000, 1) if threshold is not None else None,
+                    "최대 토큰": budget["max_tokens"],
+                    "마감 (초)": budget["deadline_s"],
+                    "모델": budget["model"]
+                })
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            bucket_df = pd.DataFrame({option: stats["buckets"] for option, stats in latency_snapshot.items()})
+            bucket_df.index = [f"≤{bound}s" if bound != "inf" else "그 이상" for bound in bucket_df.index]
+            st.bar_chart(bucket_df, y_label="건수")
+    
+    # 외부 수집용 내보내기
+    st.markdown("### 📤 내보내기")
+    export_col1, export_col2 = st.columns(2)
+    with export_col1:
+        st.download_button(
+            "📥 최근 기록 (JSON lines)",
+            data="\n".join(json.dumps(record, ensure_ascii=False, default=str) for record in records),
+            file_name="sms_telemetry.jsonl",
+            mime="application/x-ndjson"
+        )
+        if telemetry.log_path:
+            st.caption(f"전체 기록은 서버의 `{telemetry.log_path}` 파일에 누적됩니다.")
+    with export_col2:
+        prometheus_text = telemetry.prometheus_text()
+        st.download_button("📥 Prometheus 지표", data=prometheus_text, file_name="metrics.prom", mime="text/plain")
+        metrics_port = int(st.secrets.get("METRICS_PORT", 0))
+        if metrics_port:
+            st.caption(
+                f"Prometheus 수집 주소: `http://{metrics_host}:{metrics_port}/metrics` "
+                "(다른 서버에서 수집하려면 secrets의 METRICS_HOST로 변경)"
+            )
+        else:
+            st.caption("secrets에 METRICS_PORT를 설정하면 /metrics 수집 주소가 열립니다. (기본은 이 서버 안에서만 접속)")
+    with st.expander("Prometheus 지표 미리보기"):
+        st.code(prometheus_text, language="text")
+    
+    # 탭 fragment별 마지막 렌더링 시간 (입력을 바꾼 탭만 다시 그려지므로 탭마다 갱신 시점이 다름)
+    render_timings = st.session_state.get("render_timings", {})
+    if render_timings:
+        with st.expander("🖥️ 탭 렌더링 시간"):
+            # 첫 화면에서 pandas를 불러오지 않도록 표 대신 목록으로 표시
+            st.markdown("\n".join(f"- {tab}: {elapsed * 1000:.1f} ms" for tab, elapsed in render_timings.items()))
+
+# 메인 영역
+# 전체 실행은 생성 이력 탭도 다시 그리므로 이력 변경 표시를 정리하고 저장 알림을 띄움
+st.session_state.pop("history_changed", None)
+if "history_notice" in st.session_state:
+    st.toast(st.session_state.pop("history_notice"))
+
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+    ["✨ AI 문자 생성", "🚀 시나리오별 일괄 생성", "📊 생성 이력", "📤 문자 발송", "🛠️ 관리", "❓ 도움말"]
+)
+
+with tab1:
+    render_generate_tab(school_name, date_str)
+
+with tab2:
+    render_scenario_tab(school_name, date_str)
+
+with tab3:
+    render_history_tab(school_name)
 
 with tab4:
+    render_dispatch_tab()
+
+with tab5:
+    render_admin_tab()
+
+with tab6:
     st.subheader("❓ 사용 가이드")
     
     st.markdown("""
@@ -578,16 +1704,33 @@ with tab4:
     - **추가 정보 반영**: 장소, 시간, 준비물 등 세부 정보 자동 반영
     - **길이 조절**: 매우 짧게(40자)부터 매우 길게(180자)까지 5단계
     - **스타일 선택**: 기본, 친근함, 긴급함, 공식적, 안내형 중 선택
+    - **비슷한 요청 제안**: 같은 대상·카테고리·길이·스타일로 비슷한 내용을 요청한 적이 있으면 그때 만든 문자를 먼저 제안 (사용하면 API 호출 없음)
+    - **긴급 템플릿**: 재난·안전 문자는 입력한 정보로 템플릿 문자를 즉시 작성하고, 필요하면 AI 문자로 바꾸기
+    - **백그라운드 생성**: 생성 중에도 다른 입력을 바꿀 수 있고, 결과는 저장·입력 변경 후에도 그대로 남음
     
     #### 2. 시나리오별 일괄 생성
     - **자주 쓰는 상황**: 등하교 안전, 체험학습 등 미리 정의된 시나리오
-    - **다중 대상 생성**: 한 번에 여러 대상용 문자 생성
+    - **다중 대상 생성**: 한 번에 여러 대상용 문자 생성 (기본은 한 번의 요청으로 모든 대상을 받아 요청 수와 토큰 절약)
     - **일관된 정보 전달**: 같은 내용을 대상별로 적절히 변환
+    - **여러 학교 즉시 생성**: 학교 목록을 넣으면 대상별로 한 번만 생성한 뒤 학교명을 바꿔 넣어 학교별 문자표(CSV)로 내보내기
     
     #### 3. 생성 이력 관리
     - **이력 저장**: 생성된 문자 자동 저장
     - **필터링**: 대상, 카테고리별 검색
     - **통계 확인**: 사용 패턴 분석
+    - **내보내기·가져오기**: 필터된 이력을 CSV·JSONL·Parquet으로 내보내고, 내보낸 파일을 다시 가져오기 (이미 있는 이력은 건너뜀)
+    
+    #### 4. 문자 발송
+    - **발송 목록**: 생성·시나리오 탭에서 만든 문자를 '발송 목록에 추가'로 모아 두기
+    - **수신자 CSV**: 전화번호(필수), 이름, 대상, 학교 열. 대상·학교 열로 수신자별 문자를 자동 배정
+    - **배치 전송**: 게이트웨이 한도에 맞춰 나눠 보내고, 일시적 실패는 자동 재시도. 중단된 작업은 이어서 발송
+    - **요금 집계**: 단문(SMS)·장문(LMS) 구분에 따른 건당 요금 합계
+    
+    #### 5. 관리 (secrets의 ADMIN_PASSWORD로 잠금)
+    - **API 계측**: 호출별 대기 시간, 첫 토큰까지 시간, 전체 지연 시간, 토큰, 비용
+    - **백분위수 차트**: 대상·카테고리·길이·스타일별 p50/p95/p99
+    - **공정 스케줄링**: 여러 학교가 같은 API 키를 함께 써도 한 학교의 일괄 생성이 다른 학교의 단일 생성을 막지 않도록 학교별로 차례를 나누고 단일 생성을 먼저 처리 (대기 건수·대기 시간 확인)
+    - **내보내기**: JSON lines 기록, Prometheus 지표
     
     ### 💡 활용 팁
     
@@ -607,7 +1750,7 @@ with tab4:
     
     - AI가 생성한 문자는 반드시 검토 후 발송
     - 개인정보나 민감한 정보는 직접 입력하지 않기
-    - 긴급 상황 시에는 미리 준비된 템플릿 사용 권장
+    - 긴급 상황 시에는 미리 준비된 템플릿 사용 권장 (재난·안전은 기본으로 템플릿 문자를 즉시 작성, API 오류 시에도 템플릿으로 대체)
     - 모든 대상에게 존댓말을 사용하도록 설정되어 있음
     
     ### 🔧 문제 해결
@@ -630,7 +1773,7 @@ with tab4:
         A: 커스텀 톤 옵션을 사용하여 원하는 형식을 지정할 수 있습니다.
         
         **Q: 이력이 사라졌어요.**
-        A: 이력은 세션 동안만 유지됩니다. 중요한 문자는 따로 저장하세요.
+        A: 이력은 서버에 저장되어 다시 접속해도 유지됩니다. '이력 삭제'는 지금 학교의 현재 필터에 해당하는 이력만 확인 후 삭제하며, 삭제한 이력은 되돌릴 수 없습니다.
         
         **Q: 학생에게 반말로 보내고 싶어요.**
         A: 현재는 모든 대상에게 존댓말을 사용하도록 설정되어 있습니다. 필요시 생성 후 수정하세요.
@@ -0,0 +1,213 @@
+"""브라우저 없이 대량 문자를 생성하는 명령행 도구
+
+CSV 또는 JSONL 입력의 각 행을 작업자 풀에서 생성하고, 완료되는 대로 결과를
+JSONL로 기록합니다. 출력 파일이 체크포인트 역할을 하므로 중단된 작업을 같은
+명령으로 다시 실행하면 이미 성공한 행은 건너뛰고 이어서 처리합니다.
+
+    OPENAI_API_KEY=... python batch_cli.py rows.csv -o results.jsonl --workers 8
+
+입력 열: id(선택), school, target, category, content, additional_info(JSON),
+date, tone_guide, length_option, style_option
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from openai_client import build_openai_client
+from resilience import APIGuard, RateLimiter
+from sms_cache import SMSCache
+from sms_engine import classify_sms, generate_ai_sms, prompt_usage
+from telemetry import Telemetry, percentile
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    """CSV/JSONL 입력을 행 단위로 읽어 반환 (id가 없으면 행 번호 사용)"""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if Path(path).suffix.lower() in (".jsonl", ".ndjson"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for index, row in enumerate(rows, start=1):
+            row = dict(row)
+            row["id"] = str(row.get("id") or index)
+            yield row
+
+
+def row_to_request(row: Dict, default_date: str) -> Dict:
+    """입력 행을 generate_ai_sms 인자로 변환"""
+    additional_info = row.get("additional_info") or {}
+    if isinstance(additional_info, str):
+        additional_info = json.loads(additional_info)
+    return {
+        "target": row["target"],
+        "category": row["category"],
+        "content_details": row["content"],
+        "date": row.get("date") or default_date,
+        "school": row["school"],
+        "additional_info": additional_info,
+        "tone_guide": row.get("tone_guide") or "",
+        "length_option": row.get("length_option") or "표준",
+        "style_option": row.get("style_option") or "기본"
+    }
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """이미 성공적으로 기록된 행 id 목록 (실패한 행은 다시 시도)"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단 시점에 잘린 마지막 줄
+                continue
+            if record.get("success"):
+                done.add(str(record["id"]))
+    return done
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    client,
+    workers: int = 8,
+    guard: Optional[APIGuard] = None,
+    cache: Optional[SMSCache] = None,
+    default_date: Optional[str] = None,
+    telemetry: Optional[Telemetry] = None
+) -> Dict:
+    """입력 파일 전체를 처리하고 처리량·지연 시간 요약 반환"""
+    default_date = default_date or datetime.now().strftime("%m월 %d일")
+    done = load_checkpoint(output_path)
+    latencies: List[float] = []
+    succeeded = failed = 0
+
+    def work(row: Dict, queued_at: float) -> Dict:
+        start = time.perf_counter()
+        try:
+            sms, success = generate_ai_sms(
+                client=client,
+                cache=cache,
+                guard=guard,
+                telemetry=telemetry,
+                queued_at=queued_at,
+                **row_to_request(row, default_date)
+            )
+        except (KeyError, ValueError) as e:
+            sms, success = f"입력 행 오류: {e}", False
+        return {
+            "id": row["id"],
+            "school": row.get("school"),
+            "target": row.get("target"),
+            "category": row.get("category"),
+            "content": sms if success else None,
+            "error": None if success else sms,
+            "success": success,
+            "length": len(sms) if success else None,
+            "sms_type": classify_sms(sms) if success else None,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    started = time.perf_counter()
+    skipped = 0
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def drain(return_when) -> None:
+            nonlocal pending, succeeded, failed
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                latencies.append(record["latency_ms"])
+                if record["success"]:
+                    succeeded += 1
+                else:
+                    failed += 1
+            out.flush()
+
+        for row in read_rows(input_path):
+            if row["id"] in done:
+                skipped += 1
+                continue
+            # 입력 전체를 한꺼번에 제출하지 않도록 진행 중인 작업 수 제한
+            if len(pending) >= workers * 2:
+                drain(FIRST_COMPLETED)
+            pending.add(executor.submit(work, row, time.perf_counter()))
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    processed = succeeded + failed
+    return {
+        "processed": processed,
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0
+        },
+        "usage": prompt_usage.snapshot()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="학교 문자 대량 생성 (CSV/JSONL → JSONL)")
+    parser.add_argument("input", help="입력 CSV 또는 JSONL 파일")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="결과 JSONL (체크포인트 겸용)")
+    parser.add_argument("--workers", type=int, default=8, help="동시 생성 작업자 수")
+    parser.add_argument("--date", help="행에 date가 없을 때 사용할 날짜 (기본: 오늘)")
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"))
+    parser.add_argument("--rpm", type=int, default=500, help="분당 요청 수 제한")
+    parser.add_argument("--tpm", type=int, default=200000, help="분당 토큰 수 제한")
+    parser.add_argument("--cache", default="sms_cache.db", help="응답 캐시 경로 (빈 값이면 사용 안 함)")
+    parser.add_argument("--metrics-log", help="호출별 계측 기록을 남길 JSON lines 파일")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("OPENAI_API_KEY 환경 변수를 설정해주세요.", file=sys.stderr)
+        return 2
+
+    summary = run(
+        args.input,
+        args.output,
+        client=build_openai_client(api_key, base_url=args.base_url),
+        workers=args.workers,
+        guard=APIGuard(rate_limiter=RateLimiter(args.rpm, args.tpm)),
+        cache=SMSCache(args.cache) if args.cache else None,
+        default_date=args.date,
+        telemetry=Telemetry(args.metrics_log) if args.metrics_log else None
+    )
+    latency = summary["latency_ms"]
+    usage = summary["usage"]
+    print(
+        f"처리 {summary['processed']}건 (성공 {summary['succeeded']}, 실패 {summary['failed']}, "
+        f"이전 실행에서 완료 {summary['skipped']}) | {summary['elapsed_s']}s, {summary['rows_per_s']}건/s | "
+        f"지연 p50 {latency['p50']}ms, p90 {latency['p90']}ms, p95 {latency['p95']}ms, p99 {latency['p99']}ms | "
+        f"캐시된 입력 토큰 {usage['cached_tokens']}/{usage['prompt_tokens']}",
+        file=sys.stderr
+    )
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""OpenAI 클라이언트 연결 재사용 마이크로 벤치마크
+
+재실행마다 클라이언트를 새로 만들던 방식과 프로세스 공용 클라이언트를
+로컬 스텁 서버에 대해 비교하고, 새로 열린 TCP 연결 수와 소요 시간을 출력합니다.
+
+    python benchmarks/bench_client_pool.py --requests 200
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openai import OpenAI  # noqa: E402
+
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from openai_client import build_openai_client  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "벤치마크"}]
+
+
+def _call(client: OpenAI) -> None:
+    client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, max_tokens=10)
+
+
+def run_per_call_client(server: FakeOpenAIServer, requests: int) -> dict:
+    """기존 방식: 요청(재실행)마다 새 클라이언트 생성"""
+    server.reset_counters()
+    start = time.perf_counter()
+    for _ in range(requests):
+        client = OpenAI(api_key="sk-bench", base_url=server.base_url)
+        _call(client)
+        client.close()
+    return _result("per_call_client", requests, start, server)
+
+
+def run_shared_client(server: FakeOpenAIServer, requests: int, concurrency: int) -> dict:
+    """공용 클라이언트 하나로 요청 (concurrency > 1이면 여러 세션 동시 사용)"""
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    server.reset_counters()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: _call(client), range(requests)))
+    result = _result(f"shared_client_x{concurrency}", requests, start, server)
+    client.close()
+    return result
+
+
+def _result(name: str, requests: int, start: float, server: FakeOpenAIServer) -> dict:
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "requests": requests,
+        "connections": server.connections,
+        "elapsed_s": round(elapsed, 4),
+        "ms_per_request": round(elapsed / requests * 1000, 3)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI 클라이언트 연결 재사용 벤치마크")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency) as server:
+        results = [
+            run_per_call_client(server, args.requests),
+            run_shared_client(server, args.requests, 1),
+            run_shared_client(server, args.requests, args.concurrency)
+        ]
+
+    for result in results:
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{result['name']:<22} 요청 {result['requests']:>5}  연결 {result['connections']:>5}  "
+                f"{result['elapsed_s']:>8.3f}s  ({result['ms_per_request']:.3f} ms/요청)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""문자 발송 파이프라인 벤치마크 (수신자 10만 명)
+
+로컬 게이트웨이 스텁에 대해 수신자 배정(plan_dispatch), 작업 저장, 비동기 배치 전송,
+발송 결과 기록까지 실제 앱과 같은 함수로 실행하고 처리량을 측정합니다. 일시적 오류·거절이
+있는 경우 재시도 후 모두 접수되는지, 같은 문자가 두 번 접수되지 않는지도 함께 확인합니다.
+
+    python benchmarks/bench_dispatch.py --recipients 100000 --json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import result  # noqa: E402
+from benchmarks.fake_gateway import FakeGatewayServer  # noqa: E402
+from sms_dispatch import DispatchStore, HTTPGateway, plan_dispatch, run_dispatch  # noqa: E402
+
+TARGETS = ("학부모", "학생", "교직원")
+SCHOOLS = 50
+
+
+def synthetic_campaign(recipients: int):
+    """학교 50곳 × 대상 3종 문자와 수신자 목록 (교직원 문자는 장문)"""
+    messages = [
+        {
+            "school": f"학교{school:02d}",
+            "target": target,
+            "content": f"[학교{school:02d}] 내일 오전 강한 비가 예상됩니다. 등하교 시 우산을 꼭 챙겨 주세요."
+            + (" 담당 구역 안전 지도와 학생 귀가 확인 후 결과 보고 부탁드립니다." if target == "교직원" else "")
+        }
+        for school in range(SCHOOLS)
+        for target in TARGETS
+    ]
+    rows = [
+        {"phone": f"010-{i // 10000 % 10000:04d}-{i % 10000:04d}", "name": "", "target": TARGETS[i % 3], "school": f"학교{i % SCHOOLS:02d}"}
+        for i in range(recipients)
+    ]
+    return messages, rows
+
+
+def bench_dispatch(
+    recipients: int,
+    latency: float,
+    error_rate: float,
+    reject_rate: float,
+    batch_size: int,
+    max_in_flight: int
+) -> Dict:
+    messages, rows = synthetic_campaign(recipients)
+    with FakeGatewayServer(latency=latency, error_rate=error_rate, reject_rate=reject_rate) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        store = DispatchStore(str(Path(tmp) / "dispatch.db"))
+
+        start = time.perf_counter()
+        assignments, rejected = plan_dispatch(messages, rows)
+        plan_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        job_id = store.create_job("bench", "http", messages, assignments)
+        create_s = time.perf_counter() - start
+
+        summary = run_dispatch(
+            HTTPGateway(server.base_url, max_connections=max_in_flight),
+            store,
+            job_id,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+            base_delay=0.05
+        )
+        counters = server.counters()
+
+    name = "clean" if not (error_rate or reject_rate) else "flaky"
+    return result(
+        "dispatch",
+        f"{name}_{recipients}",
+        {
+            "recipients": recipients,
+            "latency": latency,
+            "error_rate": error_rate,
+            "reject_rate": reject_rate,
+            "batch_size": batch_size,
+            "max_in_flight": max_in_flight
+        },
+        {
+            "plan_ms": round(plan_s * 1000, 3),
+            "create_job_ms": round(create_s * 1000, 3),
+            "send_s": round(summary["elapsed_s"], 4),
+            "recipients_per_s": round(recipients / summary["elapsed_s"], 1),
+            "sent": summary["sent"],
+            "failed": summary["failed"],
+            "rejected_rows": len(rejected),
+            "gateway_requests": counters["requests"],
+            "gateway_connections": counters["connections"],
+            "duplicates": counters["duplicates"],
+            "deduplicated": counters["deduplicated"],
+            "cost": summary["cost"]
+        }
+    )
+
+
+def run(
+    recipients: int = 100000,
+    latency: float = 0.05,
+    batch_size: int = 500,
+    max_in_flight: int = 8
+) -> List[Dict]:
+    return [
+        bench_dispatch(recipients, latency, 0.0, 0.0, batch_size, max_in_flight),
+        bench_dispatch(recipients, latency, 0.05, 0.01, batch_size, max_in_flight)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="문자 발송 파이프라인 벤치마크")
+    parser.add_argument("--recipients", type=int, default=100000)
+    parser.add_argument("--latency", type=float, default=0.05, help="게이트웨이 스텁 배치 응답 지연(초)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-in-flight", type=int, default=8, help="동시에 보내는 배치 수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.recipients, args.latency, args.batch_size, args.max_in_flight):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<16} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
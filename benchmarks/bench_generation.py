@@ -0,0 +1,260 @@
+"""문자 생성 경로 벤치마크 (단일, 헤지 요청, 스트리밍, 시나리오 일괄, 교육청 단위 대량 작업)
+
+로컬 스텁 서버에 대해 실제 앱과 같은 함수(generate_ai_sms, stream_ai_sms,
+generate_batch_sms, generate_multi_target_sms, bulk_jobs)를 호출하고 지연 시간 분포와
+처리량을 측정합니다.
+
+    python benchmarks/bench_generation.py --latency 0.2 --jitter 0.1 --error-rate 0.05 --json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import SAMPLE_REQUEST, latency_summary, result  # noqa: E402
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from bulk_jobs import LocalBatchBackend, compile_bulk_job, run_bulk_job  # noqa: E402
+from openai_client import build_openai_client  # noqa: E402
+from resilience import APIGuard, RateLimiter  # noqa: E402
+from sms_cache import SMSCache  # noqa: E402
+from sms_engine import (  # noqa: E402
+    generate_ai_sms,
+    generate_batch_sms,
+    HEDGE_MIN_SAMPLES,
+    generate_multi_target_sms,
+    latency_histogram,
+    stream_ai_sms
+)
+from telemetry import Telemetry  # noqa: E402
+
+BATCH_TARGETS = ("학부모", "학생", "교직원")
+
+
+def _guard() -> APIGuard:
+    # 벤치마크에서는 속도 제한 대기가 결과를 왜곡하지 않도록 한도를 넉넉하게 두고 재시도 간격만 짧게
+    return APIGuard(rate_limiter=RateLimiter(1_000_000, 1_000_000_000), base_delay=0.05, max_delay=0.5)
+
+
+def bench_single(server: FakeOpenAIServer, requests: int, cached: bool = False) -> Dict:
+    """단일 생성 순차 호출 (cached=True면 첫 호출 이후 응답 캐시 적중)"""
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    telemetry = Telemetry()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SMSCache(str(Path(tmp) / "cache.db")) if cached else None
+        server.reset_counters()
+        latencies, failures = [], 0
+        for i in range(requests):
+            # 캐시 벤치마크는 같은 요청을 반복, 아니면 매번 다른 요청
+            request = dict(SAMPLE_REQUEST)
+            if not cached:
+                request["content_details"] = f"{SAMPLE_REQUEST['content_details']} {i}"
+            start = time.perf_counter()
+            _, success = generate_ai_sms(client=client, cache=cache, guard=_guard(), telemetry=telemetry, **request)
+            latencies.append(time.perf_counter() - start)
+            failures += not success
+    client.close()
+    return result(
+        "generation",
+        "single_cached" if cached else "single",
+        {"requests": requests},
+        {
+            **latency_summary(latencies),
+            "failures": failures,
+            "api_requests": server.requests,
+            "retries": sum(record["retries"] for record in telemetry.records())
+        }
+    )
+
+
+def bench_hedged(server: FakeOpenAIServer, requests: int, hedge: bool) -> Dict:
+    """꼬리 지연이 있는 서버에 단일 생성 순차 호출 (hedge=True면 p95를 넘긴 요청을 한 번 더 보냄)
+
+    헤지 요청은 응답 시간이 HEDGE_MIN_SAMPLES건 쌓여야 시작하므로, 두 경우 모두 그만큼
+    헤지 없이 먼저 호출해 응답 시간을 채운 뒤(측정에서 제외) 잽니다.
+    """
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    telemetry = Telemetry()
+    latency_histogram.clear()
+    for i in range(HEDGE_MIN_SAMPLES):
+        request = dict(SAMPLE_REQUEST, content_details=f"{SAMPLE_REQUEST['content_details']} 준비 {i}")
+        generate_ai_sms(client=client, guard=_guard(), validate=False, hedge=False, **request)
+    server.reset_counters()
+    latencies, failures = [], 0
+    for i in range(requests):
+        request = dict(SAMPLE_REQUEST)
+        request["content_details"] = f"{SAMPLE_REQUEST['content_details']} {i}"
+        start = time.perf_counter()
+        _, success = generate_ai_sms(
+            client=client, guard=_guard(), telemetry=telemetry, validate=False, hedge=hedge, **request
+        )
+        latencies.append(time.perf_counter() - start)
+        failures += not success
+    client.close()
+    return result(
+        "generation",
+        "single_hedged" if hedge else "single_unhedged",
+        {"requests": requests, "warmup": HEDGE_MIN_SAMPLES},
+        {
+            **latency_summary(latencies),
+            "failures": failures,
+            "api_requests": server.requests,
+            "hedges": sum(record["hedges"] for record in telemetry.records())
+        }
+    )
+
+
+def bench_stream(server: FakeOpenAIServer, requests: int) -> Dict:
+    """스트리밍 생성: 첫 조각까지 시간(TTFT)과 전체 시간"""
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    server.reset_counters()
+    ttfts, latencies, failures = [], [], 0
+    for i in range(requests):
+        request = dict(SAMPLE_REQUEST, content_details=f"{SAMPLE_REQUEST['content_details']} {i}")
+        start = time.perf_counter()
+        first = None
+        try:
+            with closing(stream_ai_sms(client=client, guard=_guard(), **request)) as chunks:
+                for _ in chunks:
+                    if first is None:
+                        first = time.perf_counter() - start
+        except Exception:
+            failures += 1
+            continue
+        ttfts.append(first or 0.0)
+        latencies.append(time.perf_counter() - start)
+    client.close()
+    ttft = latency_summary(ttfts)
+    return result(
+        "generation",
+        "stream",
+        {"requests": requests},
+        {
+            **latency_summary(latencies),
+            **{f"ttft_{key}": value for key, value in ttft.items()},
+            "failures": failures,
+            "api_requests": server.requests
+        }
+    )
+
+
+def bench_batch(server: FakeOpenAIServer, rounds: int, concurrency: int, structured: bool = False) -> Dict:
+    """시나리오 일괄 생성 (대상 3개) 한 번의 소요 시간. structured=True면 한 번의 JSON 요청으로 생성"""
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    server.reset_counters()
+    guard = _guard()
+    telemetry = Telemetry()
+    generate = generate_multi_target_sms if structured else generate_batch_sms
+    durations, failures = [], 0
+    for i in range(rounds):
+        requests = [
+            dict(
+                SAMPLE_REQUEST,
+                target=target,
+                content_details=f"{SAMPLE_REQUEST['content_details']} {i}",
+                guard=guard,
+                telemetry=telemetry
+            )
+            for target in BATCH_TARGETS
+        ]
+        start = time.perf_counter()
+        for _, _, success in generate(client, requests, max_concurrency=concurrency):
+            failures += not success
+        durations.append(time.perf_counter() - start)
+    client.close()
+    records = telemetry.records()
+    return result(
+        "generation",
+        "scenario_structured" if structured else "scenario_batch",
+        {"rounds": rounds, "targets": len(BATCH_TARGETS), "concurrency": concurrency},
+        {
+            **latency_summary(durations),
+            "failures": failures,
+            "api_requests": server.requests,
+            "prompt_tokens": sum(record["prompt_tokens"] for record in records),
+            "completion_tokens": sum(record["completion_tokens"] for record in records)
+        }
+    )
+
+
+def bench_bulk(server: FakeOpenAIServer, rows: int, workers: int) -> Dict:
+    """교육청 단위 대량 작업: JSONL 작성, 로컬 백엔드 실행, 결과 수집"""
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    server.reset_counters()
+    requests = [dict(SAMPLE_REQUEST, school=f"학교{i:05d}") for i in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        manifest = compile_bulk_job(requests, job_dir=tmp)
+        compiled = time.perf_counter()
+        records, failures = run_bulk_job(LocalBatchBackend(client, max_workers=workers), manifest, poll_interval=0.05)
+        finished = time.perf_counter()
+    client.close()
+    elapsed = finished - start
+    return result(
+        "generation",
+        "bulk_job",
+        {"rows": rows, "workers": workers},
+        {
+            "compile_ms": round((compiled - start) * 1000, 3),
+            "total_s": round(elapsed, 4),
+            "rows_per_s": round(rows / elapsed, 2),
+            "succeeded": len(records),
+            "failures": len(failures),
+            "api_requests": server.requests
+        }
+    )
+
+
+def run(
+    quick: bool = False,
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    chunk_delay: float = 0.005,
+    seed: int = 0
+) -> List[Dict]:
+    scale = 1 if quick else 5
+    server_options = {"latency": latency, "jitter": jitter, "error_rate": error_rate, "chunk_delay": chunk_delay, "seed": seed}
+    results = []
+    with FakeOpenAIServer(**server_options) as server:
+        results.append(bench_single(server, 10 * scale))
+        results.append(bench_single(server, 10 * scale, cached=True))
+        results.append(bench_stream(server, 10 * scale))
+        results.append(bench_batch(server, 4 * scale, concurrency=3))
+        results.append(bench_batch(server, 4 * scale, concurrency=3, structured=True))
+        results.append(bench_bulk(server, 40 * scale, workers=8))
+    # 요청 2%가 1초 더 늦는 서버에서 헤지 요청 유무 비교 (p99 차이).
+    # 헤지 경로는 스트리밍으로 받으므로 조각 간격이 한쪽에만 더해지지 않도록 0으로 둠
+    with FakeOpenAIServer(**{**server_options, "chunk_delay": 0.0}, slow_rate=0.02, slow_latency=1.0) as server:
+        results.append(bench_hedged(server, 40 * scale, hedge=False))
+        results.append(bench_hedged(server, 40 * scale, hedge=True))
+    for item in results:
+        item["params"].update({key: value for key, value in server_options.items() if key != "seed"})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="문자 생성 경로 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="요청 수를 줄여 빠르게 실행")
+    parser.add_argument("--latency", type=float, default=0.05, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="일시적 오류 비율 (0~1)")
+    parser.add_argument("--chunk-delay", type=float, default=0.005, help="스트리밍 조각 간격(초)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.quick, args.latency, args.jitter, args.error_rate, args.chunk_delay):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<16} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
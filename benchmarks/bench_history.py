@@ -0,0 +1,161 @@
+"""생성 이력 저장소 벤치마크 (1천/1만/10만 건)
+
+임시 SQLite 파일에 이력을 채운 뒤 이력 탭이 재실행마다 하는 작업(건수, 페이지
+조회, 필터 조회, 통계)과 일괄 저장, 전체 검증의 소요 시간을 측정합니다.
+가장 큰 규모에서는 형식별(CSV, JSONL, Parquet) 내보내기·가져오기 시간과 내보내기 중 최대
+메모리 사용량을 전체 이력을 DataFrame으로 읽어 쓰는 방식과 비교합니다.
+
+    python benchmarks/bench_history.py --sizes 1000 10000 100000 --json
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.common import result, time_calls  # noqa: E402
+from history_io import available_formats, export_to_file, import_file  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from sms_validator import validate_history_frame  # noqa: E402
+
+TARGETS = ("학부모", "학생", "교직원")
+CATEGORIES = ("안전", "재난", "체험학습", "행사 안내", "상담", "안내")
+LENGTH_OPTIONS = ("매우 짧게", "짧게", "표준", "길게", "매우 길게")
+PAGE_SIZE = 20
+
+
+def synthetic_records(rows: int, seed: int = 0) -> List[Dict]:
+    """대상·카테고리가 고르게 섞인 가짜 이력"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        content = f"[○○학교] 안내 문자 {i}번입니다. " + "확인 부탁드립니다. " * rng.randint(1, 6)
+        records.append({
+            "timestamp": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{i % 60:02d}",
+            "school": f"학교{rng.randint(0, 499):03d}",
+            "target": rng.choice(TARGETS),
+            "category": rng.choice(CATEGORIES),
+            "content": content,
+            "length": len(content),
+            "style": "기본",
+            "length_option": rng.choice(LENGTH_OPTIONS)
+        })
+    return records
+
+
+def _median_ms(timings: List[float]) -> float:
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def bench_size(rows: int, repeat: int) -> Dict:
+    records = synthetic_records(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(str(Path(tmp) / "history.db"))
+        start = time.perf_counter()
+        store.add_many(records)
+        insert_s = time.perf_counter() - start
+
+        last_page_offset = max(0, (rows // PAGE_SIZE - 1) * PAGE_SIZE)
+        metrics = {
+            "insert_rows_per_s": round(rows / insert_s, 1),
+            "count_ms": _median_ms(time_calls(store.count, repeat)),
+            "first_page_ms": _median_ms(time_calls(lambda: store.query(limit=PAGE_SIZE), repeat)),
+            "last_page_ms": _median_ms(time_calls(lambda: store.query(limit=PAGE_SIZE, offset=last_page_offset), repeat)),
+            "filtered_page_ms": _median_ms(time_calls(lambda: store.query("학생", "안전", limit=PAGE_SIZE), repeat)),
+            "filtered_count_ms": _median_ms(time_calls(lambda: store.count("학생", "안전"), repeat)),
+            "stats_ms": _median_ms(time_calls(lambda: store.stats("학생"), repeat)),
+            "compute_stats_ms": _median_ms(time_calls(lambda: store.compute_stats("학생"), repeat)),
+            "single_add_ms": _median_ms(time_calls(lambda: store.add(records[0]), repeat))
+        }
+        # 이력 탭의 전체 검증 (필터된 이력을 DataFrame으로 읽어 열 단위 검증)
+        start = time.perf_counter()
+        validate_history_frame(pd.DataFrame(store.query("학생", limit=None)))
+        metrics["validate_filtered_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result("history", f"history_{rows}", {"rows": rows, "repeat": repeat}, metrics)
+
+
+def _peak_mb(fn) -> float:
+    """fn 실행 중 파이썬 메모리 할당 최댓값(MB, tracemalloc 기준. 추적 비용 때문에 시간은 따로 측정)"""
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_export(rows: int) -> List[Dict]:
+    """형식별 묶음 내보내기·가져오기 (가져오기는 빈 저장소에 한 번, 같은 파일로 한 번 더 = 모두 중복)"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(str(Path(tmp) / "history.db"))
+        store.add_many(synthetic_records(rows))
+
+        # 비교 기준: 전체 이력을 DataFrame으로 읽어 CSV 문자열을 만드는 방식
+        def dataframe_export() -> None:
+            pd.DataFrame(store.query(limit=None)).to_csv(index=False)
+
+        results.append(result("history", f"export_dataframe_csv_{rows}", {"rows": rows}, {
+            "export_ms": _median_ms(time_calls(dataframe_export, 1)),
+            "peak_mb": _peak_mb(dataframe_export)
+        }))
+
+        for fmt in available_formats():
+            path = Path(tmp) / f"history.{fmt}"
+
+            def export() -> None:
+                with open(path, "wb") as f:
+                    export_to_file(store, f, fmt)
+
+            export_ms = _median_ms(time_calls(export, 1))
+            peak = _peak_mb(export)
+
+            target = HistoryStore(str(Path(tmp) / f"import_{fmt}.db"))
+            timings, counts = [], []
+            for _ in range(2):
+                start = time.perf_counter()
+                with open(path, "rb") as f:
+                    counts.append(import_file(target, f, fmt))
+                timings.append(time.perf_counter() - start)
+            results.append(result("history", f"export_{fmt}_{rows}", {"rows": rows}, {
+                "export_ms": export_ms,
+                "peak_mb": peak,
+                "file_mb": round(path.stat().st_size / 1024 / 1024, 2),
+                "import_rows_per_s": round(rows / timings[0], 1),
+                "reimport_rows_per_s": round(rows / timings[1], 1),
+                "imported": counts[0]["imported"],
+                "duplicates": counts[1]["duplicates"]
+            }))
+    return results
+
+
+def run(sizes=(1000, 10000, 100000), repeat: int = 20) -> List[Dict]:
+    return [bench_size(rows, repeat) for rows in sizes] + bench_export(max(sizes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="생성 이력 저장소 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20, help="조회 작업 반복 횟수 (중앙값 보고)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.sizes, args.repeat):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<16} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
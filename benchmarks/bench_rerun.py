@@ -0,0 +1,128 @@
+"""Streamlit 스크립트 재실행 비용 벤치마크 (streamlit.testing AppTest)
+
+app.py 전체를 AppTest로 실행해 첫 실행, 변경 없는 재실행, 입력 변경 재실행,
+생성 버튼 재실행 시간을 측정합니다. API는 로컬 스텁 서버로 대체하고, 캐시·이력·계측
+파일은 임시 디렉터리에 만듭니다.
+
+AppTest는 항상 전체 스크립트를 실행하므로, 탭 위젯을 바꿨을 때 실제로 다시 그려지는
+탭 fragment 하나의 비용은 앱이 세션에 남기는 탭별 렌더링 시간(render_timings)으로 따로 보고합니다.
+
+    python benchmarks/bench_rerun.py --history-rows 10000 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from streamlit import logger as streamlit_logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from benchmarks.bench_history import synthetic_records  # noqa: E402
+from benchmarks.common import ROOT, result  # noqa: E402
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+
+APP_PATH = str(ROOT / "app.py")
+
+
+def _timed(action: Callable[[], AppTest]) -> float:
+    start = time.perf_counter()
+    app = action()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"app.py 실행 중 오류: {app.exception[0].value}")
+    return elapsed
+
+
+def _stats(timings: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3)
+    }
+
+
+def bench_rerun(history_rows: int, repeat: int) -> List[Dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        history_path = str(Path(tmp) / "history.db")
+        if history_rows:
+            HistoryStore(history_path).add_many(synthetic_records(history_rows))
+
+        app = AppTest.from_file(APP_PATH, default_timeout=120)
+        app.secrets["OPENAI_API_KEY"] = "sk-bench"
+        app.secrets["SMS_CACHE_PATH"] = str(Path(tmp) / "cache.db")
+        app.secrets["SMS_HISTORY_PATH"] = history_path
+        app.secrets["SIMILAR_INDEX_PATH"] = str(Path(tmp) / "similar.db")
+        app.secrets["SMS_DISPATCH_PATH"] = str(Path(tmp) / "dispatch.db")
+        app.secrets["TELEMETRY_LOG_PATH"] = str(Path(tmp) / "telemetry.jsonl")
+
+        timings = {"first_run": [_timed(app.run)]}
+        timings["idle_rerun"] = []
+        fragment_timings: Dict[str, List[float]] = {}
+        for _ in range(repeat):
+            timings["idle_rerun"].append(_timed(app.run))
+            for tab, elapsed in app.session_state["render_timings"].items():
+                fragment_timings.setdefault(f"fragment_{tab}", []).append(elapsed)
+        timings.update(fragment_timings)
+
+        # 주요 내용은 폼 안이라 브라우저에서는 입력만으로 재실행되지 않음 (AppTest에서는 전체 재실행)
+        content = next(widget for widget in app.text_area if widget.label == "주요 내용")
+        timings["input_change_rerun"] = [
+            _timed(lambda i=i: content.input(f"내일 오전 강한 비 예상 {i}").run()) for i in range(repeat)
+        ]
+
+        # 같은 입력으로 반복하면 두 번째부터 응답 캐시 적중
+        def click_generate() -> AppTest:
+            return next(button for button in app.button if "AI 문자 생성" in button.label).click().run()
+        timings["generate_rerun"] = [_timed(click_generate) for _ in range(repeat)]
+
+    params = {"history_rows": history_rows, "repeat": repeat}
+    return [result("rerun", f"{name}_{history_rows}", params, _stats(values)) for name, values in timings.items()]
+
+
+def run(history_sizes=(0, 10000), repeat: int = 5, latency: float = 0.05) -> List[Dict]:
+    results = []
+    # 빈 label 경고 등 앱 실행 로그가 결과 출력에 섞이지 않도록
+    streamlit_logger.set_log_level("error")
+    previous_base_url = os.environ.get("OPENAI_BASE_URL")
+    with FakeOpenAIServer(latency=latency) as server:
+        # app.py는 공용 클라이언트를 환경 변수의 base_url로 만듦
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        try:
+            for rows in history_sizes:
+                results += bench_rerun(rows, repeat)
+        finally:
+            if previous_base_url is None:
+                os.environ.pop("OPENAI_BASE_URL", None)
+            else:
+                os.environ["OPENAI_BASE_URL"] = previous_base_url
+    for item in results:
+        item["params"]["latency"] = latency
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streamlit 재실행 비용 벤치마크")
+    parser.add_argument("--history-rows", type=int, nargs="+", default=[0, 10000], help="미리 채울 이력 건수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.history_rows, args.repeat, args.latency):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<28} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
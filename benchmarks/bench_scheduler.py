@@ -0,0 +1,159 @@
+"""여러 세션이 API 키 하나를 함께 쓸 때의 공정 스케줄링 벤치마크
+
+동시 처리 수가 제한된 로컬 스텁 서버에 대해 여러 학교 세션을 동시에 흉내 냅니다.
+
+- 큰 학교 하나가 시나리오 일괄 생성(generate_batch_sms)으로 요청을 한꺼번에 보냄
+- 작은 학교 하나가 그보다 적은 일괄 생성을 같이 보냄
+- 다른 학교 교사 여러 명이 화면에서 단일 생성(generate_ai_sms)을 차례로 요청
+
+스케줄러 없이(도착 순서) 보낸 경우와 FairScheduler를 거친 경우의 단일 생성 지연 분포,
+학교별 일괄 생성 완료 시간, 스케줄러 대기 시간을 비교합니다.
+
+    python benchmarks/bench_scheduler.py --json
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import SAMPLE_REQUEST, latency_summary, result  # noqa: E402
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from openai_client import build_openai_client  # noqa: E402
+from resilience import APIGuard, FairScheduler, RateLimiter, scheduling  # noqa: E402
+from sms_engine import generate_ai_sms, generate_batch_sms, latency_histogram  # noqa: E402
+
+
+def _guard(scheduler: Optional[FairScheduler]) -> APIGuard:
+    # 속도 제한 대기가 결과를 왜곡하지 않도록 한도는 넉넉하게 (차이는 서버 동시 처리 수에서만 생김)
+    return APIGuard(
+        rate_limiter=RateLimiter(1_000_000, 1_000_000_000),
+        base_delay=0.05,
+        max_delay=0.5,
+        scheduler=scheduler
+    )
+
+
+def _batch_session(client, guard: APIGuard, school: str, requests: int, concurrency: int, finished: Dict) -> None:
+    batch = [
+        dict(SAMPLE_REQUEST, school=school, content_details=f"{school} 일괄 {i}", guard=guard, validate=False, hedge=False)
+        for i in range(requests)
+    ]
+    start = time.perf_counter()
+    with scheduling(tenant=school):
+        for _ in generate_batch_sms(client, batch, max_concurrency=concurrency):
+            pass
+    finished[school] = time.perf_counter() - start
+
+
+def _interactive_session(client, guard: APIGuard, school: str, requests: int, think_s: float, latencies: List[float]) -> None:
+    for i in range(requests):
+        time.sleep(think_s)
+        request = dict(SAMPLE_REQUEST, school=school, content_details=f"{school} 단일 {i}")
+        start = time.perf_counter()
+        generate_ai_sms(client=client, guard=guard, validate=False, hedge=False, **request)
+        latencies.append(time.perf_counter() - start)
+
+
+def bench_sessions(
+    server: FakeOpenAIServer,
+    scheduler: Optional[FairScheduler],
+    large_batch: int,
+    small_batch: int,
+    batch_concurrency: int,
+    teachers: int,
+    teacher_requests: int,
+    think_s: float
+) -> Dict:
+    """일괄 생성 두 학교와 단일 생성 교사들을 동시에 실행"""
+    client = build_openai_client("sk-bench", base_url=server.base_url)
+    guard = _guard(scheduler)
+    latency_histogram.clear()
+    server.reset_counters()
+    batch_finished: Dict[str, float] = {}
+    interactive: List[float] = []
+    sessions = [
+        threading.Thread(target=_batch_session, args=(client, guard, "큰학교", large_batch, batch_concurrency, batch_finished)),
+        threading.Thread(target=_batch_session, args=(client, guard, "작은학교", small_batch, batch_concurrency, batch_finished))
+    ]
+    sessions += [
+        threading.Thread(
+            target=_interactive_session, args=(client, guard, f"교사학교{i}", teacher_requests, think_s, interactive)
+        )
+        for i in range(teachers)
+    ]
+    start = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    metrics = {
+        **{f"interactive_{key}": value for key, value in latency_summary(interactive).items()},
+        "large_batch_s": round(batch_finished["큰학교"], 3),
+        "small_batch_s": round(batch_finished["작은학교"], 3),
+        "total_s": round(elapsed, 3),
+        "api_requests": server.requests
+    }
+    if scheduler is not None:
+        snapshot = scheduler.snapshot()
+        for priority, stats in snapshot["priorities"].items():
+            metrics[f"{priority}_wait_p95_ms"] = stats["wait_p95_ms"]
+    return result(
+        "scheduler",
+        "fair" if scheduler is not None else "fifo",
+        {
+            "large_batch": large_batch,
+            "small_batch": small_batch,
+            "batch_concurrency": batch_concurrency,
+            "teachers": teachers,
+            "teacher_requests": teacher_requests
+        },
+        metrics
+    )
+
+
+def run(quick: bool = False, latency: float = 0.05, capacity: int = 8, seed: int = 0) -> List[Dict]:
+    scale = 1 if quick else 3
+    options = {
+        "large_batch": 40 * scale,
+        "small_batch": 10 * scale,
+        "batch_concurrency": 16,
+        "teachers": 4,
+        "teacher_requests": 5 * scale,
+        "think_s": 0.05
+    }
+    results = []
+    with FakeOpenAIServer(latency=latency, capacity=capacity, seed=seed) as server:
+        results.append(bench_sessions(server, None, **options))
+        # 서버가 동시에 처리하는 수만큼만 자리를 두어 넘치는 요청은 스케줄러에서 순서를 정함
+        results.append(bench_sessions(server, FairScheduler(max_concurrency=capacity, tenant_concurrency=capacity - 2), **options))
+    for item in results:
+        item["params"].update({"latency": latency, "capacity": capacity})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="공정 스케줄링 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="요청 수를 줄여 빠르게 실행")
+    parser.add_argument("--latency", type=float, default=0.05, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--capacity", type=int, default=8, help="스텁 서버가 동시에 처리하는 요청 수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.quick, args.latency, args.capacity):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<6} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
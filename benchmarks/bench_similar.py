@@ -0,0 +1,134 @@
+"""비슷한 요청 색인 벤치마크 (1만/10만 건)
+
+임시 SQLite 파일에 가짜 요청·문자를 채운 뒤 색인 구축, 다시 불러오기, 제안 조회
+지연 시간을 측정합니다. 조회는 저장된 요청의 표현을 조금 바꾼 요청(적중 기대)과
+관련 없는 요청(미적중 기대)을 섞어 보내고, 모든 항목이 한 그룹에 몰린 최악의 경우도 따로 잽니다.
+
+    python benchmarks/bench_similar.py --sizes 10000 100000 --json
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_history import CATEGORIES, TARGETS  # noqa: E402
+from benchmarks.common import latency_summary, result  # noqa: E402
+from similar_index import SimilarRequestIndex  # noqa: E402
+
+STYLES = ("기본", "친근함", "긴급함", "공식적", "안내형")
+PHRASES = (
+    "강한 비 예상", "우산 준비", "등하교 시 안전 주의", "빗길 미끄러움", "폭설 예보", "실내 대피",
+    "현장체험학습 실시", "도시락 지참", "물과 간식 준비", "학부모 상담 주간", "담임교사에게 신청",
+    "가을 축제 개최", "운동장 집합", "미세먼지 나쁨", "실외 활동 자제", "마스크 착용", "단축 수업",
+    "급식 없음", "방과후 수업 휴강", "교복 착용", "체육복 지참", "독감 예방접종", "건강 상태 확인",
+    "통학 버스 시간 변경", "정문 앞 횡단보도", "교무실 문의", "학교 홈페이지 참조", "신청서 제출"
+)
+QUERY_SUFFIXES = ("부탁", "꼭 챙기기", "바랍니다", "확인 필요", "참고")
+
+
+def synthetic_items(rows: int, single_group: bool, seed: int = 0) -> List[Tuple[Dict, str]]:
+    """(요청, 문자) 목록. 문자는 '표준' 길이 기준과 날짜·학교를 포함하도록 구성"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(rows):
+        content = ", ".join(rng.sample(PHRASES, rng.randint(2, 4)))
+        request = {
+            "target": TARGETS[0] if single_group else rng.choice(TARGETS),
+            "category": CATEGORIES[0] if single_group else rng.choice(CATEGORIES),
+            "length_option": "표준",
+            "style_option": STYLES[0] if single_group else rng.choice(STYLES),
+            "content_details": f"{content} {i}",
+            "additional_info": {},
+            "school": f"학교{i % 500:03d}",
+            "date": "10월 18일"
+        }
+        message = f"[{request['school']}] 10월 18일 {content} 관련 안내드립니다. 자녀 지도와 가정에서의 확인을 부탁드립니다."
+        items.append((request, message.ljust(60, ".")))
+    return items
+
+
+def _query(rng: random.Random, items: List[Tuple[Dict, str]], related: bool) -> Dict:
+    if related:
+        request = dict(rng.choice(items)[0])
+        request["content_details"] = f"{request['content_details']} {rng.choice(QUERY_SUFFIXES)}"
+    else:
+        request = dict(items[0][0], content_details=f"전혀 다른 요청 {rng.random()}")
+    return dict(request, school="새학교", date="10월 20일")
+
+
+def bench_size(rows: int, single_group: bool, queries: int) -> Dict:
+    items = synthetic_items(rows, single_group)
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "similar.db")
+        start = time.perf_counter()
+        SimilarRequestIndex(db_path).add_many(items)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SimilarRequestIndex(db_path)
+        load_s = time.perf_counter() - start
+
+        hit_latencies, miss_latencies, hits = [], [], 0
+        for i in range(queries):
+            related = i % 2 == 0
+            request = _query(rng, items, related)
+            start = time.perf_counter()
+            suggestion = index.suggest(request)
+            elapsed = time.perf_counter() - start
+            (hit_latencies if related else miss_latencies).append(elapsed)
+            hits += related and suggestion is not None
+
+        request, message = items[0]
+        start = time.perf_counter()
+        index.add(dict(request, content_details=f"{request['content_details']} 추가"), message)
+        add_s = time.perf_counter() - start
+
+    hit = latency_summary(hit_latencies)
+    miss = latency_summary(miss_latencies)
+    return result(
+        "similar",
+        f"{'single_group' if single_group else 'spread'}_{rows}",
+        {"rows": rows, "single_group": single_group, "queries": queries},
+        {
+            "build_rows_per_s": round(rows / build_s, 1),
+            "load_ms": round(load_s * 1000, 3),
+            **{f"related_{key}": value for key, value in hit.items()},
+            **{f"unrelated_{key}": value for key, value in miss.items()},
+            "related_hit_rate": round(hits / max(1, len(hit_latencies)), 3),
+            "single_add_ms": round(add_s * 1000, 3)
+        }
+    )
+
+
+def run(sizes=(10000, 100000), queries: int = 1000) -> List[Dict]:
+    results = []
+    for rows in sizes:
+        results.append(bench_size(rows, single_group=False, queries=queries))
+        results.append(bench_size(rows, single_group=True, queries=queries))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="비슷한 요청 색인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=1000, help="조회 횟수 (절반은 비슷한 요청)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.sizes, args.queries):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<22} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""앱 시작 비용 벤치마크 (모듈 불러오기 시간, 첫 화면 그리기 시간)
+
+이미 불러온 모듈의 영향을 받지 않도록 매번 새 파이썬 프로세스에서 측정합니다.
+
+- imports: app.py가 맨 위에서 불러오는 모듈을 `python -X importtime`으로 불러와 전체·모듈별 누적 시간과
+  함께 불러와진 무거운 모듈(openai, httpx, pandas, numpy, pyarrow)을 기록
+- first_paint: AppTest로 app.py를 처음 실행(첫 화면)한 시간과 바로 이어서 다시 실행한 시간,
+  첫 화면까지 불러와진 무거운 모듈 (저장된 이력이 있는 경우도 측정)
+
+무거운 모듈이 첫 화면에 다시 나타나면 시작 시간 회귀입니다.
+
+    python benchmarks/bench_startup.py --json
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import ROOT, result  # noqa: E402
+
+APP_PATH = ROOT / "app.py"
+HEAVY_MODULES = ("openai", "httpx", "pandas", "numpy", "pyarrow")
+
+
+def app_imports() -> List[str]:
+    """app.py가 맨 위에서 바로 불러오는 모듈 (TYPE_CHECKING 블록과 함수 안 import 제외)"""
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, timeout=300, check=True)
+
+
+def _parse_importtime(stderr: str) -> Dict[str, Dict]:
+    """-X importtime 출력 → {모듈: {"cumulative_us", "top_level"}} (처음 불러온 위치 기준)"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 머리글 줄
+        modules.setdefault(name.strip(), {
+            "cumulative_us": int(cumulative),
+            "top_level": not name[1:].startswith(" ")
+        })
+    return modules
+
+
+def bench_imports(repeat: int) -> Dict:
+    modules = app_imports()
+    totals, runs = [], []
+    for _ in range(repeat):
+        parsed = _parse_importtime(_python("-X", "importtime", "-c", f"import {', '.join(modules)}").stderr)
+        totals.append(sum(item["cumulative_us"] for item in parsed.values() if item["top_level"]))
+        runs.append(parsed)
+
+    def median_ms(name: str) -> float:
+        values = [run[name]["cumulative_us"] for run in runs if name in run]
+        return round(statistics.median(values) / 1000, 3) if values else 0.0
+
+    heavy = [name for name in HEAVY_MODULES if name in runs[-1]]
+    return result(
+        "startup",
+        "imports",
+        {"repeat": repeat, "modules": len(modules)},
+        {
+            "import_total_ms": round(statistics.median(totals) / 1000, 3),
+            "streamlit_ms": median_ms("streamlit"),
+            # 이 저장소의 모듈만 따로 (표준 라이브러리는 합계에만 포함)
+            **{f"{name}_ms": median_ms(name) for name in modules if (ROOT / f"{name}.py").exists()},
+            "heavy_modules": heavy,
+            "heavy_import_ms": round(sum(median_ms(name) for name in heavy), 3)
+        }
+    )
+
+
+def _first_paint_child(tmp: str) -> None:
+    """새 프로세스에서 실행: 첫 실행·재실행 시간과 첫 화면 뒤 불러와진 무거운 모듈을 JSON으로 출력"""
+    import time
+
+    from streamlit import logger as streamlit_logger
+    from streamlit.testing.v1 import AppTest
+
+    streamlit_logger.set_log_level("error")
+    app = AppTest.from_file(str(APP_PATH), default_timeout=120)
+    app.secrets["OPENAI_API_KEY"] = "sk-bench"
+    app.secrets["SMS_CACHE_PATH"] = str(Path(tmp) / "cache.db")
+    app.secrets["SMS_HISTORY_PATH"] = str(Path(tmp) / "history.db")
+    app.secrets["SIMILAR_INDEX_PATH"] = str(Path(tmp) / "similar.db")
+    app.secrets["SMS_DISPATCH_PATH"] = str(Path(tmp) / "dispatch.db")
+    app.secrets["TELEMETRY_LOG_PATH"] = str(Path(tmp) / "telemetry.jsonl")
+
+    start = time.perf_counter()
+    app.run()
+    first_paint = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"app.py 실행 중 오류: {app.exception[0].value}")
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    start = time.perf_counter()
+    app.run()
+    rerun = time.perf_counter() - start
+    print(json.dumps({"first_paint_s": first_paint, "rerun_s": rerun, "heavy_modules": heavy}))
+
+
+def bench_first_paint(history_rows: int, repeat: int) -> Dict:
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            if history_rows:
+                from benchmarks.bench_history import synthetic_records
+                from history_store import HistoryStore
+                HistoryStore(str(Path(tmp) / "history.db")).add_many(synthetic_records(history_rows))
+            output = _python("-c", f"from benchmarks.bench_startup import _first_paint_child; _first_paint_child({tmp!r})").stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+    return result(
+        "startup",
+        f"first_paint_{history_rows}",
+        {"history_rows": history_rows, "repeat": repeat},
+        {
+            "first_paint_ms": round(statistics.median(run["first_paint_s"] for run in runs) * 1000, 3),
+            "rerun_ms": round(statistics.median(run["rerun_s"] for run in runs) * 1000, 3),
+            "heavy_modules": runs[-1]["heavy_modules"]
+        }
+    )
+
+
+def run(history_sizes=(0, 1000), repeat: int = 3) -> List[Dict]:
+    return [bench_imports(repeat)] + [bench_first_paint(rows, repeat) for rows in history_sizes]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="앱 시작 비용 벤치마크")
+    parser.add_argument("--history-rows", type=int, nargs="+", default=[0, 1000], help="첫 화면 측정 시 미리 저장할 이력 수")
+    parser.add_argument("--repeat", type=int, default=3, help="새 프로세스로 반복 측정할 횟수 (중앙값 보고)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+
+    for item in run(args.history_rows, args.repeat):
+        if args.json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            metrics = ", ".join(f"{key}={value}" for key, value in item["metrics"].items())
+            print(f"{item['name']:<16} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""벤치마크 공통 도구 (시간 측정, 결과 형식, 실행 환경 정보)"""
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from telemetry import percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLE_REQUEST = {
+    "target": "학부모",
+    "category": "안전",
+    "content_details": "내일 오전 강한 비 예상, 우산 준비 및 등하교 시 안전 주의",
+    "date": "내일",
+    "school": "○○초등학교",
+    "additional_info": {},
+    "tone_guide": "",
+    "length_option": "표준",
+    "style_option": "기본"
+}
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    """초 단위 측정값을 ms 단위 p50/p95/p99/평균으로 요약"""
+    values = sorted(latencies_s)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int) -> List[float]:
+    """fn을 repeat번 호출해 각 소요 시간(초) 목록 반환"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def result(benchmark: str, name: str, params: Dict, metrics: Dict) -> Dict:
+    """벤치마크 결과 한 건 (run_all.py 비교 시 benchmark/name/params로 같은 항목을 찾음)"""
+    return {"benchmark": benchmark, "name": name, "params": params, "metrics": metrics}
+
+
+def environment() -> Dict:
+    """결과 파일에 함께 남기는 실행 환경"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
@@ -0,0 +1,193 @@
+"""발송 벤치마크용 로컬 문자 게이트웨이 스텁 서버
+
+sms_dispatch.HTTPGateway가 쓰는 형식의 POST .../messages 요청을 받아 실제로 보내지 않고
+접수 결과를 돌려줍니다. 응답 지연(latency), 배치 전체 일시적 오류 비율(error_rate, 503),
+문자별 일시적 거절 비율(reject_rate)을 설정할 수 있고, 같은 문자 id가 두 번 접수되면
+duplicates로 셉니다. idempotency_key가 이미 접수된 문자는 다시 보내지 않고 처음 결과를 돌려주며
+deduplicated로 셉니다. partial_delivery를 켜면 503 배치의 앞쪽 절반을 접수한 뒤 오류를 돌려줍니다.
+
+    python benchmarks/fake_gateway.py --port 8780 --latency 0.05 --error-rate 0.02 --reject-rate 0.01
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: "_StubHTTPServer"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        messages = body.get("messages", [])
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failed = server.error_rate > 0 and server.random.random() < server.error_rate
+            rejected = {
+                message["id"] for message in messages
+                if server.reject_rate > 0 and server.random.random() < server.reject_rate
+            }
+            delay = server.latency
+
+        if delay:
+            time.sleep(delay)
+
+        if not self.path.endswith("/messages"):
+            self._send_json(404, {"error": "not found"})
+            return
+        if len(messages) > server.max_batch_size:
+            self._send_json(413, {"error": f"batch larger than {server.max_batch_size}"})
+            return
+        if failed:
+            with server.lock:
+                server.errors += 1
+                if server.partial_delivery:
+                    for message in messages[:len(messages) // 2]:
+                        self._accept(message)
+            self._send_json(503, {"error": "stub transient error"})
+            return
+
+        results = []
+        with server.lock:
+            for message in messages:
+                if message["id"] in rejected and message.get("idempotency_key") not in server.delivered:
+                    server.rejected += 1
+                    results.append({"id": message["id"], "status": "rejected", "error": "stub busy", "retryable": True})
+                    continue
+                results.append({"id": message["id"], "status": "accepted", "message_id": self._accept(message)})
+        self._send_json(200, {"results": results})
+
+    def _accept(self, message: dict) -> str:
+        """문자를 접수하고 게이트웨이 문자 id 반환 (server.lock을 잡은 상태에서 호출)"""
+        server = self.server
+        key = message.get("idempotency_key")
+        if key in server.delivered:
+            server.deduplicated += 1
+            return server.delivered[key]
+        if message["id"] in server.accepted_ids:
+            server.duplicates += 1
+        server.accepted_ids.add(message["id"])
+        server.types[message.get("type", "SMS")] = server.types.get(message.get("type", "SMS"), 0) + 1
+        message_id = f"gw-{message['id']}"
+        if key is not None:
+            server.delivered[key] = message_id
+        return message_id
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 배치 요청이 많아도 연결이 거절되지 않도록
+    request_queue_size = 128
+
+
+class FakeGatewayServer:
+    """별도 스레드에서 실행되는 문자 게이트웨이 스텁 (with 문으로 사용)"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        reject_rate: float = 0.0,
+        max_batch_size: int = 1000,
+        partial_delivery: bool = False,
+        seed: int = 0
+    ):
+        self._httpd = _StubHTTPServer((host, port), _Handler)
+        self._httpd.lock = threading.Lock()
+        self._httpd.latency = latency
+        self._httpd.error_rate = error_rate
+        self._httpd.reject_rate = reject_rate
+        self._httpd.max_batch_size = max_batch_size
+        self._httpd.partial_delivery = partial_delivery
+        self._httpd.random = random.Random(seed)
+        self.reset_counters()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def counters(self) -> dict:
+        with self._httpd.lock:
+            return {
+                "connections": self._httpd.connections,
+                "requests": self._httpd.requests,
+                "errors": self._httpd.errors,
+                "rejected": self._httpd.rejected,
+                "accepted": len(self._httpd.accepted_ids),
+                "duplicates": self._httpd.duplicates,
+                "deduplicated": self._httpd.deduplicated,
+                "types": dict(self._httpd.types)
+            }
+
+    def reset_counters(self) -> None:
+        with self._httpd.lock:
+            self._httpd.connections = 0
+            self._httpd.requests = 0
+            self._httpd.errors = 0
+            self._httpd.rejected = 0
+            self._httpd.duplicates = 0
+            self._httpd.deduplicated = 0
+            self._httpd.accepted_ids = set()
+            self._httpd.delivered = {}
+            self._httpd.types = {}
+
+    def __enter__(self) -> "FakeGatewayServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--latency", type=float, default=0.0, help="배치 응답 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="배치 전체를 503으로 실패시킬 비율 (0~1)")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="문자별 일시적 거절 비율 (0~1)")
+    parser.add_argument("--max-batch-size", type=int, default=1000)
+    parser.add_argument("--partial-delivery", action="store_true", help="503 배치의 앞쪽 절반을 접수한 뒤 오류 응답")
+    args = parser.parse_args()
+
+    with FakeGatewayServer(
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        reject_rate=args.reject_rate,
+        max_batch_size=args.max_batch_size,
+        partial_delivery=args.partial_delivery
+    ) as server:
+        print(f"SMS_GATEWAY_URL={server.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,297 @@
+"""벤치마크용 로컬 OpenAI 호환 스텁 서버
+
+실제 API를 호출하지 않고 /v1/chat/completions 응답을 흉내 냅니다.
+응답 지연(latency), 지연 편차(jitter), 오류 비율(error_rate), 꼬리 지연(slow_rate 비율의
+요청에 slow_latency초 추가), 동시 처리 수(capacity, 넘는 요청은 차례를 기다림)를 설정할 수 있고
+stream=True 요청에는 SSE 조각으로 응답하고, response_format에 JSON 스키마가 있으면
+필수 필드마다 같은 답변을 담은 JSON 객체로 응답합니다 (답변이 이미 JSON 객체면 그대로).
+테스트에서는 replies·latencies로 요청 순서별 답변·오류·지연을 정할 수 있습니다.
+
+    python benchmarks/fake_openai.py --port 8765 --latency 0.3 --jitter 0.1 --error-rate 0.05
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Union
+
+DEFAULT_REPLY = (
+    "[○○초등학교] 내일 오전 강한 비가 예상됩니다. 등하교 시 우산을 꼭 챙기고, "
+    "미끄러운 길에서는 천천히 걷도록 지도 부탁드립니다."
+)
+PROMPT_TOKENS = 200
+COMPLETION_TOKENS = 40
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 한 번에 보내 지연 ACK로 인한 인위적인 대기 방지
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: "_StubHTTPServer"
+
+    def setup(self):
+        super().setup()
+        # keep-alive 연결 하나당 핸들러 하나가 만들어지므로 새 TCP 연결 수를 셀 수 있음
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            request_id = server.requests
+            delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0.0)
+            if server.slow_rate > 0 and server.random.random() < server.slow_rate:
+                delay += server.slow_latency
+            failed = server.error_rate > 0 and server.random.random() < server.error_rate
+            status = server.error_status
+            reply = server.reply
+            # 순서가 정해진 답변·지연 (정수 답변은 그 상태 코드의 오류 응답)
+            if request_id <= len(server.latencies):
+                delay += server.latencies[request_id - 1]
+            if request_id <= len(server.replies):
+                scripted = server.replies[request_id - 1]
+                if isinstance(scripted, int):
+                    failed, status = True, scripted
+                else:
+                    reply = scripted
+            if failed:
+                server.errors += 1
+
+        # 동시 처리 수를 넘는 요청은 앞선 요청이 끝날 때까지 기다림 (공유 API 키의 처리 한도 흉내)
+        if server.capacity_slots is not None:
+            server.capacity_slots.acquire()
+        try:
+            self._respond(body, request_id, delay, failed, status, reply)
+        finally:
+            if server.capacity_slots is not None:
+                server.capacity_slots.release()
+
+    def _respond(self, body: dict, request_id: int, delay: float, failed: bool, status: int, reply: str):
+        server = self.server
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            # 재시도 경로를 확인할 수 있도록 일시적 오류로 응답
+            self._send_json(
+                status,
+                {"error": {"message": "stub transient error", "type": "server_error", "code": None}},
+                headers={"retry-after-ms": str(server.retry_after_ms)} if server.retry_after_ms else None
+            )
+            return
+
+        n = int(body.get("n", 1))
+        usage = {
+            "prompt_tokens": PROMPT_TOKENS,
+            "completion_tokens": COMPLETION_TOKENS * n,
+            "total_tokens": PROMPT_TOKENS + COMPLETION_TOKENS * n,
+            "prompt_tokens_details": {"cached_tokens": server.cached_tokens}
+        }
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            self._send_stream(request_id, body, reply, usage if include_usage else None)
+            return
+
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema" and not reply.startswith("{"):
+            fields = response_format["json_schema"]["schema"].get("required", [])
+            reply = json.dumps({field: reply for field in fields}, ensure_ascii=False)
+        payload = {
+            "id": f"chatcmpl-stub-{request_id}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": i,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }
+                for i in range(n)
+            ],
+            "usage": usage
+        }
+        self._send_json(200, payload)
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, request_id: int, body: dict, reply: str, usage: Optional[dict]):
+        # 청크 전송 인코딩으로 조각을 chunk_delay 간격으로 나눠 보냄
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(choices: list, extra: Optional[dict] = None) -> None:
+            chunk = {
+                "id": f"chatcmpl-stub-{request_id}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": choices,
+                **(extra or {})
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        size = self.server.stream_chunk_chars
+        for i in range(0, len(reply), size):
+            if i and self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+            event([{"index": 0, "delta": {"content": reply[i:i + size]}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage is not None:
+            event([], {"usage": usage})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 세션을 흉내 낼 때 새 연결이 접속 대기열(기본 5)에서 밀려 재전송 지연이 생기지 않도록
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # 헤지 요청에서 진 쪽처럼 클라이언트가 스트림을 먼저 닫은 경우는 정상 종료로 취급
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeOpenAIServer:
+    """별도 스레드에서 실행되는 OpenAI 호환 스텁 (with 문으로 사용)
+
+    latency + uniform(0, jitter)초 뒤 응답하고, error_rate 비율의 요청은
+    error_status(기본 500)로 실패시킵니다. slow_rate 비율의 요청은 slow_latency초 더
+    늦게 응답합니다 (꼬리 지연). capacity를 주면 그 수만큼만 동시에 처리합니다. seed를 주면 지연·오류 순서가 재현됩니다.
+    replies·latencies는 도착 순서대로 n번째 요청의 답변(정수면 그 상태 코드로 실패)과 더할 지연(초)이며,
+    목록이 끝나면 reply와 기본 지연을 씁니다.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        reply: Optional[str] = None,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        retry_after_ms: int = 0,
+        chunk_delay: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        stream_chunk_chars: int = 4,
+        cached_tokens: int = 0,
+        capacity: int = 0,
+        seed: Optional[int] = None,
+        replies: Optional[List[Union[str, int]]] = None,
+        latencies: Optional[List[float]] = None
+    ):
+        self._httpd = _StubHTTPServer((host, port), _Handler)
+        self._httpd.lock = threading.Lock()
+        self._httpd.connections = 0
+        self._httpd.requests = 0
+        self._httpd.errors = 0
+        self._httpd.latency = latency
+        self._httpd.reply = reply or DEFAULT_REPLY
+        self._httpd.jitter = jitter
+        self._httpd.error_rate = error_rate
+        self._httpd.error_status = error_status
+        self._httpd.retry_after_ms = retry_after_ms
+        self._httpd.chunk_delay = chunk_delay
+        self._httpd.slow_rate = slow_rate
+        self._httpd.slow_latency = slow_latency
+        self._httpd.stream_chunk_chars = stream_chunk_chars
+        self._httpd.cached_tokens = cached_tokens
+        self._httpd.capacity_slots = threading.Semaphore(capacity) if capacity else None
+        self._httpd.random = random.Random(seed)
+        self._httpd.replies = list(replies or [])
+        self._httpd.latencies = list(latencies or [])
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def connections(self) -> int:
+        return self._httpd.connections
+
+    @property
+    def requests(self) -> int:
+        return self._httpd.requests
+
+    @property
+    def errors(self) -> int:
+        return self._httpd.errors
+
+    def reset_counters(self) -> None:
+        with self._httpd.lock:
+            self._httpd.connections = 0
+            self._httpd.requests = 0
+            self._httpd.errors = 0
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="기본 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연에 더할 최대 편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="일시적 오류로 응답할 비율 (0~1)")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="스트리밍 조각 사이 지연(초)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="꼬리 지연을 줄 요청 비율 (0~1)")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="꼬리 지연 요청에 더할 지연(초)")
+    parser.add_argument("--capacity", type=int, default=0, help="동시에 처리할 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        chunk_delay=args.chunk_delay,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        capacity=args.capacity,
+        seed=args.seed
+    ) as server:
+        print(f"OPENAI_BASE_URL={server.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
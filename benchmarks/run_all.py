@@ -0,0 +1,134 @@
+"""벤치마크 전체 실행 및 이전 결과와 비교
+
+생성 경로, 이력 저장소, 비슷한 요청 색인, 문자 발송, Streamlit 재실행, 앱 시작, 공정 스케줄링 벤치마크를 차례로 실행해 실행 환경과 함께
+하나의 JSON 파일로 저장합니다. --compare로 이전 결과 파일을 주면 같은 항목의 지표를
+비교해 기준(--threshold)보다 나빠진 항목을 표시하고 종료 코드 1을 반환합니다.
+
+    python benchmarks/run_all.py -o bench_before.json
+    python benchmarks/run_all.py -o bench_after.json --compare bench_before.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import (  # noqa: E402
+    bench_dispatch,
+    bench_generation,
+    bench_history,
+    bench_rerun,
+    bench_scheduler,
+    bench_similar,
+    bench_startup
+)
+from benchmarks.common import environment  # noqa: E402
+
+SUITES = ("generation", "history", "similar", "dispatch", "rerun", "startup", "scheduler")
+
+# 값이 클수록 좋은 지표 (나머지 시간 지표는 작을수록 좋음)
+HIGHER_IS_BETTER_SUFFIXES = ("_per_s",)
+TIME_SUFFIXES = ("_ms", "_s")
+
+
+def run_suites(suites: List[str], quick: bool, latency: float, jitter: float, error_rate: float) -> List[Dict]:
+    results = []
+    if "generation" in suites:
+        results += bench_generation.run(quick=quick, latency=latency, jitter=jitter, error_rate=error_rate)
+    if "history" in suites:
+        sizes = (1000, 10000) if quick else (1000, 10000, 100000)
+        results += bench_history.run(sizes, repeat=5 if quick else 20)
+    if "similar" in suites:
+        results += bench_similar.run((10000,) if quick else (10000, 100000), queries=200 if quick else 1000)
+    if "dispatch" in suites:
+        results += bench_dispatch.run(10000 if quick else 100000, latency=latency)
+    if "rerun" in suites:
+        results += bench_rerun.run((0, 1000) if quick else (0, 10000), repeat=3 if quick else 5, latency=latency)
+    if "startup" in suites:
+        results += bench_startup.run((0, 1000) if quick else (0, 10000), repeat=3 if quick else 5)
+    if "scheduler" in suites:
+        results += bench_scheduler.run(quick=quick, latency=latency)
+    return results
+
+
+def _key(item: Dict) -> str:
+    return f"{item['benchmark']}/{item['name']}"
+
+
+def compare(current: List[Dict], baseline: List[Dict], threshold: float) -> List[Dict]:
+    """같은 항목·같은 지표끼리 비교해 변화율 목록 반환 (regression=True면 기준보다 나빠짐)"""
+    previous = {_key(item): item for item in baseline}
+    changes = []
+    for item in current:
+        before = previous.get(_key(item))
+        if before is None:
+            continue
+        for metric, value in item["metrics"].items():
+            old = before["metrics"].get(metric)
+            higher_is_better = metric.endswith(HIGHER_IS_BETTER_SUFFIXES)
+            if not (higher_is_better or metric.endswith(TIME_SUFFIXES)) or not old:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_is_better else change
+            changes.append({
+                "key": _key(item),
+                "metric": metric,
+                "before": old,
+                "after": value,
+                "change": round(change, 4),
+                "regression": worse > threshold
+            })
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="벤치마크 전체 실행")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="결과 JSON 파일")
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES), help="실행할 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="규모를 줄여 빠르게 실행")
+    parser.add_argument("--latency", type=float, default=0.05, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="스텁 서버 지연 편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="스텁 서버 일시적 오류 비율 (0~1)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 변화율 (기본 20%%)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": environment(),
+        "options": {
+            "suites": args.only,
+            "quick": args.quick,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate
+        },
+        "results": run_suites(args.only, args.quick, args.latency, args.jitter, args.error_rate)
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 {len(report['results'])}건을 {args.output}에 저장했습니다.", file=sys.stderr)
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    changes = compare(report["results"], baseline["results"], args.threshold)
+    regressions = [change for change in changes if change["regression"]]
+    for change in changes:
+        mark = "회귀" if change["regression"] else "    "
+        print(
+            f"{mark} {change['key']:<36} {change['metric']:<22} "
+            f"{change['before']:>12} → {change['after']:>12} ({change['change']:+.1%})"
+        )
+    print(
+        f"비교 {len(changes)}개 지표 중 {len(regressions)}개가 {args.threshold:.0%} 이상 나빠졌습니다 "
+        f"(기준: {baseline['environment'].get('commit')}).",
+        file=sys.stderr
+    )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
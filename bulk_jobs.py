@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sms_engine import TEMPERATURE, build_sms_messages, generation_budget
+from sms_validator import validate_sms
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# ───────────── 교육청 단위 대량 사전 생성 (Batch API 형식 JSONL 작업) ─────────────
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+DEFAULT_JOB_DIR = "bulk_jobs"
+
+
+def build_batch_line(custom_id: str, request: Dict) -> Dict:
+    """generate_ai_sms와 같은 프롬프트·생성 예산으로 Batch 입력 한 줄 구성"""
+    budget = generation_budget(request.get("length_option"))
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": budget["model"],
+            "messages": build_sms_messages(**request),
+            "temperature": TEMPERATURE,
+            "max_tokens": budget["max_tokens"]
+        }
+    }
+
+
+def compile_bulk_job(requests: List[Dict], job_dir: str = DEFAULT_JOB_DIR, job_name: Optional[str] = None) -> Dict:
+    """요청 목록을 Batch 입력 JSONL로 저장하고 작업 정보(manifest) 반환
+
+    requests의 각 항목은 build_sms_messages 인자(target, category, content_details,
+    date, school, additional_info, tone_guide, length_option, style_option)입니다.
+    """
+    job_name = job_name or f"bulk_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    directory = Path(job_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    input_path = directory / f"{job_name}.jsonl"
+
+    manifest_requests = {}
+    with open(input_path, "w", encoding="utf-8") as f:
+        for i, request in enumerate(requests):
+            custom_id = f"{job_name}-{i:06d}"
+            f.write(json.dumps(build_batch_line(custom_id, request), ensure_ascii=False) + "\n")
+            manifest_requests[custom_id] = request
+
+    manifest = {
+        "job_name": job_name,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "input_path": str(input_path),
+        "manifest_path": str(directory / f"{job_name}.manifest.json"),
+        "backend": None,
+        "batch_id": None,
+        "status": "compiled",
+        "requests": manifest_requests
+    }
+    save_manifest(manifest)
+    return manifest
+
+
+def save_manifest(manifest: Dict) -> None:
+    with open(manifest["manifest_path"], "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def load_manifest(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch 엔드포인트로 작업 제출 (배치 요금, 대화형 할당량과 별도)"""
+
+    name = "openai"
+
+    def __init__(self, client: OpenAI):
+        self.client = client
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=COMPLETION_WINDOW
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def error(self, batch_id: str) -> Optional[str]:
+        """작업 전체가 실패한 경우 첫 오류 메시지"""
+        errors = self.client.batches.retrieve(batch_id).errors
+        if errors and errors.data:
+            return errors.data[0].message
+        return None
+
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+class LocalBatchBackend:
+    """Batch 엔드포인트 대신 일반 API로 JSONL을 직접 실행하는 대체 백엔드 (테스트·소규모 작업용)
+
+    로컬 스텁 서버를 가리키는 클라이언트를 넘기면 비용 없이 전체 흐름을 확인할 수 있습니다.
+    """
+
+    name = "local"
+
+    def __init__(self, client: OpenAI, max_workers: int = 4):
+        self.client = client
+        self.max_workers = max_workers
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._jobs[batch_id] = {"status": "in_progress", "output": []}
+        threading.Thread(target=self._run, args=(batch_id, input_path), daemon=True).start()
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        with self._lock:
+            job = self._jobs.get(batch_id)
+            return job["status"] if job else "expired"
+
+    def error(self, batch_id: str) -> Optional[str]:
+        with self._lock:
+            return self._jobs.get(batch_id, {}).get("error")
+
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        with self._lock:
+            output = list(self._jobs.get(batch_id, {}).get("output", []))
+        yield from output
+
+    def _run(self, batch_id: str, input_path: str) -> None:
+        # 입력 파일 오류 등으로 중단되면 작업을 실패로 표시 (진행 중으로 남지 않도록)
+        try:
+            with open(input_path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                output = list(executor.map(self._execute, lines))
+        except Exception as e:
+            job = {"status": "failed", "output": [], "error": f"{type(e).__name__}: {e}"}
+        else:
+            job = {"status": "completed", "output": output}
+        with self._lock:
+            self._jobs[batch_id] = job
+
+    def _execute(self, line: Dict) -> Dict:
+        # OpenAI Batch 출력 파일과 같은 형식으로 결과 기록
+        try:
+            completion = self.client.chat.completions.create(**line["body"])
+            response = {"status_code": 200, "body": completion.model_dump()}
+            error = None
+        except Exception as e:
+            response = None
+            error = {"message": str(e)}
+        return {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": line["custom_id"], "response": response, "error": error}
+
+
+def submit_bulk_job(backend, manifest: Dict) -> Dict:
+    """작업을 백엔드에 제출하고 batch_id를 manifest에 기록"""
+    manifest["backend"] = backend.name
+    manifest["batch_id"] = backend.submit(manifest["input_path"])
+    manifest["status"] = "submitted"
+    save_manifest(manifest)
+    return manifest
+
+
+def poll_bulk_job(backend, manifest: Dict) -> str:
+    """현재 작업 상태를 조회해 manifest에 반영 (실패했으면 오류 메시지도)"""
+    manifest["status"] = backend.status(manifest["batch_id"])
+    if manifest["status"] == "failed":
+        manifest["error"] = backend.error(manifest["batch_id"])
+    save_manifest(manifest)
+    return manifest["status"]
+
+
+def ingest_results(backend, manifest: Dict) -> Tuple[List[Dict], List[Dict]]:
+    """Batch 결과를 이력 저장 형식의 레코드로 변환해 (성공, 실패) 목록 반환
+
+    오류 응답, 내용이 없는 응답(거절·콘텐츠 필터), 로컬 검증에 실패한 문자는 실패로 분류하며,
+    검증에 실패한 문자는 실패 항목의 content에 남겨 직접 고쳐 쓸 수 있게 합니다.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    records, failures = [], []
+    for line in backend.results(manifest["batch_id"]):
+        request = manifest["requests"].get(line.get("custom_id"))
+        if request is None:
+            continue
+        response = line.get("response") or {}
+        sms = ""
+        if response.get("status_code") == 200:
+            choice = (response.get("body") or {}).get("choices", [{}])[0]
+            sms = ((choice.get("message") or {}).get("content") or "").strip()
+            if not sms:
+                error = f"빈 응답 (finish_reason: {choice.get('finish_reason')})"
+            else:
+                report = validate_sms(sms, request)
+                if report["ok"]:
+                    records.append({
+                        "timestamp": timestamp,
+                        "school": request["school"],
+                        "target": request["target"],
+                        "category": request["category"],
+                        "content": sms,
+                        "length": len(sms),
+                        "style": request.get("style_option", "기본"),
+                        "length_option": request.get("length_option", "표준")
+                    })
+                    continue
+                error = "검증 실패: " + " / ".join(issue["message"] for issue in report["issues"])
+        else:
+            error = (line.get("error") or {}).get("message") or json.dumps(response.get("body"), ensure_ascii=False)
+        failures.append({
+            "custom_id": line.get("custom_id"),
+            "school": request["school"],
+            "target": request["target"],
+            "error": error,
+            "content": sms
+        })
+    return records, failures
+
+
+def run_bulk_job(
+    backend,
+    manifest: Dict,
+    poll_interval: float = 30.0,
+    on_status: Optional[Callable[[str], None]] = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """제출부터 완료 대기, 결과 수집까지 한 번에 실행 (스크립트·배치 서버용)"""
+    if not manifest.get("batch_id"):
+        submit_bulk_job(backend, manifest)
+    while True:
+        status = poll_bulk_job(backend, manifest)
+        if on_status:
+            on_status(status)
+        if status in TERMINAL_STATUSES:
+            break
+        time.sleep(poll_interval)
+    return ingest_results(backend, manifest)
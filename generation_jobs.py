@@ -0,0 +1,167 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# ───────────── 문자 생성 백그라운드 작업 대기열 ─────────────
+# 화면 재실행과 관계없이 작업이 계속 진행되도록 서버 프로세스에 하나만 두고 모든 세션이 함께 사용
+DEFAULT_WORKERS = 8
+# 끝난 작업 결과를 보관하는 시간과 최대 작업 수 (결과를 가져가지 않은 세션이 있어도 메모리가 늘지 않도록)
+JOB_RETENTION_S = 60 * 60
+MAX_JOBS = 1000
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = {DONE, FAILED, CANCELLED}
+
+
+class JobHandle:
+    """작업 함수에 넘기는 진행 상황 보고·취소 확인용 손잡이"""
+
+    def __init__(self, queue: "GenerationJobQueue", job_id: str, queued_at: float):
+        self._queue = queue
+        self.job_id = job_id
+        # 작업 대기열에 넣은 시각 (time.perf_counter 기준, 계측 기록의 대기 시간 계산용)
+        self.queued_at = queued_at
+
+    def progress(self, partial: str) -> None:
+        """지금까지 만든 내용 기록 (스트리밍 중인 문자를 화면에 보여줄 때 사용)"""
+        self._queue._update(self.job_id, partial=partial)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._queue._cancel_requested(self.job_id)
+
+
+class GenerationJobQueue:
+    """작업을 제출하면 바로 작업 id를 돌려주고 작업자 스레드에서 실행하는 대기열
+
+    작업 함수는 JobHandle 하나를 받아 결과를 반환합니다. 화면은 status()로 상태와
+    진행 중인 내용을 조회하고, 끝난 결과를 가져간 뒤 forget()으로 정리합니다.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, retention_s: float = JOB_RETENTION_S, max_jobs: int = MAX_JOBS):
+        self.max_workers = max_workers
+        self.retention_s = retention_s
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sms-job")
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._futures: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[JobHandle], Any], label: str = "", owner: Optional[str] = None) -> str:
+        """작업을 대기열에 넣고 작업 id 반환 (owner는 작업 목록을 나눠 볼 세션 구분값)"""
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        handle = JobHandle(self, job_id, time.perf_counter())
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = {
+                "id": job_id,
+                "label": label,
+                "owner": owner,
+                "status": QUEUED,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "partial": "",
+                "result": None,
+                "error": None,
+                "cancel_requested": False
+            }
+            self._futures[job_id] = self._executor.submit(self._run, handle, fn)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """작업 상태 사본 (없거나 정리된 작업은 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def jobs(self, owner: Optional[str] = None) -> List[Dict]:
+        """작업 목록 (오래된 순, owner를 주면 그 세션의 작업만)"""
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if owner is None or job["owner"] == owner]
+
+    def counts(self) -> Dict[str, int]:
+        """상태별 작업 수"""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+            return counts
+
+    def cancel(self, job_id: str) -> bool:
+        """작업 취소. 대기 중이면 실행하지 않고, 실행 중이면 작업 함수가 확인할 수 있도록 표시"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED_STATUSES:
+                return False
+            job["cancel_requested"] = True
+            if self._futures[job_id].cancel():
+                job.update(status=CANCELLED, finished_at=time.time())
+            return True
+
+    def forget(self, job_id: str) -> None:
+        """결과를 가져간 작업 정리 (실행 중이면 취소 표시 후 끝나는 대로 버림)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job["status"] in FINISHED_STATUSES:
+                del self._jobs[job_id]
+                del self._futures[job_id]
+            else:
+                job["cancel_requested"] = True
+                job["owner"] = None
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, handle: JobHandle, fn: Callable[[JobHandle], Any]) -> None:
+        with self._lock:
+            job = self._jobs.get(handle.job_id)
+            if job is None:
+                return
+            # 대기 중에 취소 표시된 작업(취소가 늦었거나 forget만 한 작업)은 실행하지 않음
+            if job["cancel_requested"]:
+                job.update(status=CANCELLED, finished_at=time.time())
+                return
+            job.update(status=RUNNING, started_at=time.time())
+        try:
+            result = fn(handle)
+        except Exception as e:
+            self._update(handle.job_id, status=FAILED, error=str(e), finished_at=time.time())
+            return
+        status = CANCELLED if handle.cancelled else DONE
+        self._update(handle.job_id, status=status, result=result, finished_at=time.time())
+
+    def _update(self, job_id: str, **fields) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.update(fields)
+            return True
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job is None or job["cancel_requested"]
+
+    def _prune(self) -> None:
+        # 보관 기간이 지났거나 최대 작업 수를 넘은 끝난 작업부터 정리 (오래된 순)
+        now = time.time()
+        overflow = len(self._jobs) - self.max_jobs + 1
+        for job_id, job in list(self._jobs.items()):
+            if job["status"] not in FINISHED_STATUSES:
+                continue
+            if overflow > 0 or now - job["finished_at"] > self.retention_s:
+                del self._jobs[job_id]
+                del self._futures[job_id]
+                overflow -= 1
@@ -0,0 +1,199 @@
+"""생성 이력 내보내기·가져오기 (CSV, JSONL, Parquet)
+
+내보내기는 저장소에서 CHUNK_SIZE건씩 읽어 형식별 바이트 조각으로 바로 바꿔 내보내므로
+10만 건이 넘어도 메모리에는 한 묶음만 올라갑니다. 가져오기는 파일을 행 단위(Parquet은
+행 묶음 단위)로 읽어 묶음으로 저장하고, 이미 있는 이력은 해시로 걸러 건너뜁니다.
+Parquet은 pyarrow가 설치된 경우에만 사용할 수 있습니다.
+
+    python history_io.py export sms_history.db history.parquet --target 학부모
+    python history_io.py import sms_history.db history_2024.csv
+"""
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import sys
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from history_store import CHUNK_SIZE, HISTORY_COLUMNS, IMPORT_BATCH_SIZE, HistoryStore
+
+# ───────────── 생성 이력 내보내기·가져오기 ─────────────
+# 형식별 (파일 확장자, MIME)
+FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "jsonl": (".jsonl", "application/x-ndjson"),
+    "parquet": (".parquet", "application/vnd.apache.parquet")
+}
+# 가져올 때 형식을 알아보는 확장자
+_SUFFIX_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+
+def parquet_available() -> bool:
+    """Parquet 읽기·쓰기에 필요한 pyarrow 설치 여부"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in FORMATS if fmt != "parquet" or parquet_available()]
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """파일 이름의 확장자로 형식 판별 (모르는 확장자는 None)"""
+    return _SUFFIX_FORMATS.get(Path(filename).suffix.lower())
+
+
+def _csv_chunks(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    # 엑셀에서 한글이 깨지지 않도록 BOM(utf-8-sig)을 붙인 머리글부터
+    yield ("\ufeff" + ",".join(HISTORY_COLUMNS) + "\r\n").encode("utf-8")
+    for chunk in chunks:
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=HISTORY_COLUMNS, extrasaction="ignore").writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _jsonl_chunks(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield "".join(
+            json.dumps({column: row[column] for column in HISTORY_COLUMNS}, ensure_ascii=False) + "\n"
+            for row in chunk
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Parquet 작성기가 쓴 바이트를 모아 두었다가 내보내는 출력 (쓴 위치는 계속 셈)"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet_chunks(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    # 묶음 하나가 행 그룹 하나. 파일 끝 메타데이터는 작성기를 닫을 때 기록됨
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.int64() if column == "length" else pa.string()) for column in HISTORY_COLUMNS])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+_WRITERS: Dict[str, Callable[[Iterable[List[Dict]]], Iterator[bytes]]] = {
+    "csv": _csv_chunks,
+    "jsonl": _jsonl_chunks,
+    "parquet": _parquet_chunks
+}
+
+
+def export_chunks(
+    store: HistoryStore,
+    fmt: str,
+    target: Optional[str] = None,
+    category: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """필터에 맞는 이력을 오래된 순으로 fmt 형식의 바이트 조각으로 차례로 반환"""
+    if fmt not in _WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    return _WRITERS[fmt](store.iter_chunks(target, category, chunk_size))
+
+
+def export_to_file(
+    store: HistoryStore,
+    output: IO[bytes],
+    fmt: str,
+    target: Optional[str] = None,
+    category: Optional[str] = None
+) -> int:
+    """export_chunks를 파일에 차례로 쓰고 쓴 바이트 수 반환"""
+    written = 0
+    for data in export_chunks(store, fmt, target, category):
+        output.write(data)
+        written += len(data)
+    return written
+
+
+def read_records(source: IO[bytes], fmt: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """내보낸 이력 파일을 한 행씩 읽어 반환 (Parquet은 chunk_size행 묶음 단위로 읽음)"""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        columns = [column for column in HISTORY_COLUMNS if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield from batch.to_pylist()
+        return
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(text)
+        else:
+            yield from (json.loads(line) for line in text if line.strip())
+    finally:
+        # 호출한 쪽의 파일을 닫지 않도록 분리
+        text.detach()
+
+
+def import_file(store: HistoryStore, source: IO[bytes], fmt: str, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """이력 파일을 저장소에 가져오고 (저장, 중복, 형식 오류) 건수 반환"""
+    return store.import_records(read_records(source, fmt), batch_size=batch_size)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="생성 이력 내보내기·가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="이력을 파일로 내보내기")
+    export_parser.add_argument("db", help="이력 DB 경로 (SMS_HISTORY_PATH)")
+    export_parser.add_argument("output", help="출력 파일 (.csv, .jsonl, .parquet)")
+    export_parser.add_argument("--target", help="대상 필터")
+    export_parser.add_argument("--category", help="카테고리 필터")
+    import_parser = subparsers.add_parser("import", help="내보낸 이력 파일 가져오기")
+    import_parser.add_argument("db", help="이력 DB 경로 (SMS_HISTORY_PATH)")
+    import_parser.add_argument("input", help="입력 파일 (.csv, .jsonl, .ndjson, .parquet)")
+    args = parser.parse_args(argv)
+
+    path = args.output if args.command == "export" else args.input
+    fmt = detect_format(path)
+    if fmt not in available_formats():
+        print(f"지원하지 않는 파일 형식입니다: {path} (사용 가능: {', '.join(available_formats())})", file=sys.stderr)
+        return 2
+    store = HistoryStore(args.db)
+    if args.command == "export":
+        with open(path, "wb") as f:
+            written = export_to_file(store, f, fmt, args.target, args.category)
+        print(f"{store.count(args.target, args.category):,}건을 {path}에 저장했습니다 ({written:,}바이트).", file=sys.stderr)
+    else:
+        with open(path, "rb") as f:
+            counts = import_file(store, f, fmt)
+        print(
+            f"저장 {counts['imported']:,}건, 중복 {counts['duplicates']:,}건, 형식 오류 {counts['invalid']:,}건",
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
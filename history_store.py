@@ -0,0 +1,369 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from itertools import product
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ───────────── 생성 이력 저장소 (SQLite) ─────────────
+HISTORY_COLUMNS = ("timestamp", "school", "target", "category", "content", "length", "style", "length_option")
+# 가져오기 중복 판별에 쓰는 열 (같은 시각·학교·대상·카테고리·내용이면 같은 이력)
+HASH_COLUMNS = ("timestamp", "school", "target", "category", "content")
+_INSERT_SQL = (
+    f"INSERT INTO sms_history ({', '.join(HISTORY_COLUMNS)}, content_hash) "
+    f"VALUES ({', '.join('?' * (len(HISTORY_COLUMNS) + 1))})"
+)
+# 내보내기에서 한 번에 읽는 건수와 가져오기에서 한 트랜잭션으로 저장하는 건수
+CHUNK_SIZE = 5000
+IMPORT_BATCH_SIZE = 500
+
+# 통계 집계표에서 '전체' 필터를 나타내는 값
+ALL = ""
+STAT_DIMENSIONS = ("target", "category")
+
+
+def content_hash(values: Tuple) -> str:
+    """HASH_COLUMNS 순서의 값으로 만든 이력 중복 판별용 해시(SHA-256)"""
+    payload = json.dumps(list(values), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class HistoryStore:
+    """세션이 끝나도 유지되는 생성 이력 저장소. 필터와 페이지 나눔은 SQL 쿼리로 처리"""
+
+    def __init__(self, db_path: str = "sms_history.db"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS sms_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    school TEXT NOT NULL DEFAULT '',
+                    target TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    style TEXT NOT NULL DEFAULT '기본',
+                    length_option TEXT NOT NULL DEFAULT '표준',
+                    content_hash TEXT
+                )"""
+            )
+            # 해시 열이 없던 이전 버전의 DB는 열을 추가하고 아래에서 기존 이력의 해시를 채움
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(sms_history)")}
+            if "content_hash" not in columns:
+                self._conn.execute("ALTER TABLE sms_history ADD COLUMN content_hash TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_content_hash ON sms_history (content_hash)")
+            # 최신순 목록 + 대상/카테고리 필터 조합을 모두 인덱스로 처리
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON sms_history (timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_target ON sms_history (target, timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_category ON sms_history (category, timestamp)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_target_category ON sms_history (target, category, timestamp)"
+            )
+            # 필터 조합(대상 × 카테고리, 각각 '전체' 포함)별 누적 통계
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS history_stats (
+                    filter_target TEXT NOT NULL,
+                    filter_category TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    length_sum INTEGER NOT NULL,
+                    PRIMARY KEY (filter_target, filter_category)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS history_stat_counts (
+                    filter_target TEXT NOT NULL,
+                    filter_category TEXT NOT NULL,
+                    dimension TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (filter_target, filter_category, dimension, value)
+                )"""
+            )
+        # 집계표가 없던 이전 버전의 DB라면 한 번 재계산
+        if self._conn.execute("SELECT 1 FROM history_stats LIMIT 1").fetchone() is None:
+            self.rebuild_stats()
+        self._fill_missing_hashes()
+
+    def _fill_missing_hashes(self) -> None:
+        # 해시가 없는 이력(이전 버전에서 저장)을 CHUNK_SIZE건씩 채움
+        while True:
+            with self._lock, self._conn:
+                rows = self._conn.execute(
+                    f"SELECT id, {', '.join(HASH_COLUMNS)} FROM sms_history WHERE content_hash IS NULL LIMIT ?",
+                    (CHUNK_SIZE,)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE sms_history SET content_hash = ? WHERE id = ?",
+                    [(content_hash(tuple(row)[1:]), row["id"]) for row in rows]
+                )
+            if len(rows) < CHUNK_SIZE:
+                return
+
+    @staticmethod
+    def _row_values(record: Dict) -> Tuple:
+        """HISTORY_COLUMNS 순서의 값에 중복 판별용 해시를 붙인 저장용 행"""
+        content = record["content"]
+        values = (
+            record.get("timestamp") or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            record.get("school") or "",
+            record["target"],
+            record["category"],
+            content,
+            int(record.get("length") or len(content)),
+            record.get("style") or "기본",
+            record.get("length_option") or "표준"
+        )
+        return values + (content_hash(values[:len(HASH_COLUMNS)]),)
+
+    def add(self, record: Dict) -> int:
+        """이력 한 건 저장 후 id 반환 (누적 통계도 같은 트랜잭션에서 갱신)"""
+        row = self._row_values(record)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(_INSERT_SQL, row)
+            self._apply_stats([(row[2], row[3], 1, row[5])])
+            return cursor.lastrowid
+
+    def add_many(self, records: Iterable[Dict]) -> int:
+        """여러 건을 한 트랜잭션으로 저장하고 저장 건수 반환"""
+        rows = [self._row_values(record) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT_SQL, rows)
+            self._apply_stats([(row[2], row[3], 1, row[5]) for row in rows])
+        return len(rows)
+
+    def import_records(self, records: Iterable[Dict], batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+        """이전에 내보낸 이력을 batch_size건씩 저장하고 (저장, 중복, 형식 오류) 건수 반환
+
+        이미 저장된 이력이나 앞서 읽은 행과 해시가 같은 행은 건너뛰고, 대상·카테고리·내용이
+        비어 있거나 글자 수가 숫자가 아닌 행은 형식 오류로 셉니다. 묶음마다 한 트랜잭션이라
+        가져오는 중에도 다른 세션의 저장이 오래 막히지 않습니다.
+        """
+        counts = {"imported": 0, "duplicates": 0, "invalid": 0}
+        batch = []
+        for record in records:
+            try:
+                if not all(record.get(column) for column in ("target", "category", "content")):
+                    raise ValueError("필수 값 없음")
+                batch.append(self._row_values(record))
+            except (TypeError, ValueError):
+                counts["invalid"] += 1
+                continue
+            if len(batch) >= batch_size:
+                self._insert_new(batch, counts)
+                batch = []
+        if batch:
+            self._insert_new(batch, counts)
+        return counts
+
+    def _insert_new(self, rows: List[Tuple], counts: Dict[str, int]) -> None:
+        # 저장소와 이 묶음 안에서 해시가 처음 나온 행만 저장
+        with self._lock, self._conn:
+            hashes = list({row[-1] for row in rows})
+            seen = {
+                row[0] for row in self._conn.execute(
+                    f"SELECT content_hash FROM sms_history WHERE content_hash IN ({', '.join('?' * len(hashes))})",
+                    hashes
+                )
+            }
+            new_rows = []
+            for row in rows:
+                if row[-1] not in seen:
+                    seen.add(row[-1])
+                    new_rows.append(row)
+            self._conn.executemany(_INSERT_SQL, new_rows)
+            self._apply_stats([(row[2], row[3], 1, row[5]) for row in new_rows])
+        counts["imported"] += len(new_rows)
+        counts["duplicates"] += len(rows) - len(new_rows)
+
+    def _apply_stats(self, groups: Iterable[Tuple[str, str, int, int]]) -> None:
+        """(대상, 카테고리, 건수, 글자 수 합) 묶음을 관련된 모든 필터 조합의 집계에 더함"""
+        totals: Counter = Counter()
+        length_sums: Counter = Counter()
+        value_counts: Counter = Counter()
+        for target, category, count, length_sum in groups:
+            for filter_target, filter_category in product((target, ALL), (category, ALL)):
+                key = (filter_target, filter_category)
+                totals[key] += count
+                length_sums[key] += length_sum
+                value_counts[key + ("target", target)] += count
+                value_counts[key + ("category", category)] += count
+        self._conn.executemany(
+            """INSERT INTO history_stats (filter_target, filter_category, count, length_sum) VALUES (?, ?, ?, ?)
+            ON CONFLICT (filter_target, filter_category)
+            DO UPDATE SET count = count + excluded.count, length_sum = length_sum + excluded.length_sum""",
+            [key + (totals[key], length_sums[key]) for key in totals]
+        )
+        self._conn.executemany(
+            """INSERT INTO history_stat_counts (filter_target, filter_category, dimension, value, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (filter_target, filter_category, dimension, value)
+            DO UPDATE SET count = count + excluded.count""",
+            [key + (count,) for key, count in value_counts.items()]
+        )
+
+    @staticmethod
+    def _where(target: Optional[str], category: Optional[str], school: Optional[str] = None) -> Tuple[str, List]:
+        clauses, params = [], []
+        if school:
+            clauses.append("school = ?")
+            params.append(school)
+        if target:
+            clauses.append("target = ?")
+            params.append(target)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, target: Optional[str] = None, category: Optional[str] = None, school: Optional[str] = None) -> int:
+        where, params = self._where(target, category, school)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM sms_history{where}", params).fetchone()[0]
+
+    def query(
+        self,
+        target: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = 20,
+        offset: int = 0
+    ) -> List[Dict]:
+        """필터에 맞는 이력을 최신순으로 한 페이지만 조회 (limit=None이면 전체)"""
+        where, params = self._where(target, category)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM sms_history{where} "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_chunks(
+        self,
+        target: Optional[str] = None,
+        category: Optional[str] = None,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[Dict]]:
+        """필터에 맞는 이력을 오래된 순으로 chunk_size건씩 반환 (내보내기용)
+
+        마지막으로 읽은 (시각, id) 다음부터 조회하므로 뒤쪽 묶음도 앞 묶음과 같은 비용이고,
+        메모리에는 한 묶음만 올라갑니다. 묶음 사이에는 락을 풀어 다른 세션의 저장을 막지 않습니다.
+        """
+        where, params = self._where(target, category)
+        after: List = []
+        while True:
+            keyset = (" AND " if where else " WHERE ") + "(timestamp, id) > (?, ?)" if after else ""
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM sms_history{where}{keyset} "
+                    "ORDER BY timestamp, id LIMIT ?",
+                    params + after + [chunk_size]
+                ).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            after = [rows[-1]["timestamp"], rows[-1]["id"]]
+
+    def stats(self, target: Optional[str] = None, category: Optional[str] = None) -> Dict:
+        """필터에 맞는 이력의 건수, 평균 글자 수, 최다 대상/카테고리 (누적 집계표에서 바로 조회)"""
+        key = (target or ALL, category or ALL)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count, length_sum FROM history_stats WHERE filter_target = ? AND filter_category = ?", key
+            ).fetchone()
+            modes = {}
+            for dimension in STAT_DIMENSIONS:
+                top = self._conn.execute(
+                    "SELECT value FROM history_stat_counts "
+                    "WHERE filter_target = ? AND filter_category = ? AND dimension = ? AND count > 0 "
+                    "ORDER BY count DESC, value LIMIT 1",
+                    key + (dimension,)
+                ).fetchone()
+                modes[dimension] = top[0] if top else None
+        total, length_sum = row if row else (0, 0)
+        return {
+            "count": total,
+            "avg_length": length_sum / total if total else 0.0,
+            "top_target": modes["target"],
+            "top_category": modes["category"]
+        }
+
+    def compute_stats(self, target: Optional[str] = None, category: Optional[str] = None) -> Dict:
+        """stats()와 같은 값을 이력 전체를 훑어 직접 계산 (정합성 확인용)"""
+        where, params = self._where(target, category)
+        with self._lock:
+            total, avg_length = self._conn.execute(
+                f"SELECT COUNT(*), AVG(length) FROM sms_history{where}", params
+            ).fetchone()
+            modes = {}
+            for column in STAT_DIMENSIONS:
+                row = self._conn.execute(
+                    f"SELECT {column} FROM sms_history{where} GROUP BY {column} "
+                    f"ORDER BY COUNT(*) DESC, {column} LIMIT 1",
+                    params
+                ).fetchone()
+                modes[column] = row[0] if row else None
+        return {
+            "count": total,
+            "avg_length": avg_length or 0.0,
+            "top_target": modes["target"],
+            "top_category": modes["category"]
+        }
+
+    def rebuild_stats(self) -> None:
+        """저장된 이력으로 누적 통계를 처음부터 다시 계산"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history_stats")
+            self._conn.execute("DELETE FROM history_stat_counts")
+            groups = self._conn.execute(
+                "SELECT target, category, COUNT(*), SUM(length) FROM sms_history GROUP BY target, category"
+            ).fetchall()
+            self._apply_stats([tuple(group) for group in groups])
+
+    def check_stats(self) -> List[str]:
+        """누적 통계와 직접 계산한 값이 다른 필터 조합 목록 (비어 있으면 정상)"""
+        with self._lock:
+            combos = self._conn.execute(
+                "SELECT DISTINCT target, category FROM sms_history"
+            ).fetchall()
+        filters = {(None, None)}
+        for target, category in combos:
+            filters.update({(target, None), (None, category), (target, category)})
+
+        mismatches = []
+        for target, category in sorted(filters, key=lambda f: (f[0] or "", f[1] or "")):
+            incremental, computed = self.stats(target, category), self.compute_stats(target, category)
+            if (
+                incremental["count"] != computed["count"]
+                or abs(incremental["avg_length"] - computed["avg_length"]) > 1e-6
+                or incremental["top_target"] != computed["top_target"]
+                or incremental["top_category"] != computed["top_category"]
+            ):
+                mismatches.append(f"대상={target or '전체'}, 카테고리={category or '전체'}: {incremental} != {computed}")
+        return mismatches
+
+    def delete(self, target: Optional[str] = None, category: Optional[str] = None, school: Optional[str] = None) -> int:
+        """필터에 맞는 이력만 삭제하고 누적 통계에서 빼 삭제한 건수 반환"""
+        where, params = self._where(target, category, school)
+        with self._lock, self._conn:
+            groups = self._conn.execute(
+                f"SELECT target, category, COUNT(*), SUM(length) FROM sms_history{where} GROUP BY target, category",
+                params
+            ).fetchall()
+            self._conn.execute(f"DELETE FROM sms_history{where}", params)
+            self._apply_stats([(target, category, -count, -length_sum) for target, category, count, length_sum in groups])
+            self._conn.execute("DELETE FROM history_stats WHERE count <= 0")
+            self._conn.execute("DELETE FROM history_stat_counts WHERE count <= 0")
+        return sum(group[2] for group in groups)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sms_history")
+            self._conn.execute("DELETE FROM history_stats")
+            self._conn.execute("DELETE FROM history_stat_counts")
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING, Optional
+
+# openai·httpx는 불러오는 데 오래 걸리므로 클라이언트를 만들 때 불러옴 (앱 첫 화면을 늦추지 않도록)
+if TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI
+
+# ───────────── 프로세스 공용 OpenAI 클라이언트 ─────────────
+# 연결 풀: 동시 세션 수보다 넉넉하게, 유휴 연결은 재사용을 위해 유지
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY_SECONDS = 120.0
+
+# 연결은 빠르게 실패, 응답 대기는 문자 생성 시간을 고려해 여유 있게
+CONNECT_TIMEOUT_SECONDS = 5.0
+READ_TIMEOUT_SECONDS = 60.0
+WRITE_TIMEOUT_SECONDS = 10.0
+POOL_TIMEOUT_SECONDS = 10.0
+
+
+def http2_available() -> bool:
+    """HTTP/2 사용에 필요한 h2 패키지 설치 여부"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client(http2: Optional[bool] = None) -> httpx.Client:
+    """keep-alive 연결 풀과 명시적 타임아웃을 갖춘 httpx 클라이언트 생성"""
+    import httpx
+    from openai import DefaultHttpxClient
+
+    if http2 is None:
+        http2 = http2_available()
+    return DefaultHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(
+            connect=CONNECT_TIMEOUT_SECONDS,
+            read=READ_TIMEOUT_SECONDS,
+            write=WRITE_TIMEOUT_SECONDS,
+            pool=POOL_TIMEOUT_SECONDS
+        )
+    )
+
+
+def build_openai_client(api_key: str, base_url: Optional[str] = None, http2: Optional[bool] = None) -> OpenAI:
+    """연결 풀을 공유하는 OpenAI 클라이언트 생성 (프로세스당 한 번만 만들어 재사용)"""
+    from openai import OpenAI
+
+    http_client = build_http_client(http2=http2)
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=http_client.timeout,
+        # 재시도는 resilience.APIGuard가 Retry-After와 회로 차단기를 고려해 처리
+        max_retries=0
+    )
@@ -0,0 +1,504 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from telemetry import add_to_trace, percentile
+
+T = TypeVar("T")
+
+# ───────────── API 호출 보호: 속도 제한, 재시도, 회로 차단기 ─────────────
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200000
+
+
+class CircuitOpenError(Exception):
+    """회로 차단기가 열려 있어 API 호출을 건너뛴 경우"""
+
+
+class RateLimitTimeout(Exception):
+    """속도 제한 대기 시간이 허용 범위를 넘은 경우"""
+
+
+class DeadlineExceeded(Exception):
+    """생성 요청 전체 마감 시간이 지나 더 시도하지 않는 경우"""
+
+
+class TokenBucket:
+    """분당 허용량만큼 일정하게 채워지는 토큰 버킷"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """amount만큼 예약하고 사용 가능해질 때까지 기다려야 할 시간(초) 반환"""
+        # 버킷보다 큰 요청도 언젠가는 통과하도록 용량으로 제한
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        """reserve로 예약했지만 쓰지 않은 amount를 되돌림"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def try_take(self, amount: float = 1) -> bool:
+        """지금 바로 쓸 수 있으면 amount만큼 가져가고 True (기다리지 않음)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < amount:
+                return False
+            self._tokens -= amount
+            return True
+
+
+class RateLimiter:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 지키는 속도 제한기"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, estimated_tokens: int = 0, max_wait: Optional[float] = None) -> float:
+        """호출 전 예산을 확보하고 실제로 기다린 시간(초) 반환
+
+        max_wait보다 오래 기다려야 하면 예약을 되돌리고 RateLimitTimeout을 냅니다.
+        """
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if max_wait is not None and wait > max_wait:
+            # 호출하지 않은 예약이 뒤따르는 요청의 대기 시간을 늘리지 않도록
+            self.requests.refund(1)
+            self.tokens.refund(estimated_tokens)
+            raise RateLimitTimeout(f"속도 제한으로 {wait:.1f}초 이상 대기가 필요합니다")
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """연속 실패가 쌓이면 일정 시간 호출을 막고, 이후 시험 호출로 회복 여부 확인"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """호출 가능 여부 확인 (불가능하면 CircuitOpenError)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError("AI 서비스 응답이 불안정하여 잠시 호출을 중단했습니다")
+            # 회복 대기 시간이 지나면 한 번의 시험 호출만 허용
+            if self._trial_in_flight:
+                raise CircuitOpenError("AI 서비스 회복 여부를 확인하는 중입니다")
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """시험 호출 자리를 받았지만 호출하지 못했을 때 결과 기록 없이 자리만 반납"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def is_retryable(error: Exception) -> bool:
+    """429, 5xx, 타임아웃, 연결 오류만 재시도 대상"""
+    # API 오류가 난 시점에는 이미 불러와 있으므로 비용 없음 (모듈을 불러올 때 openai를 불러오지 않도록)
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+def is_service_unavailable(error: Exception) -> bool:
+    """API가 느리거나 응답하지 않는 경우 (재시도 대상 오류, 마감 시간·속도 제한 대기 초과, 열린 회로 차단기)
+
+    인증 오류·잘못된 요청·코드 오류는 해당하지 않아 대체 결과로 감추지 않습니다.
+    """
+    return isinstance(error, (CircuitOpenError, RateLimitTimeout, DeadlineExceeded)) or is_retryable(error)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """응답 헤더의 Retry-After(또는 retry-after-ms) 값"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+# ───────────── 세션·학교 간 공정 스케줄링 (공유 API 키) ─────────────
+# 우선순위: 화면에서 기다리는 단일 생성과 시나리오·대량 일괄 생성
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+# 같은 비용일 때 단일 생성 요청이 일괄 생성보다 이만큼 자주 차례를 받음
+PRIORITY_WEIGHTS = {INTERACTIVE: 8.0, BATCH: 1.0}
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TENANT_CONCURRENCY = 4
+# 일괄 생성이 모든 자리를 차지하지 못하도록 단일 생성에만 남겨 두는 동시 호출 수
+DEFAULT_INTERACTIVE_RESERVED = 2
+# 학교를 알 수 없는 호출(명령행 도구 등)이 함께 쓰는 스케줄링 단위
+DEFAULT_TENANT = "공용"
+# 우선순위별로 보관하는 최근 대기 시간 수
+WAIT_WINDOW = 1000
+# 학교별 분당 요청 한도에 걸린 요청을 다시 확인하는 간격(초)
+QUOTA_RECHECK_S = 0.05
+
+_schedule: ContextVar[Tuple[Optional[str], str]] = ContextVar("api_schedule", default=(None, INTERACTIVE))
+
+
+def current_schedule() -> Tuple[Optional[str], str]:
+    """지금 실행 중인 코드의 (스케줄링 단위, 우선순위). 단위가 정해지지 않았으면 None"""
+    return _schedule.get()
+
+
+@contextmanager
+def scheduling(tenant: Optional[str] = None, priority: Optional[str] = None) -> Iterator[None]:
+    """블록 안의 API 호출을 tenant(학교)와 priority로 스케줄링 (None이면 바깥 설정 유지)
+
+    스레드 풀에 넘기는 작업은 contextvars.copy_context().run으로 감싸야 설정이 이어집니다.
+    """
+    outer_tenant, outer_priority = _schedule.get()
+    token = _schedule.set((tenant or outer_tenant, priority or outer_priority))
+    try:
+        yield
+    finally:
+        _schedule.reset(token)
+
+
+class FairScheduler:
+    """공유 API 키의 동시 호출 자리를 학교·우선순위별로 나누는 가중 공정 큐
+
+    (학교, 우선순위)마다 흐름을 두고 요청에 가상 종료 시각(흐름의 이전 종료 시각 이후로
+    예상 토큰 수 / 가중치만큼)을 붙여 가장 이른 요청부터 자리를 줍니다. 많이 보내는 학교는
+    자기 요청끼리 뒤로 밀리고, 단일 생성은 가중치가 커서 일괄 생성보다 먼저 차례가 옵니다.
+    전체·학교별 동시 호출 수와 학교별 분당 요청 수 한도를 넘는 요청은 자리가 날 때까지 기다립니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tenant_concurrency: int = DEFAULT_TENANT_CONCURRENCY,
+        tenant_requests_per_minute: Optional[float] = None,
+        interactive_reserved: int = DEFAULT_INTERACTIVE_RESERVED,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.tenant_requests_per_minute = tenant_requests_per_minute
+        self.interactive_reserved = max(0, min(interactive_reserved, self.max_concurrency - 1))
+        self.weights = {**PRIORITY_WEIGHTS, **(weights or {})}
+        self._cond = threading.Condition()
+        self._waiting: List[Dict] = []
+        self._finish_tags: Dict[Tuple[str, str], float] = {}
+        self._virtual_time = 0.0
+        self._sequence = 0
+        self._running: Counter = Counter()
+        self._running_by_priority: Counter = Counter()
+        self._served: Counter = Counter()
+        self._quotas: Dict[str, TokenBucket] = {}
+        self._waits = {priority: deque(maxlen=WAIT_WINDOW) for priority in PRIORITIES}
+
+    def acquire(
+        self,
+        tenant: Optional[str],
+        priority: str = INTERACTIVE,
+        cost: float = 1,
+        deadline: Optional[float] = None
+    ) -> float:
+        """차례가 올 때까지 기다려 동시 호출 자리 하나를 잡고 기다린 시간(초) 반환
+
+        deadline(time.monotonic 기준)까지 차례가 오지 않으면 대기열에서 빠지고 DeadlineExceeded.
+        """
+        tenant = tenant or DEFAULT_TENANT
+        queued = time.monotonic()
+        with self._cond:
+            key = (tenant, priority)
+            start = max(self._virtual_time, self._finish_tags.get(key, 0.0))
+            self._finish_tags[key] = start + max(1.0, cost) / self.weights.get(priority, 1.0)
+            self._sequence += 1
+            ticket = {
+                "tenant": tenant,
+                "priority": priority,
+                "start": start,
+                "finish": self._finish_tags[key],
+                "sequence": self._sequence,
+                "granted": False
+            }
+            self._waiting.append(ticket)
+            self._dispatch()
+            while not ticket["granted"]:
+                # 분당 한도에 걸린 요청은 자리 반납이 없어도 다시 확인
+                timeout = QUOTA_RECHECK_S if self.tenant_requests_per_minute else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiting.remove(ticket)
+                        raise DeadlineExceeded("API 호출 차례를 기다리는 중 생성 마감 시간이 지났습니다")
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                self._cond.wait(timeout)
+                if not ticket["granted"]:
+                    self._dispatch()
+            waited = time.monotonic() - queued
+            self._waits.setdefault(priority, deque(maxlen=WAIT_WINDOW)).append(waited)
+        return waited
+
+    def release(self, tenant: Optional[str], priority: str = INTERACTIVE) -> None:
+        """호출이 끝난 자리를 반납하고 다음 차례 요청에 넘김"""
+        tenant = tenant or DEFAULT_TENANT
+        with self._cond:
+            self._running[tenant] -= 1
+            if self._running[tenant] <= 0:
+                del self._running[tenant]
+            self._running_by_priority[priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self,
+        tenant: Optional[str],
+        priority: str = INTERACTIVE,
+        cost: float = 1,
+        deadline: Optional[float] = None
+    ) -> Iterator[float]:
+        """acquire/release를 묶은 블록 (기다린 시간을 돌려줌)"""
+        waited = self.acquire(tenant, priority, cost, deadline)
+        try:
+            yield waited
+        finally:
+            self.release(tenant, priority)
+
+    def snapshot(self) -> Dict:
+        """관리 화면용 현재 상태: 실행·대기 수, 학교별 현황, 우선순위별 대기 시간(ms)"""
+        with self._cond:
+            queued = Counter(ticket["priority"] for ticket in self._waiting)
+            queued_by_tenant = Counter(ticket["tenant"] for ticket in self._waiting)
+            tenants = sorted(set(self._running) | set(queued_by_tenant) | {tenant for tenant, _ in self._served})
+            waits = {priority: sorted(values) for priority, values in self._waits.items()}
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": sum(self._running.values()),
+                "queued": len(self._waiting),
+                "priorities": {
+                    priority: {
+                        "running": self._running_by_priority[priority],
+                        "queued": queued[priority],
+                        "served": sum(count for (_, served_priority), count in self._served.items() if served_priority == priority),
+                        "wait_p50_ms": round(percentile(values, 50) * 1000, 1),
+                        "wait_p95_ms": round(percentile(values, 95) * 1000, 1),
+                        "wait_max_ms": round(values[-1] * 1000, 1) if values else 0.0
+                    }
+                    for priority, values in waits.items()
+                },
+                "tenants": [
+                    {
+                        "tenant": tenant,
+                        "running": self._running[tenant],
+                        "queued": queued_by_tenant[tenant],
+                        "served": sum(count for (served_tenant, _), count in self._served.items() if served_tenant == tenant)
+                    }
+                    for tenant in tenants
+                ]
+            }
+
+    def _eligible(self, ticket: Dict) -> bool:
+        if self._running[ticket["tenant"]] >= self.tenant_concurrency:
+            return False
+        if ticket["priority"] == INTERACTIVE:
+            return True
+        batch_running = sum(count for priority, count in self._running_by_priority.items() if priority != INTERACTIVE)
+        return batch_running < self.max_concurrency - self.interactive_reserved
+
+    def _quota(self, tenant: str) -> Optional[TokenBucket]:
+        if not self.tenant_requests_per_minute:
+            return None
+        if tenant not in self._quotas:
+            self._quotas[tenant] = TokenBucket(self.tenant_requests_per_minute)
+        return self._quotas[tenant]
+
+    def _dispatch(self) -> None:
+        # 빈 자리가 있는 동안 자격이 되는 요청 중 가상 종료 시각이 가장 이른 요청에 자리를 줌 (락 안에서 호출)
+        granted = False
+        over_quota = set()
+        while sum(self._running.values()) < self.max_concurrency:
+            candidates = [
+                ticket for ticket in self._waiting
+                if ticket["tenant"] not in over_quota and self._eligible(ticket)
+            ]
+            if not candidates:
+                break
+            ticket = min(candidates, key=lambda item: (item["finish"], item["sequence"]))
+            quota = self._quota(ticket["tenant"])
+            if quota is not None and not quota.try_take(1):
+                over_quota.add(ticket["tenant"])
+                continue
+            self._waiting.remove(ticket)
+            ticket["granted"] = True
+            self._virtual_time = max(self._virtual_time, ticket["start"])
+            self._running[ticket["tenant"]] += 1
+            self._running_by_priority[ticket["priority"]] += 1
+            self._served[(ticket["tenant"], ticket["priority"])] += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+            # 가상 시각보다 앞선 흐름의 종료 시각은 다음 요청에 영향이 없으므로 정리
+            if len(self._finish_tags) > 1000:
+                self._finish_tags = {key: tag for key, tag in self._finish_tags.items() if tag > self._virtual_time}
+
+
+class APIGuard:
+    """단일·일괄 생성 경로가 함께 쓰는 API 호출 보호 계층"""
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        scheduler: Optional[FairScheduler] = None
+    ):
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # 없으면 도착 순서대로 호출 (동시 호출 수 제한 없음)
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """지수 백오프 + 전체 지터. 서버가 Retry-After를 주면 그 값을 우선"""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 4)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @contextmanager
+    def _scheduled(self, estimated_tokens: int, trace: Optional[Dict], deadline: Optional[float]) -> Iterator[None]:
+        """스케줄러가 있으면 지금 설정된 학교·우선순위로 차례를 기다려 자리를 잡고, 블록이 끝나면 반납"""
+        if self.scheduler is None:
+            yield
+            return
+        tenant, priority = current_schedule()
+        with self.scheduler.slot(tenant, priority, cost=estimated_tokens, deadline=deadline) as waited:
+            add_to_trace(trace, schedule_wait_s=waited)
+            yield
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        estimated_tokens: int = 0,
+        trace: Optional[Dict] = None,
+        deadline: Optional[float] = None
+    ) -> T:
+        """스케줄러 차례, 속도 제한과 회로 차단기를 거쳐 fn을 호출하고, 일시적 오류는 재시도
+
+        trace(계측 기록)를 넘기면 스케줄러·속도 제한 대기 시간과 재시도 횟수를 더합니다.
+        deadline(time.monotonic 기준)을 넘기면 그때까지 끝나지 않을 대기·재시도는 하지 않습니다.
+        스케줄러 자리는 fn이 반환할 때까지만 잡으므로 재시도 대기 중에는 다른 요청이 씁니다
+        (스트리밍은 응답이 시작될 때까지).
+        """
+        attempt = 0
+        while True:
+            if deadline is not None and deadline - time.monotonic() <= 0:
+                raise DeadlineExceeded("생성 마감 시간이 지났습니다")
+            error = None
+            with self._scheduled(estimated_tokens, trace, deadline):
+                self.circuit_breaker.before_call()
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    waited = self.rate_limiter.acquire(estimated_tokens, max_wait=remaining)
+                except BaseException:
+                    # 호출 전에 끝났으므로 시험 호출 자리가 계속 잡혀 있지 않도록 반납
+                    self.circuit_breaker.release_trial()
+                    raise
+                add_to_trace(trace, rate_limit_wait_s=waited)
+                try:
+                    result = fn()
+                except Exception as e:
+                    error = e
+            if error is None:
+                self.circuit_breaker.record_success()
+                return result
+            retryable = is_retryable(error)
+            if retryable:
+                self.circuit_breaker.record_failure()
+            else:
+                # 요청 자체의 문제(잘못된 입력 등)는 서비스 상태와 무관
+                self.circuit_breaker.record_success()
+            if not retryable or attempt >= self.max_retries:
+                raise error
+            delay = self.backoff_delay(attempt, error)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+            add_to_trace(trace, retries=1)
+
+
+def estimate_tokens(messages, max_tokens: int) -> int:
+    """TPM 예산 계산용 대략적인 토큰 수 (한글은 글자당 약 1토큰으로 보수적으로 추정)"""
+    return sum(len(message["content"]) for message in messages) + max_tokens
@@ -0,0 +1,358 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from sms_cache import make_cache_key
+from sms_validator import validate_sms
+
+# ───────────── 비슷한 요청 색인 (단어 안 글자 n-gram MinHash + LSH) ─────────────
+# 대상·카테고리·길이·스타일이 같은 이전 요청 중 주요 내용과 추가 정보가 비슷한 요청을 찾아
+# 그때 생성한 문자를 API 호출 없이 제안
+GROUP_FIELDS = ("target", "category", "length_option", "style_option")
+NUM_PERM = 64
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+# 단어 안 두·세 글자 조각 기준 자카드 유사도. 같은 공지를 고쳐 쓴 요청은 0.53 이상, 인사말만 같은
+# 다른 공지는 0.49 이하로 나온 예시 묶음(tests/test_similar_index.py)으로 정함
+# (예: "정문 앞 횡단보도 공사로 후문 이용" / "정문 앞 횡단보도 공사, 후문으로 등교" ≈ 0.53)
+DEFAULT_MIN_SIMILARITY = 0.5
+# 서명 추정값은 오차가 있으므로 이만큼 낮은 후보까지 원문으로 정확한 유사도를 다시 계산
+ESTIMATE_MARGIN = 0.1
+# 조각 만드는 방식이 바뀌면 올림 (저장된 서명을 원문으로 다시 계산)
+SIGNATURE_VERSION = 2
+DEFAULT_MAX_ENTRIES = 200000
+# 새로 추가된 항목은 이 건수까지 정렬 색인 밖에서 바로 비교하고, 넘으면 한꺼번에 다시 정렬
+TAIL_SIZE = 1024
+# 후보가 많으면 겹친 밴드 수가 많은 순으로 이 개수만 유사도를 계산
+MAX_RERANK = 2000
+# 유사도 순으로 이 개수까지 새 요청 기준 검증을 시도
+MAX_SUGGESTION_CHECKS = 5
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _seed_array(label: str, size: int) -> np.ndarray:
+    # 저장된 서명과 계속 맞도록 난수 생성기 대신 고정된 해시로 계수 생성
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(f"{label}{i}".encode(), digest_size=8).digest(), "little") for i in range(size)],
+        dtype=np.uint64
+    )
+
+
+_PERM_A = _seed_array("a", NUM_PERM) | np.uint64(1)
+_PERM_B = _seed_array("b", NUM_PERM)
+_BAND_SALT = _seed_array("band", BANDS)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def request_text(request: Dict) -> str:
+    """유사도를 비교할 요청 내용 (주요 내용 + 추가 정보 값)"""
+    additional_info = request.get("additional_info") or {}
+    values = [str(value) for _, value in sorted(additional_info.items()) if value]
+    return " ".join([request.get("content_details") or ""] + values)
+
+
+def shingles(text: str) -> set:
+    """단어마다 글자 2-gram과 3-gram 집합 (한 글자 단어는 그대로)
+
+    낱글자는 관계없는 공지끼리도 많이 겹치므로 쓰지 않고, 조각이 단어 경계를 넘지 않도록 합니다.
+    """
+    grams = set()
+    for word in _NON_WORD.sub(" ", text.lower()).split():
+        if len(word) < 2:
+            grams.add(word)
+            continue
+        grams.update(word[i:i + 2] for i in range(len(word) - 1))
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def text_similarity(a: str, b: str) -> float:
+    """두 요청 내용의 shingles 기준 정확한 자카드 유사도"""
+    first, second = shingles(a), shingles(b)
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM개 해시 함수의 최솟값으로 만든 MinHash 서명 (비교할 내용이 없으면 None)"""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+    # multiply-shift 해시: (a·h + b) mod 2^64의 상위 32비트
+    return ((hashes[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+
+def group_key(request: Dict) -> str:
+    """같은 그룹 안에서만 제안하도록 묶는 키"""
+    return "\x1f".join(str(request.get(field) or "") for field in GROUP_FIELDS)
+
+
+def _group_hash(group: str) -> int:
+    return int.from_bytes(hashlib.blake2b(group.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _band_keys(signatures: np.ndarray, group_hashes: np.ndarray) -> np.ndarray:
+    """(n, NUM_PERM) 서명을 그룹별 밴드 버킷 키 (n, BANDS)로 변환"""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS_PER_BAND).astype(np.uint64)
+    keys = group_hashes[:, None] ^ _BAND_SALT[None, :]
+    for row in range(ROWS_PER_BAND):
+        keys = (keys ^ bands[:, :, row]) * _MIX
+    return keys
+
+
+def _adapt(message: str, source: Dict, request: Dict) -> str:
+    """이전 문자의 학교명·날짜를 새 요청 값으로 바꿈"""
+    for field in ("school", "date"):
+        old, new = source.get(field) or "", request.get(field) or ""
+        if old and new and old != new:
+            message = message.replace(old, new)
+    return message
+
+
+class SimilarRequestIndex:
+    """이전 요청과 생성 문자를 보관하는 근사 중복 색인 (메모리 LSH + SQLite 영구 저장)
+
+    밴드 키는 하나의 정렬된 배열로 두고 이진 탐색으로 후보를 찾으며, 후보 중
+    서명이 가장 많이 일치하는(추정 유사도가 가장 높은) 항목부터 원문으로 다시 계산한 유사도가
+    min_similarity 이상이고 새 요청 기준 검증을 통과한 문자를 제안합니다.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "sms_similar.db",
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.min_similarity = min_similarity
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS similar_requests (
+                key TEXT PRIMARY KEY,
+                group_key TEXT NOT NULL,
+                request_text TEXT NOT NULL,
+                school TEXT NOT NULL DEFAULT '',
+                date TEXT NOT NULL DEFAULT '',
+                message TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_similar_created ON similar_requests (created_at)")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_of_key)
+
+    def add(self, request: Dict, message: str) -> None:
+        """요청과 생성된 문자를 색인에 추가 (같은 그룹의 같은 내용이면 최신 문자로 교체)"""
+        self.add_many([(request, message)])
+
+    def add_many(self, items: Iterable[Tuple[Dict, str]]) -> int:
+        """(요청, 문자) 목록을 한 번에 추가하고 추가한 건수 반환"""
+        now = time.time()
+        rows, signatures = [], []
+        for request, message in items:
+            text = request_text(request)
+            signature = minhash(text)
+            if signature is None or not message:
+                continue
+            group = group_key(request)
+            key = make_cache_key(group=group, text=_NON_WORD.sub(" ", text.lower()))
+            rows.append((key, group, text, request.get("school") or "", request.get("date") or "", message))
+            signatures.append(signature)
+        if not rows:
+            return 0
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO similar_requests "
+                "(key, group_key, request_text, school, date, message, signature, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (signature.tobytes(), now) for row, signature in zip(rows, signatures)]
+            )
+            self._append(rows, np.stack(signatures))
+            self._evict()
+            if self._size - self._indexed > TAIL_SIZE:
+                self._reindex()
+        return len(rows)
+
+    def suggest(self, request: Dict) -> Optional[Dict]:
+        """비슷한 이전 요청의 문자를 새 요청에 맞춰 반환 (message, similarity, source_text). 없으면 None"""
+        text = request_text(request)
+        signature = minhash(text)
+        if signature is None:
+            return None
+        group = group_key(request)
+        query_keys = _band_keys(signature[None, :], np.array([_group_hash(group)], dtype=np.uint64))[0]
+
+        with self._lock:
+            candidates = self._candidates(query_keys)
+            if not len(candidates):
+                return None
+            similarities = (self._signatures[candidates] == signature).mean(axis=1)
+            keep = similarities >= self.min_similarity - ESTIMATE_MARGIN
+            candidates, similarities = candidates[keep], similarities[keep]
+            # 유사도가 높은 순, 같으면 최근 항목 먼저
+            order = np.lexsort((-candidates, -similarities))[:MAX_SUGGESTION_CHECKS]
+            for row, similarity in zip(candidates[order], similarities[order]):
+                entry = self._entries[row]
+                if entry["group"] != group:
+                    continue
+                source = self._conn.execute(
+                    "SELECT request_text FROM similar_requests WHERE key = ?", (entry["key"],)
+                ).fetchone()
+                if source is None:
+                    continue
+                similarity = text_similarity(text, source[0])
+                if similarity < self.min_similarity:
+                    continue
+                message = _adapt(entry["message"], entry, request)
+                if not validate_sms(message, request)["ok"]:
+                    continue
+                return {
+                    "message": message,
+                    "similarity": round(similarity, 3),
+                    "source_text": source[0]
+                }
+        return None
+
+    def clear(self) -> None:
+        """색인 전체 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM similar_requests")
+            self._reset(0)
+            self._reindex()
+
+    def _load(self) -> None:
+        rows = self._conn.execute(
+            "SELECT key, group_key, request_text, school, date, message, signature "
+            "FROM similar_requests ORDER BY created_at"
+        ).fetchall()
+        if rows and self._conn.execute("PRAGMA user_version").fetchone()[0] != SIGNATURE_VERSION:
+            rows = self._migrate(rows)
+        self._conn.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+        self._reset(len(rows))
+        if rows:
+            signatures = np.frombuffer(b"".join(row[6] for row in rows), dtype=np.uint32).reshape(-1, NUM_PERM)
+            self._append([row[:6] for row in rows], signatures)
+        self._reindex()
+
+    def _migrate(self, rows: List[Tuple]) -> List[Tuple]:
+        """이전 방식으로 만든 서명을 저장된 요청 내용으로 다시 계산 (비교할 내용이 없어진 항목은 삭제)"""
+        migrated, removed = [], []
+        for row in rows:
+            signature = minhash(row[2])
+            if signature is None:
+                removed.append((row[0],))
+                continue
+            migrated.append(row[:6] + (signature.tobytes(),))
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "UPDATE similar_requests SET signature = ? WHERE key = ?", [(row[6], row[0]) for row in migrated]
+        )
+        self._conn.executemany("DELETE FROM similar_requests WHERE key = ?", removed)
+        self._conn.execute("COMMIT")
+        return migrated
+
+    def _reset(self, capacity: int) -> None:
+        capacity = max(capacity, 64)
+        self._signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        self._band_keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._entries: List[Optional[Dict]] = []
+        self._row_of_key: Dict[str, int] = {}
+        self._size = 0
+        self._indexed = 0
+
+    def _append(self, rows: List[Tuple], signatures: np.ndarray) -> None:
+        needed = self._size + len(rows)
+        if needed > len(self._alive):
+            capacity = max(needed, 2 * len(self._alive))
+            for name in ("_signatures", "_band_keys", "_alive"):
+                array = getattr(self, name)
+                grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+                grown[:self._size] = array[:self._size]
+                setattr(self, name, grown)
+
+        group_hashes = {}
+        hashes = np.array(
+            [group_hashes.setdefault(row[1], _group_hash(row[1])) for row in rows], dtype=np.uint64
+        )
+        start = self._size
+        self._signatures[start:needed] = signatures
+        self._band_keys[start:needed] = _band_keys(signatures, hashes)
+        self._alive[start:needed] = True
+        for offset, (key, group, _, school, date, message) in enumerate(rows):
+            previous = self._row_of_key.get(key)
+            if previous is not None:
+                self._alive[previous] = False
+                self._entries[previous] = None
+            self._row_of_key[key] = start + offset
+            self._entries.append({"key": key, "group": group, "school": school, "date": date, "message": message})
+        self._size = needed
+
+    def _evict(self) -> None:
+        # 최대 건수를 넘으면 가장 먼저 추가된 항목부터 삭제
+        overflow = len(self._row_of_key) - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = np.flatnonzero(self._alive[:self._size])[:overflow]
+        keys = [self._entries[row]["key"] for row in oldest]
+        for row, key in zip(oldest, keys):
+            self._alive[row] = False
+            self._entries[row] = None
+            del self._row_of_key[key]
+        self._conn.executemany("DELETE FROM similar_requests WHERE key = ?", [(key,) for key in keys])
+
+    def _reindex(self) -> None:
+        # 삭제·교체된 항목을 정리한 뒤 밴드마다 키를 정렬
+        alive = np.flatnonzero(self._alive[:self._size])
+        if len(alive) < self._size:
+            entries = [self._entries[row] for row in alive]
+            signatures, band_keys = self._signatures[alive], self._band_keys[alive]
+            self._reset(len(alive))
+            self._signatures[:len(alive)] = signatures
+            self._band_keys[:len(alive)] = band_keys
+            self._alive[:len(alive)] = True
+            self._entries = entries
+            self._row_of_key = {entry["key"]: row for row, entry in enumerate(entries)}
+            self._size = len(alive)
+        # 밴드 키에는 밴드 번호가 섞여 있으므로 모든 밴드를 한 배열로 정렬해 한 번에 탐색
+        keys = self._band_keys[:self._size].ravel()
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[order]
+        self._sorted_rows = (order // BANDS).astype(np.int32)
+        self._indexed = self._size
+
+    def _candidates(self, query_keys: np.ndarray) -> np.ndarray:
+        """밴드 키가 하나라도 같은 살아 있는 항목 번호 (많으면 겹친 밴드 수가 많은 순으로 MAX_RERANK개)"""
+        low = self._sorted_keys.searchsorted(query_keys, "left")
+        high = self._sorted_keys.searchsorted(query_keys, "right")
+        lengths = high - low
+        total = int(lengths.sum())
+        # 밴드별 [low, high) 구간을 이어 붙인 위치
+        positions = np.repeat(low - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        found = self._sorted_rows[positions]
+        # 아직 정렬 색인에 들어가지 않은 최근 항목은 직접 비교
+        if self._size > self._indexed:
+            tail = self._band_keys[self._indexed:self._size]
+            found = np.concatenate([found, self._indexed + np.flatnonzero((tail == query_keys).any(axis=1))])
+        rows, collisions = np.unique(found, return_counts=True)
+        alive = self._alive[rows]
+        rows, collisions = rows[alive], collisions[alive]
+        if len(rows) > MAX_RERANK:
+            rows = rows[np.argpartition(-collisions, MAX_RERANK)[:MAX_RERANK]]
+        return rows
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# ───────────── 문자 생성 결과 캐시 (메모리 LRU + SQLite) ─────────────
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MEMORY_SIZE = 256
+DEFAULT_DISK_MAX_ENTRIES = 20000
+# 만료 항목 정리 주기(초). 저장할 때마다 전체를 훑지 않도록 이 간격으로만 정리
+EXPIRY_SWEEP_INTERVAL_S = 60
+# 메모리 적중 시각을 디스크에 모아서 반영하는 건수
+ACCESS_FLUSH_SIZE = 64
+# 한도를 넘으면 한도의 이 비율만큼 더 지워 두어, 가득 찬 뒤에도 저장할 때마다 정리하지 않도록 함
+EVICT_HEADROOM = 0.1
+
+
+def _normalize(value: Any) -> Any:
+    """공백·빈 값 차이로 키가 달라지지 않도록 입력값 정규화"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v not in (None, "")}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(**params: Any) -> str:
+    """generate_ai_sms 입력값과 모델 설정으로 캐시 키(SHA-256) 생성"""
+    payload = json.dumps(_normalize(params), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SMSCache:
+    """프로세스 내 LRU와 디스크 SQLite 저장소를 함께 쓰는 2단계 캐시"""
+
+    def __init__(
+        self,
+        db_path: str = "sms_cache.db",
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = memory_size
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sms_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sms_cache_accessed ON sms_cache (accessed_at)")
+        # 디스크 건수는 저장·삭제 때 직접 세고, 한도를 넘었다고 볼 때만 다시 셈 (다른 프로세스 변경 보정)
+        self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM sms_cache").fetchone()[0]
+        self._last_sweep = 0.0
+        # 메모리 적중으로 아직 디스크에 반영하지 않은 사용 시각 {키: 시각}
+        self._touched: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 문자 반환 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._touch(key, now)
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM sms_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._disk_entries -= self._conn.execute("DELETE FROM sms_cache WHERE key = ?", (key,)).rowcount
+                return None
+
+            self._conn.execute("UPDATE sms_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, value, expires_at)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """문자를 두 계층 모두에 저장하고 용량 초과분 정리"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._touched.pop(key, None)
+            exists = self._conn.execute("SELECT 1 FROM sms_cache WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sms_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            if not exists:
+                self._disk_entries += 1
+            if self._disk_entries > self.disk_max_entries or now - self._last_sweep >= EXPIRY_SWEEP_INTERVAL_S:
+                self._evict(now)
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._conn.execute("DELETE FROM sms_cache")
+            self._disk_entries = 0
+
+    def stats(self) -> Dict[str, int]:
+        """계층별 저장 건수"""
+        with self._lock:
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM sms_cache").fetchone()[0]
+            return {"memory_entries": len(self._memory), "disk_entries": disk_entries}
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key: str, now: float) -> None:
+        self._touched[key] = now
+        if len(self._touched) >= ACCESS_FLUSH_SIZE:
+            self._flush_touched()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE sms_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self, now: float) -> None:
+        # 만료된 항목 삭제 후, 최대 건수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+        self._last_sweep = now
+        self._disk_entries -= self._conn.execute("DELETE FROM sms_cache WHERE expires_at <= ?", (now,)).rowcount
+        if self._disk_entries <= self.disk_max_entries:
+            return
+        self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM sms_cache").fetchone()[0]
+        overflow = self._disk_entries - self.disk_max_entries + int(self.disk_max_entries * EVICT_HEADROOM)
+        if overflow > 0:
+            # 메모리 적중 시각을 먼저 반영해야 최근에 쓴 항목이 지워지지 않음
+            self._flush_touched()
+            self._disk_entries -= self._conn.execute(
+                "DELETE FROM sms_cache WHERE key IN (SELECT key FROM sms_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            ).rowcount
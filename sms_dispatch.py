@@ -0,0 +1,464 @@
+import asyncio
+import csv
+import io
+import random
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sms_validator import LMS_BYTE_LIMIT, SMS_BYTE_LIMIT, classify_by_bytes, sms_byte_length
+
+# ───────────── 문자 발송 (수신자 목록 → 게이트웨이 배치 전송 → 발송 결과 저장) ─────────────
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# 문자 유형별 건당 요금(원). 실제 요금은 secrets의 SMS_UNIT_COST/LMS_UNIT_COST로 바꿈
+MESSAGE_UNIT_COSTS = {"단문(SMS)": 20.0, "장문(LMS)": 50.0}
+
+# 게이트웨이 결과 상태 (RETRY는 수신자를 대기 상태로 두고 다음 회차에 다시 보냄)
+SENT = "sent"
+FAILED = "failed"
+RETRY = "retry"
+PENDING = "pending"
+
+# 수신자 CSV 열 이름 (한글·영문 모두 허용)
+RECIPIENT_COLUMNS = {
+    "전화번호": "phone",
+    "휴대폰": "phone",
+    "휴대폰번호": "phone",
+    "phone": "phone",
+    "이름": "name",
+    "name": "name",
+    "대상": "target",
+    "target": "target",
+    "학교": "school",
+    "학교명": "school",
+    "school": "school"
+}
+
+_PHONE = re.compile(r"^0\d{8,10}$")
+_PHONE_SEPARATORS = re.compile(r"[\s\-().]")
+
+
+# ───────────── 수신자 목록 ─────────────
+def normalize_phone(phone: str) -> Optional[str]:
+    """하이픈·공백을 뗀 전화번호 (형식이 틀리면 None). +82로 시작하면 0으로 바꿈"""
+    phone = _PHONE_SEPARATORS.sub("", str(phone or ""))
+    if phone.startswith("+82"):
+        phone = "0" + phone[3:]
+    return phone if _PHONE.match(phone) else None
+
+
+def read_recipients(data: bytes) -> List[Dict]:
+    """수신자 CSV (UTF-8 또는 엑셀 기본 CP949)를 {phone, name, target, school} 행 목록으로 읽음"""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("cp949")
+    reader = csv.DictReader(io.StringIO(text))
+    columns = {column: RECIPIENT_COLUMNS.get(column.strip().lower()) for column in reader.fieldnames or []}
+    if "phone" not in columns.values():
+        raise ValueError("수신자 CSV에 '전화번호' 열이 없습니다")
+    rows = []
+    for row in reader:
+        recipient = {"phone": "", "name": "", "target": "", "school": ""}
+        for column, field in columns.items():
+            if field and row.get(column):
+                recipient[field] = row[column].strip()
+        rows.append(recipient)
+    return rows
+
+
+def plan_dispatch(messages: List[Dict], recipients: List[Dict]) -> Tuple[List[Tuple[str, str, int]], List[Dict]]:
+    """수신자마다 보낼 문자를 정해 ((전화번호, 이름, 문자 번호) 목록, 제외한 수신자 목록) 반환
+
+    수신자의 대상·학교 값이 있으면 그 값이 같은 문자를, 없으면 남은 조건에 맞는 문자를
+    고르며 맞는 문자가 없거나 여러 개면 제외합니다. 같은 문자를 같은 번호로 두 번 보내지 않습니다.
+    """
+    index: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+    for idx, message in enumerate(messages):
+        school, target = message.get("school") or None, message.get("target") or None
+        for key in {(school, target), (None, target), (school, None), (None, None)}:
+            index.setdefault(key, []).append(idx)
+
+    assignments, rejected, seen = [], [], set()
+    for row, recipient in enumerate(recipients, start=1):
+        phone = normalize_phone(recipient.get("phone"))
+        if phone is None:
+            rejected.append({"row": row, "phone": recipient.get("phone", ""), "reason": "전화번호 형식 오류"})
+            continue
+        matches = index.get((recipient.get("school") or None, recipient.get("target") or None), [])
+        if len(matches) != 1:
+            reason = "맞는 문자 없음" if not matches else "문자가 여러 개라 대상·학교 열이 필요함"
+            rejected.append({"row": row, "phone": phone, "reason": reason})
+            continue
+        if (phone, matches[0]) in seen:
+            rejected.append({"row": row, "phone": phone, "reason": "중복 번호"})
+            continue
+        seen.add((phone, matches[0]))
+        assignments.append((phone, recipient.get("name", ""), matches[0]))
+    return assignments, rejected
+
+
+def dispatch_cost(counts: Dict[str, int], unit_costs: Optional[Dict[str, float]] = None) -> float:
+    """문자 유형별 건수({"단문(SMS)": n, ...})의 예상 요금"""
+    unit_costs = unit_costs or MESSAGE_UNIT_COSTS
+    return sum(count * unit_costs.get(sms_type, 0.0) for sms_type, count in counts.items())
+
+
+# ───────────── 발송 결과 저장소 (SQLite) ─────────────
+class DispatchStore:
+    """발송 작업, 작업별 문자, 수신자별 발송 상태를 보관. 중단된 작업은 대기 중인 수신자부터 이어서 보냄"""
+
+    def __init__(self, db_path: str = "sms_dispatch.db"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS dispatch_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    gateway TEXT NOT NULL,
+                    status TEXT NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS dispatch_messages (
+                    job_id INTEGER NOT NULL,
+                    idx INTEGER NOT NULL,
+                    school TEXT NOT NULL DEFAULT '',
+                    target TEXT NOT NULL DEFAULT '',
+                    content TEXT NOT NULL,
+                    byte_length INTEGER NOT NULL,
+                    sms_type TEXT NOT NULL,
+                    PRIMARY KEY (job_id, idx)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS dispatch_recipients (
+                    job_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    phone TEXT NOT NULL,
+                    name TEXT NOT NULL DEFAULT '',
+                    message_idx INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    gateway_id TEXT,
+                    error TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (job_id, seq)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dispatch_status ON dispatch_recipients (job_id, status)")
+
+    def create_job(self, name: str, gateway: str, messages: List[Dict], assignments: List[Tuple[str, str, int]]) -> int:
+        """작업과 수신자(모두 대기 상태)를 한 트랜잭션으로 저장하고 작업 id 반환"""
+        message_rows = []
+        for idx, message in enumerate(messages):
+            byte_length = sms_byte_length(message["content"])
+            if byte_length > LMS_BYTE_LIMIT:
+                raise ValueError(f"{idx + 1}번째 문자가 장문 한도({LMS_BYTE_LIMIT}바이트)를 넘습니다: {byte_length}바이트")
+            message_rows.append((
+                idx, message.get("school") or "", message.get("target") or "", message["content"], byte_length,
+                classify_by_bytes(byte_length)
+            ))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO dispatch_jobs (created_at, name, gateway, status) VALUES (?, ?, ?, ?)",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), name, gateway, PENDING)
+            )
+            job_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO dispatch_messages (job_id, idx, school, target, content, byte_length, sms_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, *row) for row in message_rows]
+            )
+            self._conn.executemany(
+                "INSERT INTO dispatch_recipients (job_id, seq, phone, name, message_idx) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, seq, phone, name, idx) for seq, (phone, name, idx) in enumerate(assignments)]
+            )
+        return job_id
+
+    def job(self, job_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM dispatch_jobs WHERE id = ?", (job_id,)).fetchone()
+            return dict(row) if row else None
+
+    def messages(self, job_id: int) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM dispatch_messages WHERE job_id = ? ORDER BY idx", (job_id,))
+            return [dict(row) for row in rows]
+
+    def pending(self, job_id: int, max_attempts: int) -> List[Tuple[int, str, int]]:
+        """아직 보내지 못했고 재시도 횟수가 남은 수신자 (순번, 전화번호, 문자 번호)"""
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT seq, phone, message_idx FROM dispatch_recipients "
+                "WHERE job_id = ? AND status = 'pending' AND attempts < ? ORDER BY seq",
+                (job_id, max_attempts)
+            )]
+
+    def record_results(self, job_id: int, results: Iterable[Dict]) -> None:
+        """게이트웨이 결과 반영 (RETRY는 시도 횟수만 늘리고 대기 상태 유지)"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (PENDING if result["status"] == RETRY else result["status"], result.get("gateway_id"), result.get("error"),
+             now, job_id, int(result["id"]))
+            for result in results
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE dispatch_recipients SET status = ?, attempts = attempts + 1, gateway_id = ?, error = ?, "
+                "updated_at = ? WHERE job_id = ? AND seq = ?",
+                rows
+            )
+
+    def set_status(self, job_id: int, status: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE dispatch_jobs SET status = ? WHERE id = ?", (status, job_id))
+
+    def finish_job(self, job_id: int, max_attempts: int) -> str:
+        """재시도 횟수를 다 쓴 수신자를 실패로 정리하고 작업 상태(done/partial/pending) 반환"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE dispatch_recipients SET status = 'failed' WHERE job_id = ? AND status = 'pending' AND attempts >= ?",
+                (job_id, max_attempts)
+            )
+        counts = self.summary(job_id)
+        status = PENDING if counts[PENDING] else ("done" if not counts[FAILED] else "partial")
+        self.set_status(job_id, status)
+        return status
+
+    def summary(self, job_id: int, unit_costs: Optional[Dict[str, float]] = None) -> Dict:
+        """상태별 수신자 수와 발송 완료 건의 문자 유형별 건수·요금"""
+        counts = {SENT: 0, FAILED: 0, PENDING: 0}
+        sent_types: Dict[str, int] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.status, m.sms_type, COUNT(*) FROM dispatch_recipients r "
+                "JOIN dispatch_messages m ON m.job_id = r.job_id AND m.idx = r.message_idx "
+                "WHERE r.job_id = ? GROUP BY r.status, m.sms_type",
+                (job_id,)
+            ).fetchall()
+        for status, sms_type, count in rows:
+            counts[status] = counts.get(status, 0) + count
+            if status == SENT:
+                sent_types[sms_type] = count
+        return {
+            "total": sum(counts.values()),
+            **counts,
+            "sent_by_type": sent_types,
+            "cost": dispatch_cost(sent_types, unit_costs)
+        }
+
+    def jobs(self, limit: int = 20) -> List[Dict]:
+        """최근 작업 목록 (상태별 수신자 수 포함)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT j.id, j.created_at, j.name, j.gateway, j.status, COUNT(r.seq) AS total, "
+                "SUM(r.status = 'sent') AS sent, SUM(r.status = 'failed') AS failed, SUM(r.status = 'pending') AS pending "
+                "FROM dispatch_jobs j LEFT JOIN dispatch_recipients r ON r.job_id = j.id "
+                "GROUP BY j.id ORDER BY j.id DESC LIMIT ?",
+                (limit,)
+            )
+            return [dict(row) for row in rows]
+
+    def failures(self, job_id: int, limit: int = 1000) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, phone, name, message_idx, attempts, error FROM dispatch_recipients "
+                "WHERE job_id = ? AND status = 'failed' ORDER BY seq LIMIT ?",
+                (job_id, limit)
+            )
+            return [dict(row) for row in rows]
+
+
+# ───────────── 게이트웨이 (교체 가능) ─────────────
+class DryRunGateway:
+    """실제로 보내지 않고 모두 접수된 것으로 처리하는 게이트웨이 (연습·화면 확인용)"""
+
+    name = "dry_run"
+    max_batch_size = 1000
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def __aenter__(self) -> "DryRunGateway":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def send_batch(self, batch: List[Dict]) -> List[Dict]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [{"id": message["id"], "status": SENT, "gateway_id": f"dry-{message['id']}"} for message in batch]
+
+
+class HTTPGateway:
+    """JSON HTTP 문자 게이트웨이 클라이언트 (작업 동안 keep-alive 연결 풀을 공유하는 비동기 클라이언트)
+
+    요청: POST {base_url}/messages  {"messages": [{"id", "idempotency_key", "to", "text", "type": "SMS"|"LMS"}]}
+    응답: {"results": [{"id", "status": "accepted"|"rejected", "message_id", "error", "retryable"}]}
+    429·5xx·연결 오류는 배치 전체를, retryable 거절과 응답에 빠진 건은 해당 문자만 다시 보냅니다.
+    5xx여도 일부는 이미 접수됐을 수 있으므로, 게이트웨이는 idempotency_key(작업·수신자마다 고정)가
+    이미 접수된 문자는 다시 보내지 않고 처음 결과를 돌려줘야 합니다.
+    다른 제공자는 send_batch만 같은 형식으로 구현하면 됩니다.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url: str, api_key: str = "", max_batch_size: int = 1000, max_connections: int = DEFAULT_MAX_IN_FLIGHT):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_batch_size = max_batch_size
+        self.max_connections = max_connections
+        self._client = None
+
+    async def __aenter__(self) -> "HTTPGateway":
+        # httpx는 실제로 발송할 때만 불러옴 (앱 첫 화면을 늦추지 않도록)
+        import httpx
+
+        # 비동기 클라이언트는 이벤트 루프에 묶이므로 작업(asyncio.run)마다 새로 엶
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else None,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=60.0)
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._client.aclose()
+        self._client = None
+
+    async def send_batch(self, batch: List[Dict]) -> List[Dict]:
+        import httpx
+
+        try:
+            response = await self._client.post("/messages", json={"messages": batch})
+        except httpx.TransportError as e:
+            return [{"id": message["id"], "status": RETRY, "error": f"연결 오류: {e!r}"} for message in batch]
+        if response.status_code == 429 or response.status_code >= 500:
+            return [{"id": message["id"], "status": RETRY, "error": f"HTTP {response.status_code}"} for message in batch]
+        if response.status_code >= 400:
+            return [{"id": message["id"], "status": FAILED, "error": f"HTTP {response.status_code}: {response.text[:200]}"}
+                    for message in batch]
+
+        replies = {str(item.get("id")): item for item in response.json().get("results", [])}
+        results = []
+        for message in batch:
+            reply = replies.get(message["id"])
+            if reply is None:
+                results.append({"id": message["id"], "status": RETRY, "error": "응답에 결과 없음"})
+            elif reply.get("status") == "accepted":
+                results.append({"id": message["id"], "status": SENT, "gateway_id": reply.get("message_id")})
+            else:
+                results.append({
+                    "id": message["id"],
+                    "status": RETRY if reply.get("retryable") else FAILED,
+                    "error": reply.get("error") or "rejected"
+                })
+        return results
+
+
+def build_gateway(name: str, base_url: str = "", api_key: str = "", max_batch_size: int = 1000, max_connections: int = DEFAULT_MAX_IN_FLIGHT):
+    """설정 이름으로 게이트웨이 생성 (http는 base_url 필요)"""
+    if name == "http":
+        if not base_url:
+            raise ValueError("http 게이트웨이에는 SMS_GATEWAY_URL이 필요합니다")
+        return HTTPGateway(base_url, api_key, max_batch_size=max_batch_size, max_connections=max_connections)
+    return DryRunGateway()
+
+
+# ───────────── 발송 실행 ─────────────
+async def dispatch_job(
+    gateway,
+    store: DispatchStore,
+    job_id: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    base_delay: float = RETRY_BASE_DELAY,
+    on_progress: Optional[Callable[[int, int, int], None]] = None
+) -> Dict:
+    """대기 중인 수신자를 게이트웨이 배치로 나눠 보내고 작업 요약 반환
+
+    동시에 보내는 배치는 max_in_flight개까지이며, 대기열이 차면 배치 만들기를 멈춥니다(역압).
+    재시도 대상은 회차마다 지수 백오프 후 다시 보내고, max_attempts번 실패하면 실패로 기록합니다.
+    on_progress(회차, 처리한 수신자 수, 회차 전체 수신자 수)로 진행 상황을 알립니다.
+    """
+    batch_size = max(1, min(batch_size, gateway.max_batch_size))
+    messages = store.messages(job_id)
+    payloads = [
+        {"text": message["content"], "type": "SMS" if message["byte_length"] <= SMS_BYTE_LIMIT else "LMS"}
+        for message in messages
+    ]
+    # 재시도·이어 보내기에도 바뀌지 않는 수신자별 중복 방지 키 (작업 id + 생성 시각 + 순번)
+    key_prefix = f"{job_id}-{re.sub(r'[^0-9]', '', store.job(job_id)['created_at'])}"
+    store.set_status(job_id, "running")
+
+    async with gateway:
+        for attempt in range(max_attempts):
+            pending = store.pending(job_id, max_attempts)
+            if not pending:
+                break
+            if attempt:
+                await asyncio.sleep(random.uniform(0, min(RETRY_MAX_DELAY, base_delay * (2 ** (attempt - 1)))))
+
+            queue: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+            done = 0
+
+            async def worker() -> None:
+                nonlocal done
+                while True:
+                    batch = await queue.get()
+                    if batch is None:
+                        return
+                    try:
+                        results = await gateway.send_batch(batch)
+                    except Exception as e:
+                        results = [{"id": message["id"], "status": RETRY, "error": repr(e)} for message in batch]
+                    # 결과 기록(SQLite)은 스레드에서 처리해 다른 배치 전송을 막지 않음
+                    await asyncio.to_thread(store.record_results, job_id, results)
+                    done += len(batch)
+                    if on_progress is not None:
+                        on_progress(attempt + 1, done, len(pending))
+
+            async def produce() -> None:
+                for start in range(0, len(pending), batch_size):
+                    await queue.put([
+                        {"id": str(seq), "idempotency_key": f"{key_prefix}-{seq}", "to": phone, **payloads[message_idx]}
+                        for seq, phone, message_idx in pending[start:start + batch_size]
+                    ])
+                for _ in range(max_in_flight):
+                    await queue.put(None)
+
+            tasks = [asyncio.create_task(produce())] + [asyncio.create_task(worker()) for _ in range(max_in_flight)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # 저장 오류 등으로 중단되면 남은 작업 정리 (대기 중인 수신자는 다음 실행에서 이어서 보냄)
+                for task in tasks:
+                    task.cancel()
+
+    store.finish_job(job_id, max_attempts)
+    return store.summary(job_id)
+
+
+def run_dispatch(gateway, store: DispatchStore, job_id: int, **options) -> Dict:
+    """dispatch_job을 새 이벤트 루프에서 실행 (Streamlit 스크립트·명령행용 동기 진입점)"""
+    started = time.perf_counter()
+    summary = asyncio.run(dispatch_job(gateway, store, job_id, **options))
+    summary["elapsed_s"] = time.perf_counter() - started
+    return summary
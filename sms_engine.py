@@ -0,0 +1,893 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+from resilience import BATCH, APIGuard, DeadlineExceeded, current_schedule, estimate_tokens, is_service_unavailable, scheduling
+from sms_cache import SMSCache, make_cache_key
+from sms_templates import render_template
+from sms_validator import classify_by_bytes, correction_message, sms_byte_length, validate_sms
+from static_data import CATEGORY_ELEMENTS, EXAMPLE_TEMPLATES, LENGTH_GUIDES, STYLE_GUIDES, TONE_GUIDES
+from telemetry import LatencyHistogram, Telemetry, add_to_trace, new_trace, record_usage
+
+# openai는 불러오는 데 오래 걸리므로 타입 표시에만 사용 (클라이언트는 openai_client에서 처음 필요할 때 생성)
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# ───────────── 문자 생성 프롬프트 ─────────────
+# 문자 생성 모델 설정 (캐시 키에도 포함)
+MODEL_NAME = "gpt-4o-mini"
+TEMPERATURE = 0.7
+
+# 검증에 실패한 항목만 고쳐 달라고 다시 요청하는 최대 횟수
+MAX_CORRECTION_ROUNDS = 1
+
+# 길이 옵션별 생성 예산: 최대 출력 토큰(한글 약 1토큰/자, 길이 기준의 약 2배),
+# 재시도·수정 요청까지 포함한 전체 마감 시간(초), 모델 등급.
+# 짧은 문자는 빠른 모델로, 구성과 문장 흐름이 중요한 긴 안내문은 상위 모델로 생성
+MODEL_TIERS = {"fast": MODEL_NAME, "quality": "gpt-4o"}
+GENERATION_BUDGETS = {
+    "매우 짧게": {"max_tokens": 80, "deadline_s": 10.0, "tier": "fast"},
+    "짧게": {"max_tokens": 120, "deadline_s": 12.0, "tier": "fast"},
+    "표준": {"max_tokens": 200, "deadline_s": 15.0, "tier": "fast"},
+    "길게": {"max_tokens": 300, "deadline_s": 20.0, "tier": "quality"},
+    "매우 길게": {"max_tokens": 450, "deadline_s": 25.0, "tier": "quality"}
+}
+
+# 헤지 요청: 길이 옵션별 최근 응답 시간의 p95를 넘기면 같은 요청을 한 번 더 보냄
+HEDGE_QUANTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_S = 0.5
+
+
+def generation_budget(length_option: Optional[str]) -> Dict:
+    """길이 옵션의 생성 예산 (max_tokens, deadline_s, tier, model). 모르는 옵션은 '표준'"""
+    budget = GENERATION_BUDGETS.get(length_option, GENERATION_BUDGETS["표준"])
+    return {**budget, "model": MODEL_TIERS[budget["tier"]]}
+
+
+def classify_sms(sms: str) -> str:
+    """문자 유형 (통신사 기준 90바이트 이하 단문, 초과 장문)"""
+    return classify_by_bytes(sms_byte_length(sms))
+
+
+def _guide_table(title: str, guides: Dict[str, str]) -> str:
+    return f"[{title}]\n" + "\n".join(f"- {key}: {value}" for key, value in guides.items())
+
+
+# 모든 요청이 같은 앞부분(시스템 메시지)으로 시작하도록 고정 지침을 모듈 로드 시 한 번만 구성.
+# 요청마다 달라지는 값은 마지막 사용자 메시지에만 넣어 제공자의 프롬프트 캐시가 적용되게 함
+SYSTEM_PROMPT = "\n\n".join([
+    "당신은 학교 행정 업무를 돕는 전문가입니다. 간결하고 명확한 문자 메시지를 작성합니다.",
+    """작성 지침:
+1. 요청의 대상, 카테고리, 길이, 스타일에 해당하는 아래 가이드를 따릅니다.
+2. 카테고리별 필수 포함 요소를 빠짐없이 담습니다.
+3. 명확하고 구체적인 정보 전달
+4. 불필요한 미사나 수식어 제외
+5. 모든 대상에게 존댓말 사용
+6. 문자 메시지만 작성하고, 다른 설명은 포함하지 마세요.""",
+    _guide_table("대상별 톤", TONE_GUIDES),
+    _guide_table("카테고리별 필수 포함 요소", CATEGORY_ELEMENTS),
+    _guide_table("길이", LENGTH_GUIDES),
+    _guide_table("스타일", STYLE_GUIDES),
+    "[문체 참고 예시]\n" + "\n".join(
+        f"- {target}/{category}: {example}"
+        for target, examples in EXAMPLE_TEMPLATES.items()
+        for category, example in examples.items()
+    )
+])
+
+USER_PROMPT_TEMPLATE = """학교에서 발송하는 문자 메시지를 작성해주세요.
+
+적용할 가이드:
+- 톤: {tone}
+- 필수 포함 요소: {elements}
+- 길이: {length}
+- 스타일: {style}
+
+대상: {target}
+카테고리: {category}
+학교명: {school}
+날짜/시간: {date}
+주요 내용: {content_details}
+
+추가 정보:
+{additional}"""
+
+
+# 프롬프트 문구가 바뀌면 이전 프롬프트로 만든 캐시를 쓰지 않도록 캐시 키에 포함
+PROMPT_FINGERPRINT = make_cache_key(system=SYSTEM_PROMPT, user=USER_PROMPT_TEMPLATE)[:12]
+
+
+def build_sms_messages(
+    target: str,
+    category: str,
+    content_details: str,
+    date: str,
+    school: str,
+    additional_info: Dict[str, str],
+    tone_guide: str = "",
+    length_option: str = "표준",
+    style_option: str = "기본"
+) -> List[Dict[str, str]]:
+    """문자 생성 요청에 보낼 대화 메시지 구성 (고정 지침 → 요청별 입력 순서)"""
+    additional_lines = [f"- {key}: {value}" for key, value in additional_info.items() if value]
+    prompt = USER_PROMPT_TEMPLATE.format(
+        tone=TONE_GUIDES.get(target, tone_guide),
+        elements=CATEGORY_ELEMENTS.get(category, "핵심 정보"),
+        length=LENGTH_GUIDES.get(length_option, "80자 내외"),
+        style=STYLE_GUIDES.get(style_option, "표준적인 문체"),
+        target=target,
+        category=category,
+        school=school,
+        date=date,
+        content_details=content_details,
+        additional="\n".join(additional_lines) if additional_lines else "없음"
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# ───────────── OpenAI 문자 생성 함수 ─────────────
+class PromptUsage:
+    """응답별 토큰 사용량 누적 (제공자 프롬프트 캐시에서 처리된 입력 토큰 포함)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, usage) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.cached_tokens += (getattr(details, "cached_tokens", None) or 0) if details else 0
+            self.completion_tokens += usage.completion_tokens or 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+            }
+
+
+# 프로세스 전체 사용량 (화면과 명령행 도구가 함께 사용)
+prompt_usage = PromptUsage()
+
+# 길이 옵션별 API 응답 시간 (헤지 기준 계산, 프로세스 전체)
+latency_histogram = LatencyHistogram()
+
+# 헤지 요청용 작업자 (취소된 요청은 첫 응답 조각을 받는 즉시 연결을 닫고 끝남)
+_hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="sms-hedge")
+
+
+def _scheduling_for(request: Dict, priority: Optional[str] = None):
+    """호출자가 스케줄링 단위를 정하지 않았으면 요청의 학교별로 나눠 API 호출 차례를 받음"""
+    return scheduling(tenant=current_schedule()[0] or request["school"], priority=priority)
+
+
+def _sms_cache_key(**request) -> str:
+    """요청 입력값에 모델 설정과 프롬프트 버전을 더한 캐시 키"""
+    model = generation_budget(request.get("length_option"))["model"]
+    return make_cache_key(**request, model=model, temperature=TEMPERATURE, prompt=PROMPT_FINGERPRINT)
+
+
+def _create_completion(
+    client: OpenAI,
+    guard: Optional[APIGuard],
+    trace: Optional[Dict] = None,
+    deadline: Optional[float] = None,
+    **params
+):
+    """API 호출 (guard가 있으면 속도 제한·재시도·회로 차단기 적용, trace가 있으면 계측)
+
+    deadline(time.monotonic 기준)을 넘기면 남은 시간을 요청 타임아웃으로 씁니다.
+    """
+    add_to_trace(trace, api_calls=1)
+
+    def create():
+        if deadline is None:
+            return client.chat.completions.create(**params)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("생성 마감 시간이 지났습니다")
+        return client.chat.completions.create(**params, timeout=remaining)
+
+    if guard is None:
+        response = create()
+    else:
+        response = guard.call(
+            create,
+            estimated_tokens=estimate_tokens(params["messages"], params["max_tokens"] * params.get("n", 1)),
+            trace=trace,
+            deadline=deadline
+        )
+    # 스트리밍 응답의 사용량은 마지막 조각에 담겨 옴
+    if not params.get("stream"):
+        prompt_usage.record(getattr(response, "usage", None))
+        record_usage(trace, params["model"], getattr(response, "usage", None))
+    return response
+
+
+def _complete_text(
+    client: OpenAI,
+    guard: Optional[APIGuard],
+    trace: Optional[Dict],
+    deadline: Optional[float],
+    latency_key: str,
+    **params
+) -> str:
+    """응답 하나를 받아 문자열로 반환하고 응답 시간을 latency_key별 분포에 기록"""
+    started = time.perf_counter()
+    response = _create_completion(client, guard, trace, deadline=deadline, **params)
+    latency_histogram.observe(latency_key, time.perf_counter() - started)
+    return response.choices[0].message.content.strip()
+
+
+def _stream_text(
+    client: OpenAI,
+    guard: Optional[APIGuard],
+    trace: Optional[Dict],
+    deadline: Optional[float],
+    latency_key: str,
+    cancel: threading.Event,
+    **params
+) -> Optional[str]:
+    """스트리밍으로 응답 전체를 받아 반환. cancel이 설정되면 연결을 닫아 생성을 멈추고 None"""
+    started = time.perf_counter()
+    stream = _create_completion(
+        client, guard, trace, deadline=deadline, stream=True, stream_options={"include_usage": True}, **params
+    )
+    parts = []
+    try:
+        for chunk in stream:
+            if cancel.is_set():
+                return None
+            if chunk.usage is not None:
+                prompt_usage.record(chunk.usage)
+                record_usage(trace, params["model"], chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            if deadline is not None and time.monotonic() > deadline:
+                raise DeadlineExceeded("생성 마감 시간이 지났습니다")
+    finally:
+        stream.close()
+    latency_histogram.observe(latency_key, time.perf_counter() - started)
+    return "".join(parts).strip()
+
+
+def hedge_delay(length_option: str) -> Optional[float]:
+    """헤지 요청을 보낼 대기 시간 (해당 길이 옵션 측정값이 부족하면 None)"""
+    p95 = latency_histogram.quantile(length_option, HEDGE_QUANTILE, min_samples=HEDGE_MIN_SAMPLES)
+    return None if p95 is None else max(HEDGE_MIN_DELAY_S, p95)
+
+
+def _hedged_text(
+    client: OpenAI,
+    guard: Optional[APIGuard],
+    trace: Optional[Dict],
+    deadline: Optional[float],
+    latency_key: str,
+    hedge_after: float,
+    **params
+) -> str:
+    """hedge_after초 안에 응답이 끝나지 않으면 같은 요청을 한 번 더 보내 먼저 끝난 응답을 씀
+
+    늦은 쪽은 다음 응답 조각을 받을 때 연결을 닫아 취소합니다. 한쪽이 실패하면 다른 쪽을 기다립니다.
+    """
+    cancel = threading.Event()
+    # 작업자 스레드에서도 같은 학교·우선순위로 스케줄링되도록 현재 설정을 복사해 실행
+    futures = [_hedge_executor.submit(
+        contextvars.copy_context().run, _stream_text, client, guard, trace, deadline, latency_key, cancel, **params
+    )]
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done and (deadline is None or time.monotonic() + HEDGE_MIN_DELAY_S < deadline):
+        add_to_trace(trace, hedges=1)
+        futures.append(_hedge_executor.submit(
+            contextvars.copy_context().run, _stream_text, client, guard, trace, deadline, latency_key, cancel, **params
+        ))
+
+    pending, error = set(futures), None
+    try:
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("생성 마감 시간이 지났습니다")
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+        raise error
+    finally:
+        cancel.set()
+
+
+def fallback_sms(
+    error: Exception,
+    target: str,
+    category: str,
+    school: str,
+    cache: Optional[SMSCache] = None,
+    cache_key: Optional[str] = None,
+    request: Optional[Dict] = None
+) -> Tuple[str, bool]:
+    """API 호출 실패 시 대체 결과: 캐시된 문자, 요청 값을 채운 템플릿 문자(request를 넘긴 경우), 오류 안내 순
+
+    캐시·템플릿 대체는 API가 느리거나 응답하지 않는 경우에만 하고, 인증 오류·잘못된 요청 등은
+    바로 오류 안내로 반환합니다 (설정 문제가 대체 결과에 가려지지 않도록).
+    """
+    if is_service_unavailable(error):
+        if cache is not None and cache_key is not None:
+            cached_sms = cache.get(cache_key)
+            if cached_sms is not None:
+                return cached_sms, True
+        
+        if request is not None:
+            template_sms = render_template(request)
+            if template_sms:
+                return template_sms, True
+    
+    message = f"문자 생성 중 오류가 발생했습니다: {str(error)}"
+    template = EXAMPLE_TEMPLATES.get(target, {}).get(category)
+    if template:
+        message += f"\n\n아래 예제 템플릿을 수정해 사용하세요:\n{template.replace('○○학교', school)}"
+    return message, False
+
+
+def correct_sms(
+    client: OpenAI,
+    sms: str,
+    request: Dict,
+    guard: Optional[APIGuard] = None,
+    cache: Optional[SMSCache] = None,
+    max_rounds: int = MAX_CORRECTION_ROUNDS,
+    trace: Optional[Dict] = None,
+    deadline: Optional[float] = None
+) -> Tuple[str, Dict]:
+    """로컬 검증에 실패한 항목만 고쳐 달라고 다시 요청하고 (문자, 검증 결과) 반환
+
+    수정 요청은 원래 대화에 생성된 문자와 실패 항목 지시문을 덧붙여 보내며,
+    수정본이 더 나아지지 않으면 원래 문자를 유지합니다. cache를 넘기면 수정본으로
+    캐시를 갱신합니다 (스트리밍으로 먼저 캐시된 문자용). deadline이 지나면 더 요청하지 않습니다.
+    """
+    budget = generation_budget(request.get("length_option"))
+    original = sms
+    report = validate_sms(sms, request)
+    for _ in range(max_rounds):
+        if report["ok"]:
+            break
+        messages = build_sms_messages(**request) + [
+            {"role": "assistant", "content": sms},
+            {"role": "user", "content": correction_message(report["issues"])}
+        ]
+        try:
+            response = _create_completion(
+                client,
+                guard,
+                trace,
+                deadline=deadline,
+                model=budget["model"],
+                messages=messages,
+                temperature=TEMPERATURE,
+                max_tokens=budget["max_tokens"]
+            )
+        except Exception:
+            break
+        corrected = response.choices[0].message.content.strip()
+        corrected_report = validate_sms(corrected, request)
+        if len(corrected_report["issues"]) >= len(report["issues"]):
+            break
+        sms, report = corrected, corrected_report
+    if cache is not None and sms != original:
+        cache.set(_sms_cache_key(**request), sms)
+    return sms, report
+
+
+def generate_ai_sms(
+    client: OpenAI,
+    target: str,
+    category: str,
+    content_details: str,
+    date: str,
+    school: str,
+    additional_info: Dict[str, str],
+    tone_guide: str = "",
+    length_option: str = "표준",
+    style_option: str = "기본",
+    cache: Optional[SMSCache] = None,
+    use_cache: bool = True,
+    guard: Optional[APIGuard] = None,
+    candidates: int = 1,
+    validate: bool = True,
+    telemetry: Optional[Telemetry] = None,
+    queued_at: Optional[float] = None,
+    hedge: bool = True
+) -> Tuple[Union[str, List[str]], bool]:
+    """생성형 AI를 활용한 세계교육 표준
+    
+    candidates가 2 이상이면 한 번의 API 호출(n 파라미터)로 여러 후보를 받아
+    문자 목록을 반환합니다. validate가 True이면 단일 문자는 로컬 검증에 실패한
+    항목만 한 번 더 요청해 고친 뒤 캐시합니다. telemetry를 넘기면 호출 하나를
+    계측 기록으로 남깁니다 (queued_at은 작업 대기열에 넣은 시각).
+    
+    최대 토큰·마감 시간·모델은 길이 옵션의 생성 예산을 따르며, 마감 시간이 지나면
+    대체 결과를 반환합니다. hedge가 True이면 단일 문자 요청이 최근 p95 응답 시간을 넘길 때
+    같은 요청을 한 번 더 보내 먼저 끝난 응답을 씁니다.
+    """
+    
+    request = {
+        "target": target,
+        "category": category,
+        "content_details": content_details,
+        "date": date,
+        "school": school,
+        "additional_info": additional_info,
+        "tone_guide": tone_guide,
+        "length_option": length_option,
+        "style_option": style_option
+    }
+    trace = None
+    if telemetry is not None:
+        trace = new_trace(request, "candidates" if candidates > 1 else "single", queued_at)
+    with _scheduling_for(request):
+        sms, success, outcome = _generate_ai_sms(client, request, cache, use_cache, guard, candidates, validate, trace, hedge)
+    if telemetry is not None:
+        trace["cache_hit"] = outcome == "cache_hit"
+        telemetry.finish(trace, outcome)
+    return sms, success
+
+
+def _generate_ai_sms(
+    client: OpenAI,
+    request: Dict,
+    cache: Optional[SMSCache],
+    use_cache: bool,
+    guard: Optional[APIGuard],
+    candidates: int,
+    validate: bool,
+    trace: Optional[Dict],
+    hedge: bool = True
+) -> Tuple[Union[str, List[str]], bool, str]:
+    """generate_ai_sms 본체. (문자, 성공 여부, 계측용 결과 구분) 반환"""
+    # 동일한 요청은 캐시에서 바로 반환 (use_cache=False면 새로 생성 후 캐시 갱신)
+    # 후보 목록은 JSON 문자열로 캐시
+    cache_key = None
+    if cache is not None:
+        if candidates > 1:
+            cache_key = _sms_cache_key(**request, candidates=candidates)
+        else:
+            cache_key = _sms_cache_key(**request)
+        if use_cache:
+            cached_sms = cache.get(cache_key)
+            if cached_sms is not None:
+                return (json.loads(cached_sms) if candidates > 1 else cached_sms), True, "cache_hit"
+
+    budget = generation_budget(request["length_option"])
+    deadline = time.monotonic() + budget["deadline_s"]
+    params = {
+        "model": budget["model"],
+        "messages": build_sms_messages(**request),
+        "temperature": TEMPERATURE,
+        "max_tokens": budget["max_tokens"]
+    }
+    try:
+        if candidates > 1:
+            response = _create_completion(client, guard, trace, deadline=deadline, n=candidates, **params)
+            # 같은 문장이 여러 번 나오면 하나만 남김
+            sms_list = list(dict.fromkeys(choice.message.content.strip() for choice in response.choices))
+            if cache_key is not None:
+                cache.set(cache_key, json.dumps(sms_list, ensure_ascii=False))
+            return sms_list, True, "ok"
+        
+        hedge_after = hedge_delay(request["length_option"]) if hedge else None
+        if hedge_after is None:
+            sms = _complete_text(client, guard, trace, deadline, request["length_option"], **params)
+        else:
+            sms = _hedged_text(client, guard, trace, deadline, request["length_option"], hedge_after, **params)
+        if validate:
+            sms, _ = correct_sms(client, sms, request, guard=guard, trace=trace, deadline=deadline)
+        if cache_key is not None:
+            cache.set(cache_key, sms)
+        return sms, True, "ok"
+        
+    except Exception as e:
+        sms, success = fallback_sms(
+            e, request["target"], request["category"], request["school"], cache=cache, cache_key=cache_key,
+            request=request
+        )
+        if not success:
+            return sms, False, "error"
+        if candidates > 1:
+            # 캐시된 후보 목록(JSON)이 없으면 템플릿 문자 하나
+            sms = json.loads(sms) if cache is not None and cache.get(cache_key) == sms else [sms]
+        return sms, True, "fallback"
+
+
+def stream_ai_sms(
+    client: OpenAI,
+    target: str,
+    category: str,
+    content_details: str,
+    date: str,
+    school: str,
+    additional_info: Dict[str, str],
+    tone_guide: str = "",
+    length_option: str = "표준",
+    style_option: str = "기본",
+    cache: Optional[SMSCache] = None,
+    use_cache: bool = True,
+    guard: Optional[APIGuard] = None,
+    telemetry: Optional[Telemetry] = None,
+    queued_at: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> Iterator[str]:
+    """generate_ai_sms의 스트리밍 버전. 생성되는 문자 조각을 도착하는 대로 반환
+    
+    오류는 예외로 전달되며(fallback_sms로 대체 결과 구성), 중간에 close()하면
+    진행 중인 응답 스트림도 닫힙니다. 계측 기록에는 첫 조각까지의 시간(TTFT)이 남습니다.
+    deadline(time.monotonic 기준)을 넘기면 길이 옵션의 예산 대신 그 마감 시간을 씁니다
+    (받은 뒤 수정 요청까지 같은 마감 시간 안에서 하도록).
+    """
+    
+    request = {
+        "target": target,
+        "category": category,
+        "content_details": content_details,
+        "date": date,
+        "school": school,
+        "additional_info": additional_info,
+        "tone_guide": tone_guide,
+        "length_option": length_option,
+        "style_option": style_option
+    }
+    trace = new_trace(request, "stream", queued_at) if telemetry is not None else None
+    
+    def finish(outcome: str) -> None:
+        if telemetry is not None:
+            trace["cache_hit"] = outcome == "cache_hit"
+            telemetry.finish(trace, outcome)
+    
+    cache_key = None
+    if cache is not None:
+        cache_key = _sms_cache_key(**request)
+        if use_cache:
+            cached_sms = cache.get(cache_key)
+            if cached_sms is not None:
+                finish("cache_hit")
+                yield cached_sms
+                return
+    
+    budget = generation_budget(length_option)
+    if deadline is None:
+        deadline = time.monotonic() + budget["deadline_s"]
+    try:
+        with _scheduling_for(request):
+            stream = _create_completion(
+                client,
+                guard,
+                trace,
+                deadline=deadline,
+                model=budget["model"],
+                messages=build_sms_messages(**request),
+                temperature=TEMPERATURE,
+                max_tokens=budget["max_tokens"],
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+    except Exception as e:
+        # 다시 생성 중 API가 응답하지 않으면 이전에 캐시된 문자로 대체
+        cached_sms = cache.get(cache_key) if cache_key is not None and is_service_unavailable(e) else None
+        if cached_sms is None:
+            finish("error")
+            raise
+        finish("fallback")
+        yield cached_sms
+        return
+    parts = []
+    completed = False
+    try:
+        for chunk in stream:
+            if chunk.usage is not None:
+                prompt_usage.record(chunk.usage)
+                record_usage(trace, budget["model"], chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                if trace is not None and trace["ttft_s"] is None:
+                    trace["ttft_s"] = time.perf_counter() - trace["started"]
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+            if time.monotonic() > deadline:
+                raise DeadlineExceeded("생성 마감 시간이 지났습니다")
+        completed = True
+    except Exception:
+        finish("error")
+        raise
+    finally:
+        # 입력 변경으로 화면이 다시 실행되어 중단된 경우에도 연결 정리
+        stream.close()
+        if not completed:
+            finish("cancelled")
+    
+    # 끝까지 받은 경우에만 캐시에 저장
+    if cache_key is not None:
+        cache.set(cache_key, "".join(parts).strip())
+    finish("ok")
+
+
+# 일괄 생성 시 동시에 보내는 API 요청 수 기본 상한
+BATCH_MAX_CONCURRENCY = 4
+
+
+def generate_batch_sms(
+    client: OpenAI,
+    requests: List[Dict],
+    max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> Iterator[Tuple[int, str, bool]]:
+    """여러 문자 생성 요청을 동시에 처리하고 완료되는 순서대로 (요청 번호, 문자, 성공 여부) 반환
+
+    API 호출은 일괄 생성 우선순위로 스케줄링되어 화면에서 기다리는 단일 생성에 차례를 양보합니다.
+    """
+    
+    workers = max(1, min(max_concurrency, len(requests)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sms-batch")
+    try:
+        with scheduling(priority=BATCH):
+            futures = {
+                executor.submit(
+                    contextvars.copy_context().run, generate_ai_sms, client=client, queued_at=time.perf_counter(), **kwargs
+                ): idx
+                for idx, kwargs in enumerate(requests)
+            }
+        for future in as_completed(futures):
+            sms, success = future.result()
+            yield futures[future], sms, success
+    finally:
+        # 화면 재실행 등으로 중단되면 아직 시작하지 않은 요청은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ───────────── 시나리오 대상 묶음 생성 (한 번의 요청으로 모든 대상, JSON 구조화 출력) ─────────────
+MULTI_TARGET_PROMPT_TEMPLATE = """같은 내용을 아래 대상별로 각각 학교 문자 메시지로 작성해주세요.
+
+적용할 가이드:
+- 대상별 톤:
+{tones}
+- 필수 포함 요소: {elements}
+- 길이: 대상별 문자 각각 {length}
+- 스타일: {style}
+
+대상: {targets}
+카테고리: {category}
+학교명: {school}
+날짜/시간: {date}
+주요 내용: {content_details}
+
+추가 정보:
+{additional}
+
+대상 이름을 키로, 그 대상에게 보낼 문자 메시지를 값으로 하는 JSON 객체로만 답하세요."""
+
+
+def build_multi_target_messages(
+    targets: List[str],
+    category: str,
+    content_details: str,
+    date: str,
+    school: str,
+    additional_info: Dict[str, str],
+    length_option: str = "표준",
+    style_option: str = "기본"
+) -> List[Dict[str, str]]:
+    """여러 대상의 문자를 한 번에 요청하는 대화 메시지 (시스템 지침은 단일 생성과 같아 프롬프트 캐시 공유)"""
+    additional_lines = [f"- {key}: {value}" for key, value in additional_info.items() if value]
+    prompt = MULTI_TARGET_PROMPT_TEMPLATE.format(
+        tones="\n".join(f"  - {target}: {TONE_GUIDES.get(target, '정중한 존댓말')}" for target in targets),
+        elements=CATEGORY_ELEMENTS.get(category, "핵심 정보"),
+        length=LENGTH_GUIDES.get(length_option, "80자 내외"),
+        style=STYLE_GUIDES.get(style_option, "표준적인 문체"),
+        targets=", ".join(targets),
+        category=category,
+        school=school,
+        date=date,
+        content_details=content_details,
+        additional="\n".join(additional_lines) if additional_lines else "없음"
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def multi_target_response_format(targets: List[str]) -> Dict:
+    """대상마다 문자열 필드 하나를 갖는 JSON 스키마 (structured outputs)"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "scenario_sms",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {target: {"type": "string"} for target in targets},
+                "required": list(targets),
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def parse_multi_target_reply(reply: Optional[str], targets: List[str]) -> Dict[str, str]:
+    """응답 JSON에서 대상별 문자만 추림 (형식이 틀렸거나 비어 있는 대상은 빠짐)"""
+    try:
+        data = json.loads(reply or "")
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        target: data[target].strip()
+        for target in targets
+        if isinstance(data.get(target), str) and data[target].strip()
+    }
+
+
+def generate_multi_target_sms(
+    client: OpenAI,
+    requests: List[Dict],
+    max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> Iterator[Tuple[int, str, bool]]:
+    """대상만 다른 요청들을 한 번의 API 호출로 생성하고 (요청 번호, 문자, 성공 여부) 반환
+
+    requests는 generate_batch_sms와 같은 형식이며 대상 외 입력은 첫 요청 값을 씁니다.
+    캐시에 있는 대상은 바로 반환하고, 응답에 빠졌거나 형식이 틀린 대상, validate가 True일 때
+    수정 요청 후에도 검증에 실패한 대상은 대상별 호출로 다시 생성합니다. 대상별 결과는 단일
+    생성과 같은 캐시 키로 저장합니다.
+    """
+    first = requests[0]
+    cache, guard, telemetry = first.get("cache"), first.get("guard"), first.get("telemetry")
+    use_cache, validate = first.get("use_cache", True), first.get("validate", True)
+    target_requests = [
+        {
+            "target": kwargs["target"],
+            "category": first["category"],
+            "content_details": first["content_details"],
+            "date": first["date"],
+            "school": first["school"],
+            "additional_info": first["additional_info"],
+            "tone_guide": kwargs.get("tone_guide", ""),
+            "length_option": first.get("length_option", "표준"),
+            "style_option": first.get("style_option", "기본")
+        }
+        for kwargs in requests
+    ]
+
+    pending = []
+    for idx, request in enumerate(target_requests):
+        cached_sms = cache.get(_sms_cache_key(**request)) if cache is not None and use_cache else None
+        if cached_sms is not None:
+            yield idx, cached_sms, True
+        else:
+            pending.append(idx)
+
+    # 남은 대상이 하나면 단일 생성과 같음
+    if len(pending) == 1:
+        with scheduling(priority=BATCH):
+            sms, success = generate_ai_sms(client=client, **requests[pending[0]])
+        yield pending[0], sms, success
+        return
+
+    targets = [target_requests[idx]["target"] for idx in pending]
+    trace = None
+    if telemetry is not None and pending:
+        trace = new_trace(dict(target_requests[0], target="+".join(targets)), "multi_target", first.get("queued_at"))
+    budget = generation_budget(target_requests[0]["length_option"])
+    # 묶음 요청과 대상별 수정 요청이 같은 마감 시간과 계측 기록을 씀
+    deadline = time.monotonic() + budget["deadline_s"]
+    replies: Dict[str, str] = {}
+    retry = []
+    outcome = "error"
+    try:
+        if pending:
+            try:
+                with _scheduling_for(target_requests[0], BATCH):
+                    response = _create_completion(
+                        client,
+                        guard,
+                        trace,
+                        deadline=deadline,
+                        model=budget["model"],
+                        messages=build_multi_target_messages(
+                            targets,
+                            **{key: value for key, value in target_requests[0].items() if key not in ("target", "tone_guide")}
+                        ),
+                        temperature=TEMPERATURE,
+                        max_tokens=budget["max_tokens"] * len(targets),
+                        response_format=multi_target_response_format(targets)
+                    )
+                replies = parse_multi_target_reply(response.choices[0].message.content, targets)
+                outcome = "ok"
+            except Exception:
+                pass
+
+        for idx in pending:
+            request = target_requests[idx]
+            sms = replies.get(request["target"])
+            if sms is not None and validate:
+                with _scheduling_for(request, BATCH):
+                    sms, report = correct_sms(client, sms, request, guard=guard, trace=trace, deadline=deadline)
+                # 수정 후에도 검증에 실패하면 응답에 빠진 대상처럼 다시 생성
+                if not report["ok"]:
+                    sms = None
+            if sms is None:
+                retry.append(idx)
+                continue
+            if cache is not None:
+                cache.set(_sms_cache_key(**request), sms)
+            yield idx, sms, True
+        if retry and outcome == "ok":
+            outcome = "partial"
+    finally:
+        if trace is not None:
+            telemetry.finish(trace, outcome)
+
+    # 응답에 없거나, 형식이 틀렸거나, 고쳐도 검증에 실패한 대상은 대상별 호출로 대체 (캐시는 이미 확인했으므로 건너뜀)
+    if retry:
+        for retry_idx, sms, success in generate_batch_sms(
+            client, [dict(requests[idx], use_cache=False) for idx in retry], max_concurrency=max_concurrency
+        ):
+            yield retry[retry_idx], sms, success
+
+# ───────────── 여러 학교 동시 발송 (한 번 생성 후 학교명만 치환) ─────────────
+# 예제 템플릿에 쓰인 표기와 같아 모델이 문자에 그대로 옮겨 적음
+SCHOOL_PLACEHOLDER = "○○학교"
+
+
+def localize_sms(sms: str, school: str, placeholder: str = SCHOOL_PLACEHOLDER) -> str:
+    """자리 표시자를 학교명으로 바꿈 (자리 표시자가 빠진 문자는 앞에 [학교명]을 붙임)"""
+    if placeholder in sms:
+        return sms.replace(placeholder, school)
+    return f"[{school}] {sms}"
+
+
+def fan_out_schools(results: List[Tuple[Dict, str]], schools: List[str]) -> List[Dict]:
+    """자리 표시자로 생성한 (요청, 문자) 목록을 학교별 문자로 펼친 표 행 목록
+
+    학교명 길이에 따라 글자·바이트 수가 달라지므로 학교마다 다시 검증해 문제를 issues에 적습니다.
+    행은 생성 이력 저장 형식과 같은 키를 씁니다.
+    """
+    rows = []
+    for school in schools:
+        for request, sms in results:
+            message = localize_sms(sms, school)
+            report = validate_sms(message, dict(request, school=school))
+            rows.append({
+                "school": school,
+                "target": request["target"],
+                "category": request["category"],
+                "content": message,
+                "length": len(message),
+                "byte_length": report["byte_length"],
+                "sms_type": report["sms_type"],
+                "issues": " / ".join(issue["message"] for issue in report["issues"]),
+                "style": request.get("style_option", "기본"),
+                "length_option": request.get("length_option", "표준")
+            })
+    return rows
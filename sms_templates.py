@@ -0,0 +1,172 @@
+import re
+from typing import Dict, List, Optional
+
+from sms_validator import LENGTH_BUDGETS
+
+# ───────────── 슬롯 템플릿 (네트워크 호출 없이 즉시 작성) ─────────────
+# 재난·안전은 생성 요청 시 템플릿을 먼저 보여주고, API 오류 시에는 모든 카테고리에서 대체 결과로 사용
+TEMPLATE_FAST_PATH_CATEGORIES = ("재난", "안전")
+
+# 추가 정보 항목 이름(단일 생성·시나리오 일괄 생성 입력) → 슬롯 이름
+SLOT_FIELDS = {
+    "장소": "place",
+    "준비물": "prep",
+    "학년": "grade",
+    "집합 시간": "meet_time",
+    "행사명": "event",
+    "참가 대상": "participants",
+    "상담 유형": "consult_type",
+    "상담 기간": "period",
+    "신청 방법": "apply",
+    "기한": "deadline",
+    "위험 요소": "danger",
+    "주의 구역": "area",
+    "날씨 상황": "weather",
+    "주의 사항": "caution",
+    "재난 유형": "disaster",
+    "대응 방법": "response",
+    "문의처": "contact",
+    "참고 사항": "reference"
+}
+
+# 대상 × 카테고리별 문장 목록. 첫 문장(머리말)과 {content}는 항상 들어가고, 나머지 문장은
+# 슬롯 값이 모두 있을 때만 포함. {name?} 슬롯은 비어 있으면 그 자리만 비움.
+# 마지막 문장(맺음말)은 길이 기준을 넘으면 뺌
+SMS_TEMPLATES = {
+    "학부모": {
+        "안전": [
+            "[{school}] {date?} 안전 안내드립니다.", "{content}", "{weather} 예보가 있어 각별한 주의가 필요합니다.",
+            "위험 요소: {danger}.", "주의 구역: {area}.", "주의 사항: {caution}.",
+            "가정에서도 자녀 안전 지도 부탁드립니다."
+        ],
+        "재난": [
+            "[{school}] {date?} {disaster?} 긴급 안내드립니다.", "{content}", "대응 방법: {response}.",
+            "자녀가 안전 수칙을 지킬 수 있도록 지도 부탁드립니다."
+        ],
+        "체험학습": [
+            "[{school}] {grade?} {date?} {place?} 현장체험학습 안내입니다.", "{content}", "집합 시간: {meet_time}.",
+            "준비물: {prep}.", "안전한 체험학습이 되도록 협조 부탁드립니다."
+        ],
+        "행사 안내": [
+            "[{school}] {date?} {event?} 행사 안내드립니다.", "{content}", "장소: {place}.",
+            "참가 대상: {participants}.", "많은 관심과 참여 부탁드립니다."
+        ],
+        "상담": [
+            "[{school}] {date?} 상담 안내드립니다.", "{content}", "상담 유형: {consult_type}.", "상담 기간: {period}.",
+            "신청 방법: {apply}.", "신청 기한: {deadline}.", "많은 신청 바랍니다."
+        ],
+        "안내": [
+            "[{school}] {date?} 안내드립니다.", "{content}", "참고 사항: {reference}.", "문의: {contact}.",
+            "감사합니다."
+        ]
+    },
+    "학생": {
+        "안전": [
+            "[{school}] {date?} 학생 여러분께 안전 안내입니다.", "{content}", "{weather} 예보가 있으니 조심하세요.",
+            "위험 요소: {danger}.", "주의 구역: {area}.", "주의 사항: {caution}.", "모두 안전에 유의하세요."
+        ],
+        "재난": [
+            "[{school}] {date?} {disaster?} 긴급 안내입니다.", "{content}", "대응 방법: {response}.",
+            "선생님 안내에 따라 침착하게 행동하세요."
+        ],
+        "체험학습": [
+            "[{school}] {grade?} {date?} {place?} 현장체험학습 안내입니다.", "{content}", "집합 시간: {meet_time}.",
+            "준비물: {prep}.", "안전 수칙을 잘 지켜 주세요."
+        ],
+        "행사 안내": [
+            "[{school}] {date?} {event?} 행사 안내입니다.", "{content}", "장소: {place}.",
+            "참가 대상: {participants}.", "친구들과 함께 즐거운 시간 보내세요!"
+        ],
+        "상담": [
+            "[{school}] {date?} 상담 안내입니다.", "{content}", "상담 유형: {consult_type}.", "상담 기간: {period}.",
+            "신청 방법: {apply}.", "신청 기한: {deadline}.", "고민이 있으면 언제든 신청하세요."
+        ],
+        "안내": [
+            "[{school}] {date?} 안내입니다.", "{content}", "참고 사항: {reference}.", "문의: {contact}.",
+            "꼭 확인해 주세요."
+        ]
+    },
+    "교직원": {
+        "안전": [
+            "[{school}] {date?} 안전 지도 요청드립니다.", "{content}", "{weather} 예보.", "위험 요소: {danger}.",
+            "주의 구역: {area}.", "주의 사항: {caution}.", "담당 구역 안전 지도 부탁드립니다."
+        ],
+        "재난": [
+            "[{school}] {date?} {disaster?} 비상 대응 안내입니다.", "{content}", "대응 방법: {response}.",
+            "학생 안전 확인 후 결과 보고 부탁드립니다."
+        ],
+        "체험학습": [
+            "[{school}] {grade?} {date?} {place?} 현장체험학습 관련 안내입니다.", "{content}", "집합 시간: {meet_time}.",
+            "준비물: {prep}.", "인솔 교사는 학생 안전 관리 부탁드립니다."
+        ],
+        "행사 안내": [
+            "[{school}] {date?} {event?} 행사 운영 안내입니다.", "{content}", "장소: {place}.",
+            "참가 대상: {participants}.", "담당 업무 확인 후 준비 부탁드립니다."
+        ],
+        "상담": [
+            "[{school}] {date?} 상담 운영 안내입니다.", "{content}", "상담 유형: {consult_type}.", "상담 기간: {period}.",
+            "신청 방법: {apply}.", "신청 기한: {deadline}.", "상담 일정 확인 부탁드립니다."
+        ],
+        "안내": [
+            "[{school}] {date?} 업무 안내입니다.", "{content}", "참고 사항: {reference}.", "문의: {contact}.",
+            "확인 부탁드립니다."
+        ]
+    }
+}
+
+_SLOT = re.compile(r"\{(\w+)(\??)\}")
+_SENTENCE_END = re.compile(r"[.!?。]$")
+_EMPTY_BRACKET = re.compile(r"^\[\]\s*")
+
+
+def has_template(target: str, category: str) -> bool:
+    """대상·카테고리 조합의 템플릿 존재 여부"""
+    return category in SMS_TEMPLATES.get(target, {})
+
+
+def template_slots(request: Dict) -> Dict[str, str]:
+    """요청의 학교·날짜·주요 내용·추가 정보를 슬롯 값으로 변환"""
+    content = " ".join((request.get("content_details") or "").split())
+    if content and not _SENTENCE_END.search(content):
+        content += "."
+    slots = {
+        "school": request.get("school") or "",
+        "date": request.get("date") or "",
+        "content": content
+    }
+    for field, value in (request.get("additional_info") or {}).items():
+        if field in SLOT_FIELDS and value and str(value).strip():
+            slots[SLOT_FIELDS[field]] = " ".join(str(value).split())
+    return slots
+
+
+def _fill(sentence: str, slots: Dict[str, str]) -> Optional[str]:
+    """슬롯을 채운 문장 (필수 슬롯이 비어 있으면 None)"""
+    missing = []
+
+    def replace(match: re.Match) -> str:
+        value = slots.get(match.group(1), "")
+        if not value and not match.group(2):
+            missing.append(match.group(1))
+        return value
+
+    filled = _SLOT.sub(replace, sentence)
+    return None if missing else " ".join(filled.split())
+
+
+def render_template(request: Dict) -> Optional[str]:
+    """대상·카테고리 템플릿에 요청 값을 채운 완성 문자 (템플릿이 없으면 None)"""
+    sentences = SMS_TEMPLATES.get(request.get("target"), {}).get(request.get("category"))
+    if not sentences:
+        return None
+    slots = template_slots(request)
+    header, *body, closing = sentences
+    # 학교명이 비어 있으면 머리말의 "[]"도 뺌
+    parts: List[str] = [_EMPTY_BRACKET.sub("", _fill(header.replace("{school}", "{school?}"), slots))]
+    parts += [part for part in (_fill(sentence, slots) for sentence in body) if part]
+    message = " ".join(part for part in parts if part)
+
+    # 맺음말은 길이 기준 안에 들어갈 때만 붙임 (입력한 정보는 빼지 않음)
+    high = LENGTH_BUDGETS.get(request.get("length_option"), (0, None))[1]
+    with_closing = f"{message} {closing}"
+    return with_closing if high is None or len(with_closing) <= high else message
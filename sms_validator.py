@@ -0,0 +1,192 @@
+import re
+from typing import Dict, List, Optional
+
+# ───────────── 문자 검증 (바이트 수, 길이 예산, 필수 정보, 존댓말) ─────────────
+# 통신사는 글자 수가 아니라 바이트 수로 과금 (한글 2바이트, 영문·숫자 1바이트)
+SMS_BYTE_LIMIT = 90
+LMS_BYTE_LIMIT = 2000
+DEFAULT_ENCODING = "cp949"  # EUC-KR 확장. 완성형 한글 전체를 2바이트로 표현
+
+# 길이 옵션별 허용 글자 수 범위 ("이내"는 상한만, "내외"는 ±25%)
+LENGTH_BUDGETS = {
+    "매우 짧게": (0, 40),
+    "짧게": (0, 60),
+    "표준": (60, 100),
+    "길게": (90, 150),
+    "매우 길게": (135, 225)
+}
+
+# 반말 어미로 끝나는 문장 (명사형 종결 "안내.", "담당자" 등은 업무 문체로 허용)
+_SENTENCE_SPLIT = r"(?<=[.!?])\s+|\n+"
+_TRAILING = re.compile(r"[^\w]+$")
+_BANMAL_ENDING = re.compile(
+    r"(?:[한된있없했됐였겠온간준란]다|[아어여겨켜봐와해하]라|하자|해줘|챙겨|조심해|주의해|준비해|확인해|참고해"
+    r"|알아둬|하렴|거라|했니|하니|할까|거야|이야|잖아)$"
+)
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def sms_byte_length(sms: str, encoding: str = DEFAULT_ENCODING) -> int:
+    """통신사 과금 기준 바이트 수 (인코딩할 수 없는 이모지 등은 장문 전환을 고려해 4바이트로 계산)"""
+    try:
+        return len(sms.encode(encoding))
+    except UnicodeEncodeError:
+        total = 0
+        for ch in sms:
+            try:
+                total += len(ch.encode(encoding))
+            except UnicodeEncodeError:
+                total += 4
+        return total
+
+
+def unencodable_chars(sms: str, encoding: str = DEFAULT_ENCODING) -> List[str]:
+    """문자 전송 시 깨질 수 있는 글자 목록"""
+    try:
+        sms.encode(encoding)
+        return []
+    except UnicodeEncodeError:
+        pass
+    result = []
+    for ch in sms:
+        try:
+            ch.encode(encoding)
+        except UnicodeEncodeError:
+            if ch not in result:
+                result.append(ch)
+    return result
+
+
+def classify_by_bytes(byte_length: int) -> str:
+    """바이트 수 기준 문자 유형"""
+    return "단문(SMS)" if byte_length <= SMS_BYTE_LIMIT else "장문(LMS)"
+
+
+def banmal_sentences(sms: str) -> List[str]:
+    """존댓말이 아닌 것으로 보이는 문장 목록"""
+    return [sentence.strip() for sentence in re.split(_SENTENCE_SPLIT, sms) if _is_banmal(sentence)]
+
+
+def _is_banmal(sentence: str) -> bool:
+    # 끝의 문장부호·이모지를 떼고 어미만 확인
+    stripped = _TRAILING.sub("", sentence.strip())
+    return bool(_HANGUL.search(stripped) and _BANMAL_ENDING.search(stripped))
+
+
+def _required_items(request: Dict) -> List[str]:
+    """문자에 꼭 들어가야 하는 사용자 입력값 (추가 정보, 날짜)"""
+    items = [str(value).strip() for value in request.get("additional_info", {}).values() if value and str(value).strip()]
+    # "11월 15일 09:00"처럼 구체적인 날짜만 확인 ("이번 주 금요일" 등은 표현이 바뀔 수 있음)
+    date = re.match(r"(\d{1,2})월 (\d{1,2})일", (request.get("date") or "").strip())
+    if date:
+        items.append(f"{int(date.group(1))}월 {int(date.group(2))}일")
+    return items
+
+
+def _compact(text: str) -> str:
+    # 공백과 "03월"의 앞자리 0 차이는 무시
+    return re.sub(r"(?<!\d)0(?=\d)", "", re.sub(r"\s+", "", text))
+
+
+def _mentions(sms: str, item: str) -> bool:
+    """입력값이 문자에 들어 있는지 (쉼표로 나열한 값은 각 항목을 확인)"""
+    compact = _compact(sms)
+    parts = [part for part in re.split(r"[,、/]", item) if part.strip()]
+    return all(_compact(part) in compact for part in parts)
+
+
+def validate_sms(sms: str, request: Optional[Dict] = None, encoding: str = DEFAULT_ENCODING) -> Dict:
+    """생성된 문자를 로컬에서 검증하고 (바이트 수, 문자 유형, 문제 목록) 반환
+
+    각 문제에는 해당 부분만 고치도록 요청할 수정 지시문(instruction)이 들어 있습니다.
+    encoding 문제는 알림용이며 재요청 대상이 아닙니다.
+    """
+    request = request or {}
+    byte_length = sms_byte_length(sms, encoding)
+    issues = []
+
+    length_option = request.get("length_option")
+    if length_option in LENGTH_BUDGETS:
+        low, high = LENGTH_BUDGETS[length_option]
+        if len(sms) > high:
+            issues.append({
+                "kind": "length",
+                "message": f"'{length_option}' 기준({high}자)보다 깁니다: {len(sms)}자",
+                "instruction": f"내용은 유지하면서 {high}자 이내로 줄여주세요. (현재 {len(sms)}자)"
+            })
+        elif len(sms) < low:
+            issues.append({
+                "kind": "length",
+                "message": f"'{length_option}' 기준({low}자 이상)보다 짧습니다: {len(sms)}자",
+                "instruction": f"필요한 안내를 보충해 {low}자 이상 {high}자 이내로 작성해주세요. (현재 {len(sms)}자)"
+            })
+    # 짧은 문자를 요청했다면 단문(SMS) 요금 범위에 들어와야 함
+    if length_option in ("매우 짧게", "짧게") and byte_length > SMS_BYTE_LIMIT:
+        issues.append({
+            "kind": "length",
+            "message": f"단문(SMS) 기준 {SMS_BYTE_LIMIT}바이트를 넘어 장문(LMS)으로 발송됩니다: {byte_length}바이트",
+            "instruction": f"한글 1자는 2바이트입니다. 전체를 {SMS_BYTE_LIMIT}바이트(한글 약 {SMS_BYTE_LIMIT // 2}자) 이내로 줄여주세요."
+        })
+
+    missing = [item for item in _required_items(request) if not _mentions(sms, item)]
+    if missing:
+        issues.append({
+            "kind": "elements",
+            "message": f"입력한 정보가 빠졌습니다: {', '.join(missing)}",
+            "instruction": f"다음 정보를 그대로 포함해주세요: {', '.join(missing)}"
+        })
+
+    informal = banmal_sentences(sms)
+    if informal:
+        issues.append({
+            "kind": "honorific",
+            "message": f"존댓말이 아닌 문장이 있습니다: {' / '.join(informal)}",
+            "instruction": f"다음 문장을 존댓말로 바꿔주세요: {' / '.join(informal)}"
+        })
+
+    broken = unencodable_chars(sms, encoding)
+    if broken:
+        issues.append({
+            "kind": "encoding",
+            "message": f"일부 휴대폰에서 깨질 수 있는 문자가 있습니다: {' '.join(broken)}",
+            "instruction": ""
+        })
+
+    return {
+        "ok": not [issue for issue in issues if issue["kind"] != "encoding"],
+        "byte_length": byte_length,
+        "sms_type": classify_by_bytes(byte_length),
+        "issues": issues
+    }
+
+
+def correction_message(issues: List[Dict]) -> str:
+    """실패한 항목만 고치도록 하는 후속 지시문"""
+    lines = [f"- {issue['instruction']}" for issue in issues if issue["instruction"]]
+    return (
+        "방금 작성한 문자에서 아래 항목만 고쳐 전체 문자를 다시 작성해주세요.\n"
+        + "\n".join(lines)
+        + "\n나머지 내용과 표현은 그대로 유지하고, 문자 메시지만 작성하세요."
+    )
+
+
+def validate_history_frame(df, encoding: str = DEFAULT_ENCODING):
+    """이력 DataFrame 전체를 열 단위 연산으로 검증해 byte_length, sms_type, over_budget, informal 열 추가"""
+    result = df.copy()
+    content = result["content"].fillna("")
+
+    # 인코딩할 수 없는 글자는 replace 시 1바이트('?'), ignore 시 0바이트가 되므로 차이로 개수를 구함
+    replaced = content.str.encode(encoding, errors="replace").str.len()
+    ignored = content.str.encode(encoding, errors="ignore").str.len()
+    byte_length = ignored + (replaced - ignored) * 4
+    result["byte_length"] = byte_length
+    result["sms_type"] = (byte_length <= SMS_BYTE_LIMIT).map({True: "단문(SMS)", False: "장문(LMS)"})
+
+    lows = result["length_option"].map({option: low for option, (low, _) in LENGTH_BUDGETS.items()})
+    highs = result["length_option"].map({option: high for option, (_, high) in LENGTH_BUDGETS.items()})
+    chars = content.str.len()
+    result["over_budget"] = (chars > highs) | (chars < lows)
+
+    sentences = content.str.split(_SENTENCE_SPLIT, regex=True).explode()
+    result["informal"] = sentences.map(_is_banmal).groupby(level=0).any()
+    return result
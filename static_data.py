@@ -0,0 +1,77 @@
+# ───────────── 정적 데이터 (시나리오, 예제 문자, 프롬프트 가이드) ─────────────
+# 리터럴만 담아 .pyc에서 바로 불러오도록 import 없이 유지. 앱 시작 시 무거운 모듈을 불러오지 않고 사용
+
+# 일괄 생성을 위한 시나리오
+BATCH_SCENARIOS = {
+    "등하교 안전 안내": {
+        "category": "안전",
+        "targets": ["학부모", "학생", "교직원"],
+        "base_content": "우천 시 등하교 안전 주의"
+    },
+    "현장체험학습 안내": {
+        "category": "체험학습",
+        "targets": ["학부모", "학생"],
+        "base_content": "현장체험학습 실시 및 준비물 안내"
+    },
+    "학교 행사 안내": {
+        "category": "행사 안내",
+        "targets": ["학부모", "학생", "교직원"],
+        "base_content": "학교 행사 개최 안내"
+    },
+    "상담 주간 안내": {
+        "category": "상담",
+        "targets": ["학부모", "교직원"],
+        "base_content": "학부모 상담 주간 운영"
+    }
+}
+
+# 예제 문자 (프롬프트 문체 참고용, 바로 쓰는 슬롯 템플릿은 sms_templates)
+EXAMPLE_TEMPLATES = {
+    "학부모": {
+        "안전": "[○○학교] 11월 15일 등하교 시 교통안전 지도 부탁드립니다. 횡단보도에서 좌우를 확인하도록 가정에서도 지도 부탁드립니다.",
+        "체험학습": "[○○학교] 3학년 11월 20일 과학관 현장체험학습 안내입니다. 도시락, 물, 우산을 준비해 주세요. 참가 동의서는 11월 18일까지 제출 부탁드립니다."
+    },
+    "학생": {
+        "안전": "[○○학교] 내일 등교할 때 빗길에 미끄러지지 않도록 조심하세요. 우산을 꼭 챙기고, 천천히 걸어오세요.",
+        "행사 안내": "[○○학교] 11월 25일 오후 2시 운동장에서 가을 축제가 열립니다. 친구들과 함께 즐거운 시간 보내세요!"
+    },
+    "교직원": {
+        "안전": "[○○학교] 11월 15일 우천 시 등하교 안전 지도 철저히 부탁드립니다. 담당 구역 확인 후 배치 부탁드립니다.",
+        "행사 안내": "[○○학교] 11월 25일 14:00 가을축제 진행. 담당 부스 운영 교사는 13:30까지 준비 완료 부탁드립니다."
+    }
+}
+
+# 대상별 톤 가이드
+TONE_GUIDES = {
+    "학부모": "정중하고 상세하며 신뢰감을 주는 톤. 존댓말 사용. [학교명]으로 시작",
+    "학생": "친근하고 이해하기 쉬운 톤. 존댓말 사용. 학생들의 눈높이에 맞춘 표현",
+    "교직원": "간결하고 업무적이며 핵심만 전달하는 톤. 존댓말 사용. 담당 업무 명시"
+}
+
+# 카테고리별 포함 요소
+CATEGORY_ELEMENTS = {
+    "안전": "안전 주의사항, 구체적인 행동 지침",
+    "재난": "대응 방법, 비상 연락처, 준비물",
+    "체험학습": "일시, 장소, 준비물, 주의사항",
+    "행사 안내": "일시, 장소, 참여 방법, 준비사항",
+    "상담": "상담 일정, 신청 방법, 준비 서류",
+    "안내": "핵심 정보, 확인 사항, 문의처"
+}
+
+# 길이 옵션별 글자 수
+LENGTH_GUIDES = {
+    "매우 짧게": "40자 이내로 핵심만 간단히",
+    "짧게": "60자 이내로 간결하게",
+    "표준": "80자 내외로 적절하게",
+    "길게": "120자 내외로 상세하게",
+    "매우 길게": "180자 내외로 자세하게"
+}
+
+# 스타일 옵션별 가이드
+STYLE_GUIDES = {
+    "기본": "표준적이고 격식 있는 문체",
+    "친근함": "따뜻하고 친근한 문체, 이모티콘 포함 가능",
+    "긴급함": "긴급하고 단호한 문체, 중요 내용 강조",
+    "공식적": "매우 격식 있고 공식적인 문체",
+    "안내형": "차분하고 설명적인 문체, 단계별 안내"
+}
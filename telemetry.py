@@ -0,0 +1,279 @@
+import json
+import math
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# ───────────── API 호출 계측 (지연 시간, 토큰, 비용) ─────────────
+# 호출 기록에 붙는 태그 (관리 탭 그룹 기준, Prometheus 라벨)
+TAG_FIELDS = ("target", "category", "length_option", "style_option")
+TIMING_FIELDS = ("queue_wait_s", "schedule_wait_s", "rate_limit_wait_s", "ttft_s", "latency_s")
+OUTCOMES = ("ok", "cache_hit", "fallback", "error", "cancelled")
+QUANTILES = (50, 95, 99)
+DEFAULT_MAX_RECORDS = 10000
+# 응답 시간 히스토그램 구간 상한(초)과 키별로 보관하는 최근 측정값 수
+LATENCY_BUCKETS_S = (0.25, 0.5, 1.0, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 16.0, 24.0, 32.0)
+DEFAULT_LATENCY_WINDOW = 500
+# 계측 기록의 누적 필드를 더할 때 잡는 잠금 (add_to_trace)
+_trace_lock = threading.Lock()
+
+# 100만 토큰당 USD (입력, 캐시된 입력, 출력). 목록에 없는 모델은 비용 0으로 기록
+MODEL_PRICES_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00)
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """정렬된 값의 q 백분위수 (최근접 순위)"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def estimate_cost_usd(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """토큰 수로 계산한 예상 비용 (캐시된 입력 토큰은 할인 단가 적용)"""
+    input_price, cached_price, output_price = MODEL_PRICES_PER_MILLION.get(model, (0.0, 0.0, 0.0))
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+def new_trace(request: Dict, mode: str, queued_at: Optional[float] = None) -> Dict:
+    """호출 하나의 계측 기록 시작 (queued_at은 작업 대기열에 넣은 시각, time.perf_counter 기준)"""
+    started = time.perf_counter()
+    trace = {tag: request.get(tag) for tag in TAG_FIELDS}
+    trace.update({
+        "mode": mode,
+        "started": started,
+        "queue_wait_s": started - queued_at if queued_at is not None else 0.0,
+        "schedule_wait_s": 0.0,
+        "rate_limit_wait_s": 0.0,
+        "ttft_s": None,
+        "latency_s": None,
+        "api_calls": 0,
+        "retries": 0,
+        "hedges": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+        "cache_hit": False,
+        "outcome": None
+    })
+    return trace
+
+
+def add_to_trace(trace: Optional[Dict], **amounts) -> None:
+    """계측 기록의 누적 필드에 값을 더함 (헤지 요청처럼 여러 스레드가 같은 기록에 더할 수 있어 잠금 후)"""
+    if trace is None:
+        return
+    with _trace_lock:
+        for field, amount in amounts.items():
+            trace[field] += amount
+
+
+def record_usage(trace: Optional[Dict], model: str, usage) -> None:
+    """응답의 usage를 계측 기록에 더함"""
+    if trace is None or usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    prompt, completion = usage.prompt_tokens or 0, usage.completion_tokens or 0
+    add_to_trace(
+        trace,
+        prompt_tokens=prompt,
+        cached_tokens=cached,
+        completion_tokens=completion,
+        cost_usd=estimate_cost_usd(model, prompt, cached, completion)
+    )
+
+
+class Telemetry:
+    """호출별 계측 기록 보관소
+
+    최근 기록은 메모리에 보관해 백분위수를 계산하고, log_path가 있으면 모든
+    기록을 JSON lines로 남깁니다. 건수·토큰 누적값은 프로세스가 끝날 때까지 유지됩니다.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, max_records: int = DEFAULT_MAX_RECORDS):
+        self.log_path = log_path
+        self._records = deque(maxlen=max_records)
+        self._calls: Counter = Counter()
+        self._totals: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def finish(self, trace: Dict, outcome: str) -> Dict:
+        """계측 기록을 마무리해 저장 (같은 기록은 한 번만 저장)"""
+        if trace.get("outcome") is not None:
+            return trace
+        trace["outcome"] = outcome
+        trace["latency_s"] = time.perf_counter() - trace.pop("started")
+        trace["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        self.record(trace)
+        return trace
+
+    def record(self, record: Dict) -> None:
+        with self._lock:
+            self._records.append(record)
+            self._calls[(record["outcome"],) + tuple(record.get(tag) or "" for tag in ("target", "category"))] += 1
+            for field in ("api_calls", "retries", "hedges", "prompt_tokens", "cached_tokens", "completion_tokens", "cost_usd"):
+                self._totals[field] += record.get(field) or 0
+            for field in TIMING_FIELDS:
+                if record.get(field) is not None:
+                    self._totals[field + "_sum"] += record[field]
+                    self._totals[field + "_count"] += 1
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def records(self) -> List[Dict]:
+        """메모리에 남아 있는 최근 기록 (오래된 순)"""
+        with self._lock:
+            return list(self._records)
+
+    def totals(self) -> Dict:
+        """프로세스 시작 이후 누적값 (호출 수, 결과별 호출 수, 토큰, 비용)"""
+        with self._lock:
+            by_outcome = Counter()
+            for (outcome, _, _), count in self._calls.items():
+                by_outcome[outcome] += count
+            return {"calls": sum(by_outcome.values()), "by_outcome": dict(by_outcome), **self._totals}
+
+    def quantiles(self, field: str = "latency_s", group_by: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """최근 기록의 p50/p95/p99 (group_by 태그별, 없으면 '전체' 한 그룹)"""
+        groups: Dict[str, List[float]] = {}
+        for record in self.records():
+            if record.get(field) is None:
+                continue
+            key = str(record.get(group_by) or "-") if group_by else "전체"
+            groups.setdefault(key, []).append(record[field])
+        result = {}
+        for key, values in sorted(groups.items()):
+            values.sort()
+            result[key] = {f"p{q}": percentile(values, q) for q in QUANTILES}
+            result[key]["count"] = len(values)
+        return result
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 형식 지표 (누적 카운터 + 최근 기록 기준 지연 시간 요약)"""
+        with self._lock:
+            calls = dict(self._calls)
+            totals = dict(self._totals)
+        lines = [
+            "# HELP sms_calls_total SMS generation calls by outcome.",
+            "# TYPE sms_calls_total counter"
+        ]
+        for (outcome, target, category), count in sorted(calls.items()):
+            lines.append(f"sms_calls_total{_labels(outcome=outcome, target=target, category=category)} {count}")
+        for field, help_text in (
+            ("api_calls", "OpenAI API requests sent."),
+            ("retries", "OpenAI API retries after transient errors."),
+            ("hedges", "Duplicate OpenAI requests fired for slow calls."),
+            ("prompt_tokens", "Prompt tokens billed."),
+            ("cached_tokens", "Prompt tokens served from the provider prompt cache."),
+            ("completion_tokens", "Completion tokens billed."),
+            ("cost_usd", "Estimated API cost in USD.")
+        ):
+            name = f"sms_{field}_total"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {_number(totals.get(field, 0))}"]
+        for field in TIMING_FIELDS:
+            name = f"sms_{field[:-2]}_seconds"
+            lines += [f"# HELP {name} {field[:-2]} per call (quantiles over recent calls).", f"# TYPE {name} summary"]
+            overall = self.quantiles(field).get("전체")
+            if overall:
+                for q in QUANTILES:
+                    lines.append(f"{name}{_labels(quantile=q / 100)} {_number(overall[f'p{q}'])}")
+            lines.append(f"{name}_sum {_number(totals.get(field + '_sum', 0))}")
+            lines.append(f"{name}_count {int(totals.get(field + '_count', 0))}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """메모리의 최근 기록만 비움 (누적 카운터와 로그 파일은 유지)"""
+        with self._lock:
+            self._records.clear()
+
+
+class LatencyHistogram:
+    """키(길이 옵션 등)별 최근 API 응답 시간 분포
+
+    키마다 최근 window개 측정값만 보관해 응답 속도가 바뀌면 백분위수도 따라 바뀝니다.
+    헤지 요청 기준(p95) 계산과 관리 탭의 히스토그램에 씁니다.
+    """
+
+    def __init__(self, window: int = DEFAULT_LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """최근 측정값의 q 백분위수 (측정값이 min_samples개보다 적으면 None)"""
+        with self._lock:
+            values = sorted(self._samples.get(key, ()))
+        return percentile(values, q) if len(values) >= min_samples else None
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """키별 측정 수, 백분위수, 구간별 건수 (구간 키는 상한 초, 마지막은 'inf')"""
+        with self._lock:
+            groups = {key: sorted(values) for key, values in self._samples.items()}
+        result = {}
+        for key, values in groups.items():
+            buckets = {str(bound): 0 for bound in LATENCY_BUCKETS_S}
+            buckets["inf"] = 0
+            for value in values:
+                buckets[next((str(bound) for bound in LATENCY_BUCKETS_S if value <= bound), "inf")] += 1
+            result[key] = {"count": len(values), **{f"p{q}": percentile(values, q) for q in QUANTILES}, "buckets": buckets}
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def serve_prometheus(telemetry: Telemetry, host: str = "127.0.0.1", port: int = 9464) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """/metrics 경로로 Prometheus 지표를 제공하는 HTTP 서버를 백그라운드에서 시작
+
+    지표에 학교별 호출 기록이 담기므로 기본은 이 서버 안에서만 접속되게 묶습니다.
+    다른 서버의 Prometheus가 수집해야 하면 host("0.0.0.0" 등)를 명시적으로 넘기세요.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = telemetry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 저장소 최상위 모듈(history_store, resilience 등)을 그대로 불러오도록
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import SAMPLE_REQUEST  # noqa: E402
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+
+
+@pytest.fixture
+def sms_request() -> dict:
+    """build_sms_messages·generate_ai_sms 인자 형식의 기본 요청 (테스트마다 새 사본)"""
+    return dict(SAMPLE_REQUEST, additional_info={})
+
+
+@pytest.fixture
+def make_history_record():
+    """생성 이력 저장 형식의 레코드를 만드는 함수 (i로 시각·내용·길이가 달라짐)"""
+    def make(i: int, school: str = "○○초등학교", target: str = "학부모", category: str = "안전", content: str = None) -> dict:
+        return {
+            "timestamp": f"2024-10-{i // 60 % 28 + 1:02d} 09:{i % 60:02d}:00",
+            "school": school,
+            "target": target,
+            "category": category,
+            "content": content or f"{school} {target} {category} 안내 {i}",
+            "length": 20 + i,
+            "style": "기본",
+            "length_option": "표준"
+        }
+    return make
+
+
+@pytest.fixture
+def fake_openai():
+    """로컬 OpenAI 스텁 서버를 띄우는 함수 (설정은 FakeOpenAIServer 인자, 테스트가 끝나면 종료)"""
+    servers = []
+
+    def start(**options) -> FakeOpenAIServer:
+        server = FakeOpenAIServer(**options).__enter__()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+@pytest.fixture
+def openai_client(fake_openai):
+    """스텁 서버(기본 설정)를 가리키는 OpenAI 클라이언트 함수. 서버를 넘기면 그 서버에 연결"""
+    from openai_client import build_openai_client
+
+    def connect(server: FakeOpenAIServer = None):
+        server = server or fake_openai()
+        return build_openai_client("test-key", base_url=server.base_url, http2=False)
+    return connect
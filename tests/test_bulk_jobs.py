@@ -0,0 +1,86 @@
+import json
+
+from benchmarks.fake_openai import DEFAULT_REPLY
+from bulk_jobs import LocalBatchBackend, compile_bulk_job, ingest_results, load_manifest, run_bulk_job
+from sms_engine import generation_budget
+
+REPLY = f" {DEFAULT_REPLY} "
+
+
+def _run(backend, manifest):
+    return run_bulk_job(backend, manifest, poll_interval=0.01)
+
+
+def test_local_backend_runs_job_and_reports_per_request_failures(tmp_path, sms_request, fake_openai, openai_client):
+    # 작업자 하나로 순서대로 실행해 두 번째 요청만 400 오류
+    client = openai_client(fake_openai(replies=[REPLY, 400, REPLY]))
+    requests = [sms_request, dict(sms_request, school="실패학교"), dict(sms_request, target="학생")]
+    manifest = compile_bulk_job(requests, job_dir=str(tmp_path), job_name="job")
+    records, failures = _run(LocalBatchBackend(client, max_workers=1), manifest)
+    assert manifest["status"] == "completed"
+    assert [record["target"] for record in records] == ["학부모", "학생"]
+    assert records[0]["content"] == DEFAULT_REPLY
+    assert records[0]["length"] == len(records[0]["content"])
+    assert [failure["school"] for failure in failures] == ["실패학교"]
+    assert "400" in failures[0]["error"]
+    assert load_manifest(manifest["manifest_path"])["status"] == "completed"
+
+
+def test_local_backend_marks_job_failed_when_input_is_broken(tmp_path, sms_request, openai_client):
+    manifest = compile_bulk_job([sms_request], job_dir=str(tmp_path), job_name="broken")
+    with open(manifest["input_path"], "a", encoding="utf-8") as f:
+        f.write("{잘못된 줄\n")
+    records, failures = _run(LocalBatchBackend(openai_client()), manifest)
+    assert (records, failures) == ([], [])
+    assert manifest["status"] == "failed"
+    assert manifest["error"].startswith("JSONDecodeError")
+    assert load_manifest(manifest["manifest_path"])["error"] == manifest["error"]
+
+
+def test_local_backend_marks_job_failed_when_input_is_missing(tmp_path, sms_request, openai_client):
+    manifest = compile_bulk_job([sms_request], job_dir=str(tmp_path), job_name="missing")
+    manifest["input_path"] = str(tmp_path / "없는파일.jsonl")
+    _run(LocalBatchBackend(openai_client()), manifest)
+    assert manifest["status"] == "failed"
+    assert manifest["error"].startswith("FileNotFoundError")
+
+
+def test_batch_line_follows_generation_budget(tmp_path, sms_request):
+    manifest = compile_bulk_job([dict(sms_request, length_option="매우 길게")], job_dir=str(tmp_path), job_name="budget")
+    with open(manifest["input_path"], encoding="utf-8") as f:
+        body = json.loads(f.readline())["body"]
+    budget = generation_budget("매우 길게")
+    assert (body["model"], body["max_tokens"]) == (budget["model"], budget["max_tokens"])
+
+
+class _FixedResultsBackend:
+    """정해 둔 Batch 출력 줄을 그대로 돌려주는 백엔드"""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def results(self, batch_id):
+        yield from self.lines
+
+
+def _output_line(custom_id: str, content, finish_reason: str = "stop") -> dict:
+    choice = {"message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}
+    return {"custom_id": custom_id, "response": {"status_code": 200, "body": {"choices": [choice]}}, "error": None}
+
+
+def test_ingest_treats_empty_and_invalid_replies_as_failures(tmp_path, sms_request):
+    manifest = compile_bulk_job([sms_request] * 4, job_dir=str(tmp_path), job_name="ingest")
+    manifest["batch_id"] = "batch"
+    ids = list(manifest["requests"])
+    backend = _FixedResultsBackend([
+        _output_line(ids[0], DEFAULT_REPLY),
+        _output_line(ids[1], None, "content_filter"),
+        _output_line(ids[2], "   "),
+        _output_line(ids[3], "내일 비가 와."),
+    ])
+    records, failures = ingest_results(backend, manifest)
+    assert [record["content"] for record in records] == [DEFAULT_REPLY]
+    assert [failure["custom_id"] for failure in failures] == ids[1:]
+    assert failures[0]["error"] == "빈 응답 (finish_reason: content_filter)"
+    assert failures[2]["error"].startswith("검증 실패")
+    assert failures[2]["content"] == "내일 비가 와."
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from generation_jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, GenerationJobQueue
+
+
+def _wait_status(queue: GenerationJobQueue, job_id: str, statuses, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.status(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.005)
+    raise AssertionError(queue.status(job_id))
+
+
+@pytest.fixture
+def queue():
+    queue = GenerationJobQueue(max_workers=1)
+    yield queue
+    queue.shutdown(wait=False)
+
+
+def test_job_result_and_progress(queue):
+    release = threading.Event()
+
+    def work(handle):
+        handle.progress("내일 비")
+        release.wait(5)
+        return "내일 비가 옵니다."
+
+    job_id = queue.submit(work, label="단일", owner="세션1")
+    assert _wait_status(queue, job_id, {RUNNING})["partial"] in ("", "내일 비")
+    release.set()
+    job = _wait_status(queue, job_id, {DONE})
+    assert (job["result"], job["partial"], job["error"]) == ("내일 비가 옵니다.", "내일 비", None)
+    assert [item["id"] for item in queue.jobs(owner="세션1")] == [job_id]
+    assert queue.jobs(owner="세션2") == []
+
+
+def test_failed_job_keeps_error(queue):
+    def work(handle):
+        raise RuntimeError("API 오류")
+
+    job = _wait_status(queue, queue.submit(work), {FAILED})
+    assert job["error"] == "API 오류"
+    assert queue.counts()[FAILED] == 1
+
+
+def test_cancel_queued_and_running_jobs(queue):
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def blocking(handle):
+        started.set()
+        release.wait(5)
+        return "취소 전 결과" if not handle.cancelled else None
+
+    running_id = queue.submit(blocking)
+    started.wait(5)
+    queued_id = queue.submit(lambda handle: ran.append(1))
+    assert queue.status(queued_id)["status"] == QUEUED
+    assert queue.cancel(queued_id)
+    assert queue.status(queued_id)["status"] == CANCELLED
+    assert queue.cancel(running_id)
+    release.set()
+    assert _wait_status(queue, running_id, {CANCELLED, DONE})["status"] == CANCELLED
+    assert ran == []
+    assert not queue.cancel(running_id)
+
+
+def test_forget_running_job_discards_it_when_finished(queue):
+    release = threading.Event()
+    seen_cancel = []
+
+    def work(handle):
+        release.wait(5)
+        seen_cancel.append(handle.cancelled)
+
+    job_id = queue.submit(work, owner="세션1")
+    _wait_status(queue, job_id, {RUNNING})
+    queue.forget(job_id)
+    assert queue.jobs(owner="세션1") == []
+    release.set()
+    job = _wait_status(queue, job_id, {CANCELLED})
+    assert seen_cancel == [True]
+    queue.forget(job_id)
+    assert queue.status(job_id) is None
+    assert job["owner"] is None
+
+
+def test_forgotten_queued_job_never_runs(queue):
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def blocking(handle):
+        started.set()
+        release.wait(5)
+
+    running_id = queue.submit(blocking)
+    started.wait(5)
+    queued_id = queue.submit(lambda handle: ran.append(1), owner="세션1")
+    queue.forget(queued_id)
+    release.set()
+    _wait_status(queue, running_id, {DONE})
+    job = _wait_status(queue, queued_id, {CANCELLED})
+    assert ran == []
+    assert job["started_at"] is None
+
+
+def test_finished_jobs_are_pruned_beyond_limit():
+    queue = GenerationJobQueue(max_workers=2, max_jobs=3)
+    try:
+        ids = []
+        for i in range(5):
+            ids.append(queue.submit(lambda handle, i=i: i))
+            _wait_status(queue, ids[-1], {DONE})
+        assert [job["id"] for job in queue.jobs()] == ids[-3:]
+    finally:
+        queue.shutdown()
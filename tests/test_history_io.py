@@ -0,0 +1,82 @@
+import io
+
+import pytest
+
+from history_io import available_formats, detect_format, export_chunks, export_to_file, import_file, main, read_records
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path, make_history_record):
+    # CSV 따옴표·줄바꿈 처리를 함께 확인하도록 내용에 쉼표, 따옴표, 줄바꿈을 넣음
+    store = HistoryStore(str(tmp_path / "source.db"))
+    store.add_many([
+        make_history_record(i, target=("학부모", "학생")[i % 2], content=f"내일 강한 비 예상, 우산 준비 \"{i}\", 등하교 시 안전 주의\n두 번째 줄")
+        for i in range(25)
+    ])
+    return store
+
+
+@pytest.mark.parametrize("fmt", available_formats())
+def test_round_trip_keeps_every_column(tmp_path, store, fmt):
+    buffer = io.BytesIO()
+    export_to_file(store, buffer, fmt)
+    buffer.seek(0)
+    restored = HistoryStore(str(tmp_path / "restored.db"))
+    counts = import_file(restored, buffer, fmt, batch_size=7)
+    assert counts == {"imported": 25, "duplicates": 0, "invalid": 0}
+    strip_id = lambda rows: [{k: v for k, v in row.items() if k != "id"} for row in rows]
+    assert strip_id(restored.query(limit=None)) == strip_id(store.query(limit=None))
+    assert restored.check_stats() == []
+
+
+@pytest.mark.parametrize("fmt", available_formats())
+def test_reimport_skips_duplicates(store, fmt):
+    buffer = io.BytesIO()
+    export_to_file(store, buffer, fmt)
+    buffer.seek(0)
+    assert import_file(store, buffer, fmt) == {"imported": 0, "duplicates": 25, "invalid": 0}
+    assert store.count() == 25
+
+
+def test_export_is_chunked_and_filtered(store):
+    chunks = list(export_chunks(store, "jsonl", target="학생", chunk_size=5))
+    # 학생 12건을 5건씩
+    assert [chunk.count(b"\n") for chunk in chunks] == [5, 5, 2]
+    records = list(read_records(io.BytesIO(b"".join(chunks)), "jsonl"))
+    assert {record["target"] for record in records} == {"학생"}
+    assert [record["timestamp"] for record in records] == sorted(record["timestamp"] for record in records)
+
+
+def test_csv_starts_with_bom_for_excel(store):
+    data = b"".join(export_chunks(store, "csv"))
+    assert data.startswith("﻿timestamp,".encode("utf-8"))
+
+
+def test_invalid_rows_are_counted_not_imported(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    source = io.BytesIO(
+        "timestamp,school,target,category,content,length,style,length_option\n"
+        "2024-10-01 09:00,○○초등학교,학부모,안전,정상 이력,5,기본,표준\n"
+        "2024-10-01 09:01,○○초등학교,,안전,대상 없음,5,기본,표준\n"
+        "2024-10-01 09:02,○○초등학교,학생,안전,글자 수 오류,다섯,기본,표준\n".encode("utf-8")
+    )
+    assert import_file(store, source, "csv") == {"imported": 1, "duplicates": 0, "invalid": 2}
+
+
+def test_unknown_format_is_rejected(store):
+    assert detect_format("history.xlsx") is None
+    assert detect_format("HISTORY.NDJSON") == "jsonl"
+    with pytest.raises(ValueError):
+        export_chunks(store, "xlsx")
+
+
+def test_cli_export_and_import(tmp_path, store, capsys):
+    output = tmp_path / "history.csv"
+    source_db = str(tmp_path / "source.db")
+    assert main(["export", source_db, str(output), "--target", "학부모"]) == 0
+    target_db = str(tmp_path / "target.db")
+    assert main(["import", target_db, str(output)]) == 0
+    assert HistoryStore(target_db).count() == 13
+    assert main(["export", source_db, str(tmp_path / "history.xlsx")]) == 2
+    assert "지원하지 않는 파일 형식" in capsys.readouterr().err
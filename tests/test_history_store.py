@@ -0,0 +1,73 @@
+import pytest
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path, make_history_record):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    records = []
+    for i in range(24):
+        school = ("○○초등학교", "△△중학교")[i % 2]
+        target = ("학부모", "학생", "교직원")[i % 3]
+        category = ("안전", "상담")[i // 12]
+        records.append(make_history_record(i, school, target, category))
+    store.add_many(records)
+    return store
+
+
+def test_query_filters_and_pages_newest_first(store):
+    assert store.count() == 24
+    assert store.count("학부모") == 8
+    assert store.count("학부모", "상담") == 4
+    page = store.query("학생", limit=3)
+    assert len(page) == 3
+    assert [row["timestamp"] for row in page] == sorted((row["timestamp"] for row in page), reverse=True)
+    assert store.query("학생", limit=3, offset=3) != page
+
+
+def test_incremental_stats_match_computed(store, make_history_record):
+    store.add(make_history_record(100, target="학생", category="상담"))
+    assert store.check_stats() == []
+    stats = store.stats(category="상담")
+    assert stats == pytest.approx(store.compute_stats(category="상담"))
+    assert stats["count"] == 13
+    assert stats["top_target"] == "학생"
+
+
+def test_delete_only_removes_matching_school_and_filter(store):
+    deleted = store.delete("학부모", school="○○초등학교")
+    assert deleted == 4
+    assert store.count(school="○○초등학교") == 8
+    assert store.count(school="△△중학교") == 12
+    assert store.count("학부모") == 4
+    assert store.check_stats() == []
+    assert store.delete("학부모", school="○○초등학교") == 0
+
+
+def test_delete_everything_for_school_keeps_stats_consistent(store):
+    assert store.delete(school="△△중학교") == 12
+    assert store.stats()["count"] == 12
+    assert store.check_stats() == []
+
+
+def test_clear_removes_history_and_stats(store):
+    store.clear()
+    assert store.count() == 0
+    assert store.stats() == {"count": 0, "avg_length": 0.0, "top_target": None, "top_category": None}
+
+
+def test_rebuild_stats_restores_drifted_totals(store):
+    with store._conn:
+        store._conn.execute("UPDATE history_stats SET count = count + 5")
+    assert store.check_stats()
+    store.rebuild_stats()
+    assert store.check_stats() == []
+
+
+def test_history_survives_reopen(tmp_path, make_history_record):
+    path = str(tmp_path / "history.db")
+    HistoryStore(path).add(make_history_record(1))
+    reopened = HistoryStore(path)
+    assert reopened.count() == 1
+    assert reopened.stats()["count"] == 1
@@ -0,0 +1,126 @@
+import time
+
+import httpx
+import openai
+import pytest
+
+from resilience import (
+    APIGuard,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    RateLimiter,
+    RateLimitTimeout,
+    TokenBucket,
+    is_service_unavailable
+)
+
+
+def _connection_error() -> openai.APIConnectionError:
+    return openai.APIConnectionError(request=httpx.Request("POST", "http://localhost/v1/chat/completions"))
+
+
+def _fail():
+    raise _connection_error()
+
+
+def test_token_bucket_refund_restores_reserved_tokens():
+    bucket = TokenBucket(60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) > 0
+    bucket.refund(1)
+    assert not bucket.try_take(1)
+    bucket.refund(60)
+    assert bucket.try_take(60)
+
+
+def test_rate_limit_timeout_does_not_keep_reservation():
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000)
+    limiter.acquire(100)
+    for _ in range(5):
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire(100, max_wait=0.01)
+    # 시간이 지나지 않았으므로 첫 호출만 빠진 상태 그대로여야 함
+    assert limiter.requests.reserve(1) == pytest.approx(60.0, abs=0.5)
+    assert limiter.tokens.try_take(900)
+
+
+def test_circuit_opens_after_threshold_and_recovers_with_trial():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()
+    # 시험 호출 하나가 진행 중이면 다른 호출은 막음
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_rate_limit_timeout_in_half_open_releases_trial():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    guard = APIGuard(rate_limiter=RateLimiter(requests_per_minute=1), circuit_breaker=breaker, max_retries=0)
+    with pytest.raises(openai.APIConnectionError):
+        guard.call(_fail)
+    time.sleep(0.06)
+    # 분당 1건을 이미 썼으므로 시험 호출은 속도 제한 대기에서 마감을 넘김
+    with pytest.raises(RateLimitTimeout):
+        guard.call(lambda: "ok", deadline=time.monotonic() + 0.5)
+    guard.rate_limiter = RateLimiter()
+    assert guard.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_guard_retries_transient_errors_only():
+    guard = APIGuard(rate_limiter=RateLimiter(), max_retries=2, base_delay=0, max_delay=0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _connection_error()
+        return "ok"
+
+    trace = {"rate_limit_wait_s": 0.0, "retries": 0}
+    assert guard.call(flaky, trace=trace) == "ok"
+    assert trace["retries"] == 2
+
+    def invalid():
+        calls.append(1)
+        raise ValueError("잘못된 요청")
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        guard.call(invalid)
+    assert len(calls) == 1
+    assert guard.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def _status_error(status: int, error_class=openai.APIStatusError) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://localhost/v1/chat/completions")
+    return error_class("오류", response=httpx.Response(status, request=request), body=None)
+
+
+def test_service_unavailable_covers_only_slow_or_down_api():
+    assert is_service_unavailable(_connection_error())
+    assert is_service_unavailable(_status_error(503))
+    assert is_service_unavailable(_status_error(429, openai.RateLimitError))
+    for error in (CircuitOpenError(), RateLimitTimeout(), DeadlineExceeded()):
+        assert is_service_unavailable(error)
+    for error in (_status_error(401), _status_error(400), TypeError("잘못된 인자")):
+        assert not is_service_unavailable(error)
@@ -0,0 +1,113 @@
+import contextvars
+import threading
+import time
+from typing import List
+
+import pytest
+
+from resilience import BATCH, INTERACTIVE, APIGuard, DeadlineExceeded, FairScheduler, RateLimiter, current_schedule, scheduling
+
+
+def _wait_queued(scheduler: FairScheduler, count: int) -> None:
+    for _ in range(200):
+        if scheduler.snapshot()["queued"] == count:
+            return
+        time.sleep(0.005)
+    raise AssertionError(f"대기 {count}건이 되지 않음: {scheduler.snapshot()}")
+
+
+def _served_order(scheduler: FairScheduler, requests: List[tuple]) -> List[str]:
+    """자리 하나를 잡아 둔 채 requests를 차례로 대기시킨 뒤 풀어 자리를 받은 순서 반환"""
+    order: List[str] = []
+    scheduler.acquire("점유", INTERACTIVE)
+
+    def run(label: str, tenant: str, priority: str, cost: float) -> None:
+        scheduler.acquire(tenant, priority, cost)
+        order.append(label)
+        scheduler.release(tenant, priority)
+
+    threads = []
+    for i, (label, tenant, priority, cost) in enumerate(requests):
+        thread = threading.Thread(target=run, args=(label, tenant, priority, cost))
+        thread.start()
+        threads.append(thread)
+        _wait_queued(scheduler, i + 1)
+    scheduler.release("점유", INTERACTIVE)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_interactive_request_overtakes_queued_batch():
+    scheduler = FairScheduler(max_concurrency=1, interactive_reserved=0)
+    order = _served_order(scheduler, [
+        ("일괄1", "큰학교", BATCH, 100),
+        ("일괄2", "큰학교", BATCH, 100),
+        ("단일", "작은학교", INTERACTIVE, 100)
+    ])
+    assert order[0] == "단일"
+
+
+def test_small_school_is_not_stuck_behind_large_batch():
+    scheduler = FairScheduler(max_concurrency=1, interactive_reserved=0)
+    requests = [(f"큰{i}", "큰학교", BATCH, 100) for i in range(5)] + [("작은", "작은학교", BATCH, 100)]
+    order = _served_order(scheduler, requests)
+    assert order.index("작은") <= 1
+    assert [label for label in order if label != "작은"] == [f"큰{i}" for i in range(5)]
+
+
+def test_tenant_concurrency_limit_lets_other_school_through():
+    scheduler = FairScheduler(max_concurrency=2, tenant_concurrency=1, interactive_reserved=0)
+    scheduler.acquire("A", BATCH)
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("A", BATCH, deadline=time.monotonic() + 0.05)
+    assert scheduler.acquire("B", BATCH, deadline=time.monotonic() + 0.05) < 0.05
+
+
+def test_batch_cannot_take_reserved_interactive_slots():
+    scheduler = FairScheduler(max_concurrency=2, tenant_concurrency=2, interactive_reserved=1)
+    scheduler.acquire("A", BATCH)
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("B", BATCH, deadline=time.monotonic() + 0.05)
+    scheduler.acquire("C", INTERACTIVE, deadline=time.monotonic() + 0.05)
+    snapshot = scheduler.snapshot()
+    assert (snapshot["running"], snapshot["queued"]) == (2, 0)
+
+
+def test_deadline_removes_request_from_queue():
+    scheduler = FairScheduler(max_concurrency=1)
+    scheduler.acquire("A")
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("B", deadline=time.monotonic() + 0.05)
+    assert scheduler.snapshot()["queued"] == 0
+    scheduler.release("A")
+    assert scheduler.acquire("B", deadline=time.monotonic() + 0.05) < 0.05
+
+
+def test_tenant_requests_per_minute_quota():
+    scheduler = FairScheduler(max_concurrency=4, tenant_requests_per_minute=1)
+    with scheduler.slot("A"):
+        pass
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("A", deadline=time.monotonic() + 0.1)
+    with scheduler.slot("B"):
+        pass
+    tenants = {item["tenant"]: item["served"] for item in scheduler.snapshot()["tenants"]}
+    assert tenants == {"A": 1, "B": 1}
+
+
+def test_scheduling_context_reaches_guard_and_worker_threads():
+    scheduler = FairScheduler(max_concurrency=1)
+    guard = APIGuard(rate_limiter=RateLimiter(), scheduler=scheduler)
+    seen = []
+    trace = {"schedule_wait_s": 0.0, "rate_limit_wait_s": 0.0, "retries": 0}
+    with scheduling(tenant="○○초등학교", priority=BATCH):
+        context = contextvars.copy_context()
+        guard.call(lambda: seen.append(current_schedule()), trace=trace)
+    thread = threading.Thread(target=context.run, args=(lambda: seen.append(current_schedule()),))
+    thread.start()
+    thread.join()
+    assert seen == [("○○초등학교", BATCH), ("○○초등학교", BATCH)]
+    assert current_schedule() == (None, INTERACTIVE)
+    tenants = scheduler.snapshot()["tenants"]
+    assert [(item["tenant"], item["served"], item["running"]) for item in tenants] == [("○○초등학교", 1, 0)]
@@ -0,0 +1,110 @@
+import itertools
+import sqlite3
+
+import pytest
+
+from similar_index import DEFAULT_MIN_SIMILARITY, SIGNATURE_VERSION, SimilarRequestIndex, text_similarity
+
+# 같은 공지를 고쳐 쓴 요청 (제안해야 함)
+SIMILAR_PAIRS = [
+    ("내일 오전 강한 비 예상, 우산 준비 및 등하교 시 안전 주의", "내일 오전 강한 비 예상, 우산 준비 및 등하교 안전 주의 부탁"),
+    ("10월 25일 현장체험학습 실시, 도시락과 물 지참", "현장체험학습 실시 10월 25일, 도시락 및 물 지참 바랍니다"),
+    ("학부모 상담 주간 운영, 담임교사에게 신청서 제출", "학부모 상담 주간 운영 안내, 담임교사에게 신청서 제출 바람"),
+    ("미세먼지 나쁨으로 실외 활동 자제, 마스크 착용", "미세먼지 나쁨, 실외 활동 자제 및 마스크 착용 부탁"),
+    ("가을 축제 개최, 오전 9시 운동장 집합", "가을 축제 개최 안내 오전 9시까지 운동장 집합"),
+    ("독감 예방접종 실시, 당일 건강 상태 확인", "독감 예방접종 실시 예정, 당일 아침 건강 상태 확인"),
+    ("통학 버스 시간 변경, 오전 8시 10분 출발", "통학 버스 출발 시간 변경 오전 8시 10분"),
+    ("단축 수업으로 급식 없음, 12시 하교", "단축 수업 실시, 급식 없음 12시 하교"),
+    ("방과후 수업 휴강, 교무실 문의", "방과후 수업 휴강 안내 문의는 교무실로"),
+    ("폭설 예보로 등교 시간 10시로 조정", "폭설 예보, 등교 시간 10시로 조정합니다"),
+    ("체육대회 실시, 체육복 착용 및 물 지참", "체육대회 실시 체육복 착용, 물 꼭 지참"),
+    ("정문 앞 횡단보도 공사로 후문 이용", "정문 앞 횡단보도 공사, 후문으로 등교"),
+    ("수학여행 참가비 납부 기한 11월 3일까지", "수학여행 참가비 11월 3일까지 납부"),
+    ("기말고사 일정 안내, 12월 10일부터 3일간", "기말고사 12월 10일부터 3일간 실시 안내"),
+    (
+        "다음 주 월요일부터 학부모 상담 주간을 운영하오니 희망하시는 학부모님께서는 담임교사에게 신청서를 제출해 주시기 바랍니다",
+        "다음 주 월요일부터 학부모 상담 주간을 운영합니다. 희망하시는 학부모님은 담임교사에게 신청서를 제출해 주세요"
+    ),
+    (
+        "미세먼지 농도가 나쁨으로 예상되어 내일은 실외 체육 활동을 실내 활동으로 대체하니 자녀가 마스크를 착용하도록 지도 부탁드립니다",
+        "미세먼지 나쁨 예상으로 내일 실외 체육 활동은 실내 활동으로 대체합니다. 자녀가 마스크를 착용하도록 지도 부탁드립니다"
+    )
+]
+# 인사말·날짜만 같은 다른 공지 (제안하면 안 됨). 나머지 관계없는 조합은 SIMILAR_PAIRS끼리 만듦
+BOILERPLATE_PAIRS = [
+    ("가을 축제가 10월 28일에 개최되오니 학부모님들의 많은 관심과 참여 부탁드립니다", "통학 버스 시간이 10월 28일부터 변경되오니 학부모님들의 확인 부탁드립니다"),
+    ("방과후 수업이 다음 주 휴강되오니 가정에서 자녀 지도 부탁드립니다", "기말고사가 다음 주 실시되오니 가정에서 자녀 학습 지도 부탁드립니다"),
+    (
+        "다음 주 월요일부터 학부모 상담 주간을 운영하오니 희망하시는 학부모님께서는 담임교사에게 신청서를 제출해 주시기 바랍니다",
+        "이번 주 금요일 현장체험학습 실시 예정이오니 학부모님께서는 자녀가 도시락과 물을 지참하도록 지도해 주시기 바랍니다"
+    )
+]
+UNRELATED_PAIRS = BOILERPLATE_PAIRS + [
+    (first[0], second[1]) for first, second in itertools.permutations(SIMILAR_PAIRS, 2)
+]
+
+def _message(content: str) -> str:
+    # '표준' 길이 기준에 맞도록 앞부분만 사용
+    return f"[○○초등학교] 10월 18일 {content[:20]} 관련 안내드립니다. 자녀 지도와 가정에서의 확인을 부탁드립니다."
+
+
+@pytest.fixture
+def notice_request(sms_request):
+    # _message의 날짜와 맞춤
+    return dict(sms_request, date="10월 18일")
+
+
+@pytest.fixture
+def index(tmp_path, notice_request):
+    index = SimilarRequestIndex(str(tmp_path / "similar.db"))
+    index.add_many(
+        (dict(notice_request, content_details=first), _message(first)) for first, _ in SIMILAR_PAIRS
+    )
+    return index
+
+
+@pytest.mark.parametrize("first, second", SIMILAR_PAIRS)
+def test_rewritten_notice_is_above_threshold(first, second):
+    assert text_similarity(first, second) >= DEFAULT_MIN_SIMILARITY
+
+
+@pytest.mark.parametrize("first, second", UNRELATED_PAIRS)
+def test_unrelated_notice_is_below_threshold(first, second):
+    assert text_similarity(first, second) < DEFAULT_MIN_SIMILARITY
+
+
+def test_suggests_rewritten_notice(index, notice_request):
+    for first, second in SIMILAR_PAIRS:
+        suggestion = index.suggest(dict(notice_request, content_details=second, school="새학교", date="10월 20일"))
+        assert suggestion is not None, second
+        assert suggestion["source_text"] == first
+        assert suggestion["similarity"] >= DEFAULT_MIN_SIMILARITY
+        assert "새학교" in suggestion["message"] and "10월 20일" in suggestion["message"]
+
+
+def test_does_not_suggest_unrelated_notice(index, notice_request):
+    for _, other in BOILERPLATE_PAIRS:
+        assert index.suggest(dict(notice_request, content_details=other)) is None
+    assert index.suggest(dict(notice_request, content_details="졸업식 강당 입장 안내, 꽃다발 판매 없음")) is None
+
+
+def test_suggests_only_within_same_group(index, notice_request):
+    first, second = SIMILAR_PAIRS[0]
+    assert index.suggest(dict(notice_request, content_details=second, target="학생")) is None
+
+
+def test_reload_and_migrate_old_signatures(tmp_path, index, notice_request):
+    db_path = str(tmp_path / "similar.db")
+    first, second = SIMILAR_PAIRS[0]
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE similar_requests SET signature = zeroblob(length(signature))")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    reloaded = SimilarRequestIndex(db_path)
+    assert len(reloaded) == len(SIMILAR_PAIRS)
+    assert reloaded.suggest(dict(notice_request, content_details=second))["source_text"] == first
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SIGNATURE_VERSION
+    conn.close()
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from sms_cache import SMSCache, make_cache_key
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+def test_key_ignores_whitespace_and_empty_values():
+    first = make_cache_key(content_details="내일  강한 비\n예상", additional_info={"준비물": "우산", "비고": ""}, model="m")
+    second = make_cache_key(model="m", additional_info={"준비물": " 우산 "}, content_details="내일 강한 비 예상")
+    assert first == second
+    assert first != make_cache_key(content_details="내일 강한 비 예상", additional_info={"준비물": "우산"}, model="other")
+
+
+def test_value_survives_restart_through_disk_layer(db_path):
+    SMSCache(db_path).set("key", "문자")
+    reopened = SMSCache(db_path)
+    assert reopened.stats() == {"memory_entries": 0, "disk_entries": 1}
+    assert reopened.get("key") == "문자"
+    assert reopened.stats()["memory_entries"] == 1
+
+
+def test_expired_entries_are_not_returned(db_path):
+    cache = SMSCache(db_path, ttl_seconds=0.05)
+    cache.set("key", "문자")
+    time.sleep(0.06)
+    assert cache.get("key") is None
+    assert cache.stats() == {"memory_entries": 0, "disk_entries": 0}
+
+
+def test_memory_layer_keeps_most_recently_used(db_path):
+    cache = SMSCache(db_path, memory_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert list(cache._memory) == ["a", "c"]
+    # 메모리에서 밀려난 항목도 디스크에서 찾음
+    assert cache.get("b") == "2"
+
+
+def test_disk_layer_evicts_least_recently_used(db_path):
+    cache = SMSCache(db_path, memory_size=1, disk_max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    cache._memory.clear()
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", "3")
+    cache._memory.clear()
+    assert cache.stats()["disk_entries"] == 2
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+
+def test_memory_hits_count_as_recent_use_on_disk(db_path):
+    cache = SMSCache(db_path, disk_max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    # 메모리 적중도 디스크의 사용 시각에 반영되어 b가 먼저 지워짐
+    assert cache.get("a") == "1"
+    time.sleep(0.01)
+    cache.set("c", "3")
+    cache._memory.clear()
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+
+def test_set_does_not_count_or_sweep_disk_every_time(db_path):
+    cache = SMSCache(db_path, disk_max_entries=100)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    for i in range(150):
+        cache.set(f"key{i}", "문자")
+    # 처음 저장할 때 한 번 만료 정리하고, 그다음은 한도를 넘을 때만 다시 세어 여유분(10건)까지 정리
+    # (101, 112, 123, 134, 145번째 저장)
+    assert sum("COUNT(*)" in statement for statement in statements) == 5
+    assert sum("expires_at <=" in statement for statement in statements) == 6
+    assert cache.stats()["disk_entries"] == 95
+
+
+def test_clear_removes_both_layers(db_path):
+    cache = SMSCache(db_path)
+    cache.set("key", "문자")
+    cache.clear()
+    assert cache.get("key") is None
+    assert cache.stats() == {"memory_entries": 0, "disk_entries": 0}
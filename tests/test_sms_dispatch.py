@@ -0,0 +1,146 @@
+from collections import Counter
+from typing import Dict, List
+
+import pytest
+
+from benchmarks.fake_gateway import FakeGatewayServer
+from sms_dispatch import (
+    FAILED,
+    RETRY,
+    SENT,
+    DispatchStore,
+    DryRunGateway,
+    HTTPGateway,
+    normalize_phone,
+    plan_dispatch,
+    read_recipients,
+    run_dispatch
+)
+
+MESSAGES = [
+    {"school": "○○초등학교", "target": "학부모", "content": "[○○초등학교] 내일 우산을 챙겨 주세요."},
+    {"school": "○○초등학교", "target": "교직원", "content": "[○○초등학교] 내일 비 예보로 등교 지도 부탁드립니다. " * 3}
+]
+
+
+class ScriptedGateway:
+    """번호 끝자리로 결과를 정하는 게이트웨이 (1: 처음 한 번 일시 오류, 9: 항상 거절, 8: 항상 일시 오류)"""
+
+    name = "scripted"
+    max_batch_size = 2
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.batches: List[List[Dict]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def send_batch(self, batch):
+        self.batches.append(batch)
+        results = []
+        for message in batch:
+            self.calls[message["to"]] += 1
+            last = message["to"][-1]
+            if last == "9":
+                results.append({"id": message["id"], "status": FAILED, "error": "수신 거부"})
+            elif last == "8" or (last == "1" and self.calls[message["to"]] == 1):
+                results.append({"id": message["id"], "status": RETRY, "error": "HTTP 503"})
+            else:
+                results.append({"id": message["id"], "status": SENT, "gateway_id": f"g-{message['id']}"})
+        return results
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DispatchStore(str(tmp_path / "dispatch.db"))
+
+
+@pytest.mark.parametrize("phone, expected", [
+    ("010-1234-5678", "01012345678"),
+    ("+82 10 1234 5678", "01012345678"),
+    ("(02) 123-4567", "021234567"),
+    ("1234-5678", None),
+    ("", None)
+])
+def test_normalize_phone(phone, expected):
+    assert normalize_phone(phone) == expected
+
+
+def test_read_recipients_accepts_excel_cp949_headers():
+    data = "이름,휴대폰번호,대상\n김학생, 010-1111-2222 ,학부모\n".encode("cp949")
+    assert read_recipients(data) == [{"phone": "010-1111-2222", "name": "김학생", "target": "학부모", "school": ""}]
+    with pytest.raises(ValueError):
+        read_recipients("이름\n김학생\n".encode("utf-8"))
+
+
+def test_plan_dispatch_matches_target_and_rejects_ambiguous_or_duplicate():
+    recipients = [
+        {"phone": "010-1111-2222", "name": "가", "target": "학부모"},
+        {"phone": "01011112222", "name": "가", "target": "학부모"},
+        {"phone": "010-3333-4444", "name": "나", "target": "교직원"},
+        {"phone": "010-5555-6666", "name": "다"},
+        {"phone": "잘못된 번호", "name": "라", "target": "학부모"}
+    ]
+    assignments, rejected = plan_dispatch(MESSAGES, recipients)
+    assert assignments == [("01011112222", "가", 0), ("01033334444", "나", 1)]
+    assert [(item["row"], item["reason"]) for item in rejected] == [
+        (2, "중복 번호"), (4, "문자가 여러 개라 대상·학교 열이 필요함"), (5, "전화번호 형식 오류")
+    ]
+
+
+def test_create_job_classifies_and_rejects_oversized_messages(store):
+    job_id = store.create_job("안내", "dry_run", MESSAGES, [("01011112222", "", 0)])
+    assert [message["sms_type"] for message in store.messages(job_id)] == ["단문(SMS)", "장문(LMS)"]
+    with pytest.raises(ValueError):
+        store.create_job("너무 김", "dry_run", [{"content": "가" * 1001}], [])
+
+
+def test_dispatch_retries_transient_errors_and_records_failures(store):
+    phones = ["01000000000", "01000000001", "01000000009", "01000000008", "01000000002"]
+    job_id = store.create_job("안내", "scripted", MESSAGES, [(phone, "", i % 2) for i, phone in enumerate(phones)])
+    gateway = ScriptedGateway()
+    summary = run_dispatch(gateway, store, job_id, batch_size=10, max_in_flight=2, base_delay=0.0, max_attempts=3)
+
+    assert (summary[SENT], summary[FAILED], summary["pending"]) == (3, 2, 0)
+    assert summary["sent_by_type"] == {"단문(SMS)": 2, "장문(LMS)": 1}
+    assert summary["cost"] == pytest.approx(2 * 20.0 + 50.0)
+    # 배치 크기는 게이트웨이 한도로 제한
+    assert max(len(batch) for batch in gateway.batches) == 2
+    assert gateway.calls == {"01000000000": 1, "01000000001": 2, "01000000009": 1, "01000000008": 3, "01000000002": 1}
+    # 다시 보낼 때도 수신자별 중복 방지 키는 그대로
+    keys = {(message["to"], message["idempotency_key"]) for batch in gateway.batches for message in batch}
+    assert len(keys) == len(phones) and len({key for _, key in keys}) == len(phones)
+    failures = {row["phone"]: (row["attempts"], row["error"]) for row in store.failures(job_id)}
+    assert failures == {"01000000009": (1, "수신 거부"), "01000000008": (3, "HTTP 503")}
+    assert store.jobs()[0]["status"] == "partial"
+
+
+def test_interrupted_job_resumes_only_pending_recipients(store):
+    job_id = store.create_job("안내", "dry_run", MESSAGES, [(f"0100000000{i}", "", 0) for i in range(4)])
+    store.record_results(job_id, [{"id": "0", "status": SENT}, {"id": "1", "status": SENT}])
+    gateway = ScriptedGateway()
+    summary = run_dispatch(gateway, store, job_id, base_delay=0.0)
+    assert summary[SENT] == 4
+    assert sorted(gateway.calls) == ["01000000002", "01000000003"]
+    assert store.jobs()[0]["status"] == "done"
+
+
+def test_dry_run_gateway_sends_everything(store):
+    job_id = store.create_job("연습", "dry_run", MESSAGES, [(f"0101234567{i}", "", i % 2) for i in range(10)])
+    summary = run_dispatch(DryRunGateway(), store, job_id, batch_size=3)
+    assert (summary["total"], summary[SENT]) == (10, 10)
+
+
+def test_batch_error_after_partial_delivery_does_not_send_twice(store):
+    job_id = store.create_job("안내", "http", MESSAGES, [(f"010000000{i:02d}", "", i % 2) for i in range(40)])
+    with FakeGatewayServer(error_rate=0.5, partial_delivery=True, seed=3) as server:
+        summary = run_dispatch(HTTPGateway(server.base_url), store, job_id, batch_size=8, base_delay=0.0, max_attempts=10)
+        counters = server.counters()
+    assert summary[SENT] == 40
+    # 503 전에 접수된 문자는 다시 보낼 때 중복 방지 키로 걸러짐
+    assert counters["errors"] > 0 and counters["deduplicated"] > 0
+    assert (counters["accepted"], counters["duplicates"]) == (40, 0)
@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+
+import openai
+import pytest
+
+import sms_engine
+from benchmarks.fake_openai import DEFAULT_REPLY
+from resilience import DeadlineExceeded
+from sms_cache import SMSCache
+from sms_engine import (
+    GENERATION_BUDGETS,
+    HEDGE_MIN_SAMPLES,
+    SCHOOL_PLACEHOLDER,
+    build_sms_messages,
+    correct_sms,
+    fan_out_schools,
+    generate_ai_sms,
+    generate_multi_target_sms,
+    latency_histogram,
+    localize_sms,
+    parse_multi_target_reply,
+    prompt_usage,
+    stream_ai_sms
+)
+from sms_templates import render_template
+from telemetry import Telemetry
+
+# '표준' 길이 기준(60~100자)을 넘는 답변
+TOO_LONG_REPLY = DEFAULT_REPLY + " 자세한 내용은 가정통신문을 참고해 주시고, 궁금한 점은 담임 선생님께 문의해 주시기 바랍니다."
+
+
+@pytest.fixture(autouse=True)
+def clear_latency_histogram():
+    # 헤지 기준은 프로세스 전체 분포라 테스트마다 비움
+    latency_histogram.clear()
+    yield
+    latency_histogram.clear()
+
+
+def _warm_up_hedge(length_option: str = "표준", seconds: float = 0.01) -> None:
+    for _ in range(HEDGE_MIN_SAMPLES):
+        latency_histogram.observe(length_option, seconds)
+
+
+def test_slow_call_is_hedged_and_loser_stream_closed(monkeypatch, sms_request, fake_openai, openai_client):
+    # 첫 요청만 2초 늦게 응답. 헤지 기준(p95)이 짧아 0.5초 뒤 같은 요청을 한 번 더 보냄
+    server = fake_openai(latencies=[2.0])
+    _warm_up_hedge()
+    results, finished = [], threading.Event()
+    stream_text = sms_engine._stream_text
+
+    def recording_stream_text(*args, **kwargs):
+        text = stream_text(*args, **kwargs)
+        results.append(text)
+        if len(results) == 2:
+            finished.set()
+        return text
+
+    monkeypatch.setattr(sms_engine, "_stream_text", recording_stream_text)
+    telemetry = Telemetry()
+    started = time.monotonic()
+    sms, success = generate_ai_sms(openai_client(server), **sms_request, validate=False, telemetry=telemetry)
+    assert time.monotonic() - started < 1.5
+    assert (sms, success) == (DEFAULT_REPLY, True)
+    trace = telemetry.records()[-1]
+    assert (trace["api_calls"], trace["hedges"], trace["outcome"]) == (2, 1, "ok")
+    # 늦은 쪽은 첫 조각을 받자마자 연결을 닫고 결과 없이 끝남
+    assert finished.wait(5)
+    assert results == [DEFAULT_REPLY, None]
+    assert server.requests == 2
+
+
+def test_fast_call_is_not_hedged(sms_request, fake_openai, openai_client):
+    server = fake_openai()
+    _warm_up_hedge(seconds=0.5)
+    telemetry = Telemetry()
+    generate_ai_sms(openai_client(server), **sms_request, validate=False, telemetry=telemetry)
+    assert telemetry.records()[-1]["hedges"] == 0
+    assert server.requests == 1
+
+
+def test_generation_past_budget_deadline_falls_back_to_template(monkeypatch, sms_request, fake_openai, openai_client):
+    monkeypatch.setitem(GENERATION_BUDGETS, "표준", dict(GENERATION_BUDGETS["표준"], deadline_s=0.3))
+    server = fake_openai(latency=1.0)
+    telemetry = Telemetry()
+    started = time.monotonic()
+    sms, success = generate_ai_sms(openai_client(server), **sms_request, telemetry=telemetry)
+    assert time.monotonic() - started < 0.9
+    assert (sms, success) == (render_template(sms_request), True)
+    assert telemetry.records()[-1]["outcome"] == "fallback"
+
+
+def test_stream_past_deadline_raises_without_calling_api(sms_request, fake_openai, openai_client):
+    server = fake_openai()
+    telemetry = Telemetry()
+    with pytest.raises(DeadlineExceeded):
+        list(stream_ai_sms(openai_client(server), **sms_request, telemetry=telemetry, deadline=time.monotonic() - 1))
+    assert server.requests == 0
+    assert telemetry.records()[-1]["outcome"] == "error"
+
+
+def test_correct_sms_fixes_only_when_better(sms_request, fake_openai, openai_client):
+    server = fake_openai(replies=[DEFAULT_REPLY, TOO_LONG_REPLY])
+    client = openai_client(server)
+    sms, report = correct_sms(client, TOO_LONG_REPLY, sms_request)
+    assert (sms, report["ok"]) == (DEFAULT_REPLY, True)
+    # 수정본이 나아지지 않으면 원래 문자 유지
+    sms, report = correct_sms(client, TOO_LONG_REPLY, sms_request)
+    assert (sms, report["ok"]) == (TOO_LONG_REPLY, False)
+    assert server.requests == 2
+
+
+def test_correct_sms_skips_valid_message_and_past_deadline(sms_request, fake_openai, openai_client):
+    server = fake_openai()
+    client = openai_client(server)
+    assert correct_sms(client, DEFAULT_REPLY, sms_request)[0] == DEFAULT_REPLY
+    sms, report = correct_sms(client, TOO_LONG_REPLY, sms_request, deadline=time.monotonic() - 1)
+    assert (sms, report["ok"]) == (TOO_LONG_REPLY, False)
+    assert server.requests == 0
+
+
+def test_stream_yields_chunks_and_caches_full_message(tmp_path, sms_request, fake_openai, openai_client):
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    server = fake_openai()
+    client = openai_client(server)
+    chunks = list(stream_ai_sms(client, **sms_request, cache=cache))
+    assert len(chunks) > 1
+    assert "".join(chunks) == DEFAULT_REPLY
+    # 같은 요청은 캐시된 문자 한 조각으로 바로 반환
+    assert list(stream_ai_sms(client, **sms_request, cache=cache)) == [DEFAULT_REPLY]
+    assert server.requests == 1
+
+
+def test_closing_stream_cancels_without_caching(tmp_path, sms_request, fake_openai, openai_client):
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    server = fake_openai(chunk_delay=0.2)
+    telemetry = Telemetry()
+    stream = stream_ai_sms(openai_client(server), **sms_request, cache=cache, telemetry=telemetry)
+    first = next(stream)
+    stream.close()
+    assert DEFAULT_REPLY.startswith(first)
+    assert telemetry.records()[-1]["outcome"] == "cancelled"
+    assert telemetry.records()[-1]["ttft_s"] is not None
+    assert cache.get(sms_engine._sms_cache_key(**sms_request)) is None
+
+
+def test_candidates_come_from_one_call_and_are_cached(tmp_path, sms_request, fake_openai, openai_client):
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    server = fake_openai()
+    client = openai_client(server)
+    telemetry = Telemetry()
+    # 스텁은 n개 후보 모두 같은 답변을 주므로 중복이 걸러져 하나만 남음
+    sms_list, success = generate_ai_sms(client, **sms_request, cache=cache, candidates=3, telemetry=telemetry)
+    assert (sms_list, success) == ([DEFAULT_REPLY], True)
+    assert telemetry.records()[-1]["mode"] == "candidates"
+    assert generate_ai_sms(client, **sms_request, cache=cache, candidates=3) == ([DEFAULT_REPLY], True)
+    # 단일 생성과 후보 목록은 캐시 키가 달라 따로 생성
+    assert generate_ai_sms(client, **sms_request, cache=cache) == (DEFAULT_REPLY, True)
+    assert server.requests == 2
+
+
+def test_candidates_fall_back_to_template_list(sms_request, fake_openai, openai_client):
+    server = fake_openai(replies=[503])
+    sms_list, success = generate_ai_sms(openai_client(server), **sms_request, candidates=3)
+    assert (sms_list, success) == ([render_template(sms_request)], True)
+
+
+def test_prompt_prefix_is_shared_across_requests(sms_request):
+    first = build_sms_messages(**sms_request)
+    second = build_sms_messages(**dict(sms_request, target="교직원", category="행사 안내", length_option="길게"))
+    # 제공자 프롬프트 캐시가 맞도록 시스템 지침은 요청과 무관하게 같고, 요청별 입력은 뒤에만 옴
+    assert first[0] == second[0]
+    assert first[0]["role"] == "system"
+    assert sms_request["content_details"] not in first[0]["content"]
+    assert sms_request["content_details"] in first[1]["content"]
+
+
+def test_cached_prompt_tokens_are_recorded(sms_request, fake_openai, openai_client):
+    server = fake_openai(cached_tokens=128)
+    telemetry = Telemetry()
+    before = prompt_usage.snapshot()
+    generate_ai_sms(openai_client(server), **sms_request, validate=False, telemetry=telemetry)
+    list(stream_ai_sms(openai_client(server), **sms_request, telemetry=telemetry))
+    assert [record["cached_tokens"] for record in telemetry.records()] == [128, 128]
+    after = prompt_usage.snapshot()
+    assert after["cached_tokens"] - before["cached_tokens"] == 256
+    assert after["requests"] - before["requests"] == 2
+
+
+def test_localize_sms_replaces_placeholder_or_prefixes_school():
+    assert localize_sms("[○○학교] 내일 휴업합니다. ○○학교장", "가나초등학교") == "[가나초등학교] 내일 휴업합니다. 가나초등학교장"
+    assert localize_sms("내일 휴업합니다.", "가나초등학교") == "[가나초등학교] 내일 휴업합니다."
+
+
+def test_fan_out_schools_revalidates_each_school(sms_request):
+    request = dict(sms_request, school=SCHOOL_PLACEHOLDER, length_option="짧게")
+    # '짧게'는 60자 이하여야 하므로 긴 학교명이 들어간 문자만 기준을 넘음
+    sms = "[○○학교] 내일 오전 강한 비가 예상됩니다. 등하교 시 우산을 꼭 챙겨 주세요."
+    long_school = "가나다라마바사아자차카타파하초등학교"
+    rows = fan_out_schools([(request, sms)], ["가나초", long_school])
+    assert [row["school"] for row in rows] == ["가나초", long_school]
+    assert rows[0]["content"].startswith("[가나초] 내일")
+    assert rows[0]["length"] == len(rows[0]["content"])
+    assert rows[0]["issues"] == ""
+    assert rows[1]["issues"] != ""
+    assert {row["target"] for row in rows} == {"학부모"}
+
+
+def test_parse_multi_target_reply_keeps_only_valid_targets():
+    targets = ["학부모", "학생", "교직원"]
+    reply = json.dumps({"학부모": " 안내 ", "학생": "", "교직원": 3, "기타": "무시"}, ensure_ascii=False)
+    assert parse_multi_target_reply(reply, targets) == {"학부모": "안내"}
+    assert parse_multi_target_reply("[\"안내\"]", targets) == {}
+    assert parse_multi_target_reply("{잘못된 JSON", targets) == {}
+    assert parse_multi_target_reply(None, targets) == {}
+
+
+def test_multi_target_regenerates_replies_still_invalid_after_correction(tmp_path, sms_request, fake_openai, openai_client):
+    # 묶음 응답의 학부모 문자는 길이 기준을 넘고, 수정 요청에도 그대로 → 대상별 호출로 다시 생성
+    structured = json.dumps({"학부모": TOO_LONG_REPLY, "학생": DEFAULT_REPLY}, ensure_ascii=False)
+    server = fake_openai(replies=[structured, TOO_LONG_REPLY, DEFAULT_REPLY])
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    telemetry = Telemetry()
+    requests = [dict(sms_request, cache=cache, telemetry=telemetry), dict(sms_request, target="학생")]
+    results = {idx: (sms, success) for idx, sms, success in generate_multi_target_sms(openai_client(server), requests)}
+    assert results == {0: (DEFAULT_REPLY, True), 1: (DEFAULT_REPLY, True)}
+    assert server.requests == 3
+    multi = next(record for record in telemetry.records() if record["mode"] == "multi_target")
+    # 수정 요청도 묶음 요청의 계측 기록에 들어감
+    assert (multi["api_calls"], multi["outcome"]) == (2, "partial")
+    assert cache.get(sms_engine._sms_cache_key(**sms_request)) == DEFAULT_REPLY
+
+
+def test_multi_target_regenerates_missing_targets(sms_request, fake_openai, openai_client):
+    structured = json.dumps({"학부모": DEFAULT_REPLY}, ensure_ascii=False)
+    server = fake_openai(replies=[structured, DEFAULT_REPLY])
+    requests = [dict(sms_request), dict(sms_request, target="학생")]
+    results = sorted(generate_multi_target_sms(openai_client(server), requests))
+    assert results == [(0, DEFAULT_REPLY, True), (1, DEFAULT_REPLY, True)]
+    assert server.requests == 2
+
+
+def test_multi_target_uses_cache_and_single_call_for_last_target(tmp_path, sms_request, fake_openai, openai_client):
+    server = fake_openai()
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    cache.set(sms_engine._sms_cache_key(**sms_request), "캐시된 학부모 문자")
+    requests = [dict(sms_request, cache=cache), dict(sms_request, target="학생")]
+    results = sorted(generate_multi_target_sms(openai_client(server), requests))
+    assert results == [(0, "캐시된 학부모 문자", True), (1, DEFAULT_REPLY, True)]
+    assert server.requests == 1
+
+
+@pytest.mark.parametrize("status", [401, 400])
+def test_request_errors_are_reported_not_replaced_by_template(tmp_path, sms_request, fake_openai, openai_client, status):
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    cache.set(sms_engine._sms_cache_key(**sms_request), "이전에 캐시된 문자")
+    server = fake_openai(replies=[status, status])
+    client = openai_client(server)
+    telemetry = Telemetry()
+    sms, success = generate_ai_sms(client, **sms_request, cache=cache, use_cache=False, telemetry=telemetry)
+    assert not success
+    assert sms.startswith("문자 생성 중 오류가 발생했습니다") and str(status) in sms
+    assert telemetry.records()[-1]["outcome"] == "error"
+    with pytest.raises(openai.APIStatusError):
+        list(stream_ai_sms(client, **sms_request, cache=cache, use_cache=False))
+
+
+def test_unavailable_api_falls_back_to_cache_then_template(tmp_path, sms_request, fake_openai, openai_client):
+    cache = SMSCache(str(tmp_path / "cache.db"))
+    server = fake_openai(replies=[503, 503, 503])
+    client = openai_client(server)
+    assert generate_ai_sms(client, **sms_request, cache=cache) == (render_template(sms_request), True)
+    cache.set(sms_engine._sms_cache_key(**sms_request), "이전에 캐시된 문자")
+    assert generate_ai_sms(client, **sms_request, cache=cache, use_cache=False) == ("이전에 캐시된 문자", True)
+    assert list(stream_ai_sms(client, **sms_request, cache=cache, use_cache=False)) == ["이전에 캐시된 문자"]
@@ -0,0 +1,51 @@
+from sms_templates import has_template, render_template, template_slots
+
+REQUEST = {
+    "target": "학부모",
+    "category": "재난",
+    "school": "○○초등학교",
+    "date": "7월 10일",
+    "content_details": "태풍으로  오늘 오후 수업을 단축합니다",
+    "additional_info": {"재난 유형": "태풍", "대응 방법": "12시 일괄 하교", "모르는 항목": "무시"},
+    "length_option": "표준"
+}
+
+
+def test_has_template():
+    assert has_template("학부모", "재난")
+    assert not has_template("학부모", "없는 카테고리")
+    assert not has_template("없는 대상", "재난")
+
+
+def test_template_slots_normalizes_values():
+    slots = template_slots(REQUEST)
+    assert slots["content"] == "태풍으로 오늘 오후 수업을 단축합니다."
+    assert slots["disaster"] == "태풍"
+    assert slots["response"] == "12시 일괄 하교"
+    assert "무시" not in slots.values()
+
+
+def test_render_fills_slots_and_closing():
+    sms = render_template(REQUEST)
+    assert sms.startswith("[○○초등학교] 7월 10일 태풍 긴급 안내드립니다.")
+    assert "대응 방법: 12시 일괄 하교." in sms
+    assert sms.endswith("지도 부탁드립니다.")
+
+
+def test_render_drops_sentences_with_missing_slots():
+    request = dict(REQUEST, additional_info={}, school="", date="")
+    sms = render_template(request)
+    assert sms.startswith("긴급 안내드립니다.")
+    assert "대응 방법" not in sms
+    assert "{" not in sms
+
+
+def test_render_drops_closing_over_length_budget():
+    request = dict(REQUEST, content_details="가" * 80, length_option="짧게")
+    sms = render_template(request)
+    assert "가" * 80 in sms
+    assert not sms.endswith("지도 부탁드립니다.")
+
+
+def test_render_without_template_returns_none():
+    assert render_template(dict(REQUEST, category="없는 카테고리")) is None
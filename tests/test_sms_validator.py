@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from sms_validator import (
+    SMS_BYTE_LIMIT,
+    banmal_sentences,
+    classify_by_bytes,
+    correction_message,
+    sms_byte_length,
+    unencodable_chars,
+    validate_history_frame,
+    validate_sms
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("가" * 45, 90),
+    ("ABC 123", 7),
+    ("[○○초등학교] 안내", 19),
+    # cp949로 표현할 수 없는 기호·이모지는 4바이트로 계산
+    ("우산 ☂ 챙기세요", 18),
+    ("안내 😀", 9)
+])
+def test_byte_length_follows_carrier_encoding(text, expected):
+    assert sms_byte_length(text) == expected
+
+
+def test_sms_lms_boundary_is_90_bytes():
+    assert classify_by_bytes(sms_byte_length("가" * 45)) == "단문(SMS)"
+    assert classify_by_bytes(sms_byte_length("가" * 45 + "A")) == "장문(LMS)"
+    assert SMS_BYTE_LIMIT == 90
+
+
+def test_unencodable_chars_listed_once():
+    assert unencodable_chars("비 😀 우산 😀 👍") == ["😀", "👍"]
+    assert unencodable_chars("내일 비가 옵니다.") == []
+
+
+def test_short_option_must_fit_single_sms():
+    # '짧게' 글자 수(60자) 안이지만 단문 바이트 수(한글 45자)를 넘음
+    sms = "내일비가옵니다우산을챙겨주세요" * 3 + "감사합니다"
+    report = validate_sms(sms, {"length_option": "짧게"})
+    assert len(sms) <= 60 and report["byte_length"] > SMS_BYTE_LIMIT
+    assert not report["ok"]
+    assert [issue["kind"] for issue in report["issues"]] == ["length"]
+
+
+def test_missing_inputs_and_banmal_are_reported():
+    request = {"length_option": "매우 짧게", "date": "11월 05일", "additional_info": {"준비물": "우산, 우비"}}
+    report = validate_sms("11월 5일 비 예보. 우산 챙겨.", request)
+    assert {issue["kind"] for issue in report["issues"]} == {"elements", "honorific"}
+    assert "우산, 우비" in report["issues"][0]["message"]
+    message = correction_message(report["issues"])
+    assert "우산, 우비" in message and "존댓말" in message
+
+    fixed = validate_sms("11월 5일 비 예보입니다. 우산과 우비를 챙겨 주세요.", request)
+    assert fixed["ok"], fixed["issues"]
+
+
+def test_encoding_issue_is_informational():
+    report = validate_sms("내일 비가 옵니다 😀", {})
+    assert report["ok"]
+    assert [issue["kind"] for issue in report["issues"]] == ["encoding"]
+
+
+def test_banmal_detection_allows_noun_endings():
+    assert banmal_sentences("내일 체험학습 안내. 도시락 지참 바랍니다.") == []
+    assert banmal_sentences("내일 비가 온다. 우산을 준비해 주세요.") == ["내일 비가 온다."]
+
+
+def test_history_frame_matches_single_validation():
+    contents = ["가" * 45, "가" * 46, "안내 😀", "내일 비가 온다.", None]
+    frame = pd.DataFrame({"content": contents, "length_option": ["짧게", "짧게", "매우 짧게", "표준", "표준"]})
+    result = validate_history_frame(frame)
+    for row, content in zip(result.itertuples(), contents):
+        report = validate_sms(content or "", {})
+        assert (row.byte_length, row.sms_type) == (report["byte_length"], report["sms_type"])
+    assert result["informal"].tolist() == [False, False, False, True, False]
+    assert result["over_budget"].tolist() == [False, False, False, True, True]
@@ -0,0 +1,107 @@
+import json
+import urllib.request
+
+import pytest
+
+from telemetry import LatencyHistogram, Telemetry, estimate_cost_usd, new_trace, percentile, serve_prometheus
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_estimate_cost_discounts_cached_tokens():
+    # gpt-4o-mini: 입력 0.15, 캐시 0.075, 출력 0.60 (100만 토큰당)
+    cost = estimate_cost_usd("gpt-4o-mini", 1_000_000, 400_000, 100_000)
+    assert cost == pytest.approx(0.6 * 0.15 + 0.4 * 0.075 + 0.1 * 0.60)
+    assert estimate_cost_usd("unknown-model", 1000, 0, 1000) == 0.0
+
+
+def test_finish_records_once_and_tags_trace(sms_request):
+    telemetry = Telemetry()
+    trace = new_trace(sms_request, "stream")
+    trace["api_calls"] = 1
+    telemetry.finish(trace, "ok")
+    telemetry.finish(trace, "error")
+    records = telemetry.records()
+    assert len(records) == 1
+    assert records[0]["outcome"] == "ok"
+    assert records[0]["target"] == "학부모"
+    assert records[0]["latency_s"] >= 0
+    assert "started" not in records[0]
+
+
+def test_totals_survive_clear(sms_request):
+    telemetry = Telemetry()
+    for outcome in ("ok", "ok", "cache_hit"):
+        trace = new_trace(sms_request, "generate")
+        trace["prompt_tokens"] = 100
+        telemetry.finish(trace, outcome)
+    telemetry.clear()
+    totals = telemetry.totals()
+    assert telemetry.records() == []
+    assert totals["calls"] == 3
+    assert totals["by_outcome"] == {"ok": 2, "cache_hit": 1}
+    assert totals["prompt_tokens"] == 300
+
+
+def test_quantiles_grouped_by_tag():
+    telemetry = Telemetry()
+    for target, latency in (("학부모", 1.0), ("학부모", 3.0), ("학생", 2.0)):
+        telemetry.record({"target": target, "category": "행사", "outcome": "ok", "latency_s": latency})
+    grouped = telemetry.quantiles(group_by="target")
+    assert grouped["학부모"]["count"] == 2
+    assert grouped["학부모"]["p99"] == 3.0
+    assert grouped["학생"]["p50"] == 2.0
+    assert telemetry.quantiles()["전체"]["count"] == 3
+
+
+def test_log_path_writes_json_lines(tmp_path, sms_request):
+    log_path = tmp_path / "telemetry.jsonl"
+    telemetry = Telemetry(log_path=str(log_path))
+    telemetry.finish(new_trace(sms_request, "generate"), "ok")
+    telemetry.finish(new_trace(sms_request, "generate"), "error")
+    lines = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [line["outcome"] for line in lines] == ["ok", "error"]
+
+
+def test_prometheus_text_escapes_labels():
+    telemetry = Telemetry()
+    telemetry.record({"target": 'a"b', "category": "행사", "outcome": "ok", "latency_s": 0.5, "api_calls": 2})
+    text = telemetry.prometheus_text()
+    assert 'sms_calls_total{outcome="ok",target="a\\"b",category="행사"} 1' in text
+    assert "sms_api_calls_total 2" in text
+    assert 'sms_latency_seconds{quantile="0.5"} 0.5' in text
+    assert "sms_latency_seconds_count 1" in text
+    assert text.endswith("\n")
+
+
+def test_metrics_server_binds_loopback_by_default():
+    telemetry = Telemetry()
+    telemetry.record({"outcome": "ok", "latency_s": 0.5})
+    server, thread = serve_prometheus(telemetry, port=0)
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert "sms_latency_seconds_count 1" in response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_latency_histogram_window_and_buckets():
+    histogram = LatencyHistogram(window=3)
+    for seconds in (0.1, 0.3, 5.0, 40.0):
+        histogram.observe("표준", seconds)
+    assert histogram.quantile("표준", 50) == 5.0
+    assert histogram.quantile("표준", 95, min_samples=4) is None
+    assert histogram.quantile("길게", 95) is None
+    snapshot = histogram.snapshot()["표준"]
+    assert snapshot["count"] == 3
+    assert snapshot["buckets"]["0.5"] == 1
+    assert snapshot["buckets"]["6.0"] == 1
+    assert snapshot["buckets"]["inf"] == 1